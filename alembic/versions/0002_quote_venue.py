@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0002_quote_venue"
+down_revision = "0001_init"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("executed_trades", sa.Column("venue", sa.String(32), nullable=True))
+    op.add_column("executed_trades", sa.Column("quotes", sa.JSON, nullable=True))
+
+
+def downgrade():
+    op.drop_column("executed_trades", "quotes")
+    op.drop_column("executed_trades", "venue")
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0003_token_metadata"
+down_revision = "0002_quote_venue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "token_metadata",
+        sa.Column("chain", sa.String(16), primary_key=True),
+        sa.Column("address", sa.String(64), primary_key=True),
+        sa.Column("decimals", sa.Integer, nullable=True),
+        sa.Column("symbol", sa.String(32), nullable=True),
+        sa.Column("fetched_at", sa.DateTime, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("token_metadata")
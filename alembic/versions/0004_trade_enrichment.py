@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0004_trade_enrichment"
+down_revision = "0003_token_metadata"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("executed_trades", sa.Column("chain", sa.String(16), nullable=True))
+    op.add_column("executed_trades", sa.Column("enriched_at", sa.DateTime, nullable=True))
+    op.create_index("ix_executed_trades_chain", "executed_trades", ["chain"])
+    # Solana trades were never priced inline; let the enricher pick up recent ones.
+    # EVM rows keep chain NULL: the chain id they ran on was not recorded.
+    op.execute(
+        "UPDATE executed_trades SET chain = 'solana' WHERE observed_trade_id IN "
+        "(SELECT id FROM observed_trades WHERE chain = 'solana')"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_executed_trades_chain", table_name="executed_trades")
+    op.drop_column("executed_trades", "enriched_at")
+    op.drop_column("executed_trades", "chain")
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0005_trade_latency"
+down_revision = "0004_trade_enrichment"
+branch_labels = None
+depends_on = None
+
+EXECUTED_STAGES = ("claimed_at", "quoted_at", "signed_at", "sent_at", "confirmed_at")
+
+
+def upgrade():
+    op.add_column("observed_trades", sa.Column("leader_block_time", sa.DateTime, nullable=True))
+    op.add_column("observed_trades", sa.Column("detected_at", sa.DateTime, nullable=True))
+    for name in EXECUTED_STAGES:
+        op.add_column("executed_trades", sa.Column(name, sa.DateTime, nullable=True))
+
+
+def downgrade():
+    for name in reversed(EXECUTED_STAGES):
+        op.drop_column("executed_trades", name)
+    op.drop_column("observed_trades", "detected_at")
+    op.drop_column("observed_trades", "leader_block_time")
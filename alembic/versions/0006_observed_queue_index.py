@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0006_observed_queue_index"
+down_revision = "0005_trade_latency"
+branch_labels = None
+depends_on = None
+
+UNIQUE = "uq_observed_trades_chain_tx_wallet"
+QUEUE_INDEX = "ix_observed_trades_unprocessed"
+
+# Keep the first copy of each (chain, tx_hash, wallet); executions of later copies are
+# moved onto it before the copies are deleted
+DUPLICATES = """
+    SELECT id, keep_id FROM (
+        SELECT id, MIN(id) OVER (PARTITION BY chain, tx_hash, wallet) AS keep_id
+        FROM observed_trades
+    ) d WHERE id <> keep_id
+"""
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            f"UPDATE executed_trades e SET observed_trade_id = dup.keep_id "
+            f"FROM ({DUPLICATES}) dup WHERE e.observed_trade_id = dup.id"
+        )
+        op.execute(f"DELETE FROM observed_trades o USING ({DUPLICATES}) dup WHERE o.id = dup.id")
+    else:
+        op.execute(
+            f"UPDATE executed_trades SET observed_trade_id = (SELECT keep_id FROM ({DUPLICATES}) "
+            "dup WHERE dup.id = executed_trades.observed_trade_id) "
+            f"WHERE observed_trade_id IN (SELECT id FROM ({DUPLICATES}) dup)"
+        )
+        op.execute(f"DELETE FROM observed_trades WHERE id IN (SELECT id FROM ({DUPLICATES}) dup)")
+
+    if bind.dialect.name == "postgresql":
+        # Large tables: build the indexes without blocking the watchers' inserts
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {UNIQUE} "
+                "ON observed_trades (chain, tx_hash, wallet)"
+            )
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {QUEUE_INDEX} "
+                "ON observed_trades (chain, id) WHERE processed IS false"
+            )
+            # Superseded by the partial index and the unique constraint
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_observed_trades_processed")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_observed_trades_chain")
+        op.execute(
+            f"ALTER TABLE observed_trades ADD CONSTRAINT {UNIQUE} UNIQUE USING INDEX {UNIQUE}"
+        )
+    else:
+        op.create_index(UNIQUE, "observed_trades", ["chain", "tx_hash", "wallet"], unique=True)
+        op.create_index(
+            QUEUE_INDEX,
+            "observed_trades",
+            ["chain", "id"],
+            sqlite_where=sa.text("processed IS 0"),
+        )
+        op.drop_index("ix_observed_trades_processed", table_name="observed_trades")
+        op.drop_index("ix_observed_trades_chain", table_name="observed_trades")
+
+
+def downgrade():
+    bind = op.get_bind()
+    op.create_index("ix_observed_trades_processed", "observed_trades", ["processed"])
+    op.create_index("ix_observed_trades_chain", "observed_trades", ["chain"])
+    op.drop_index(QUEUE_INDEX, table_name="observed_trades")
+    if bind.dialect.name == "postgresql":
+        op.drop_constraint(UNIQUE, "observed_trades", type_="unique")
+    else:
+        op.drop_index(UNIQUE, table_name="observed_trades")
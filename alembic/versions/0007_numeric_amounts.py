@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0007_numeric_amounts"
+down_revision = "0006_observed_queue_index"
+branch_labels = None
+depends_on = None
+
+# Raw amount columns moving from VARCHAR(80) to NUMERIC(78,0) (any uint256)
+COLUMNS = {
+    "observed_trades": ("amount_in_wei", "min_out_wei"),
+    "executed_trades": ("amount_in_wei", "amount_out_wei", "gas_spent_wei"),
+}
+
+# Rows converted per transaction, so the backfill never holds long locks
+BATCH = 50_000
+
+
+def _convert(table: str, columns: tuple[str, ...], where: str) -> str:
+    # Anything that is not a plain non-negative integer becomes NULL
+    sets = ", ".join(
+        f"{c}_num = CASE WHEN {c} ~ '^[0-9]{{1,78}}$' THEN {c}::numeric END" for c in columns
+    )
+    return f"UPDATE {table} SET {sets} WHERE {where}"
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # SQLite keeps exact decimal strings (see db.TokenAmount); nothing to convert
+        op.create_index("ix_executed_trades_created_at", "executed_trades", ["created_at"])
+        return
+
+    for table, columns in COLUMNS.items():
+        for c in columns:
+            op.add_column(table, sa.Column(f"{c}_num", sa.Numeric(78, 0), nullable=True))
+
+    # Backfill in id ranges, one commit per batch, while the services keep writing
+    with op.get_context().autocommit_block():
+        for table, columns in COLUMNS.items():
+            max_id = bind.execute(sa.text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar()
+            for start in range(0, int(max_id) + 1, BATCH):
+                op.execute(_convert(table, columns, f"id >= {start} AND id < {start + BATCH}"))
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_executed_trades_created_at "
+            "ON executed_trades (created_at)"
+        )
+
+    # Swap the columns in one short transaction, first catching up rows written since.
+    # The lock holds off writers (readers still run) until the swap commits, so no row
+    # can land between the catch-up and the old column being dropped.
+    for table in COLUMNS:
+        op.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+    for table, columns in COLUMNS.items():
+        pending = " OR ".join(f"({c} IS NOT NULL AND {c}_num IS NULL)" for c in columns)
+        op.execute(_convert(table, columns, pending))
+        for c in columns:
+            op.drop_column(table, c)
+            op.alter_column(table, f"{c}_num", new_column_name=c)
+
+
+def downgrade():
+    bind = op.get_bind()
+    op.drop_index("ix_executed_trades_created_at", table_name="executed_trades")
+    if bind.dialect.name != "postgresql":
+        return
+    for table, columns in COLUMNS.items():
+        for c in columns:
+            op.alter_column(
+                table,
+                c,
+                type_=sa.String(80),
+                postgresql_using=f"{c}::text",
+                existing_type=sa.Numeric(78, 0),
+            )
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0008_partition_trades"
+down_revision = "0007_numeric_amounts"
+branch_labels = None
+depends_on = None
+
+# Partition key per table. Observed trades use the leader's block time: it is a property
+# of the transaction, so adding it to the dedupe constraint keeps that constraint exact.
+TABLES = {"observed_trades": "leader_block_time", "executed_trades": "created_at"}
+UNIQUE = "uq_observed_trades_chain_tx_wallet"
+FK = "executed_trades_observed_trade_id_fkey"
+
+# Monthly partitions created past the legacy one; the retention service keeps adding them
+MONTHS_AHEAD = 2
+
+# Rows backfilled per transaction
+BATCH = 50_000
+
+
+def _month(dt: datetime, offset: int = 0) -> datetime:
+    index = dt.year * 12 + dt.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _indexes(bind, table: str) -> dict[str, str]:
+    rows = bind.execute(
+        sa.text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table"
+        ),
+        {"table": table},
+    )
+    return dict(rows.all())
+
+
+def _partition(table: str, start: datetime) -> str:
+    end = _month(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # SQLite (tests, local runs) has no partitioning; retention is Postgres-only
+        return
+
+    # Existing rows are not copied: each table becomes the single partition for
+    # everything before `bound`. The validated CHECK lets SET NOT NULL and ATTACH
+    # PARTITION skip their full-table scans.
+    bound = _month(datetime.utcnow(), 1)
+    for table, key in TABLES.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_range "
+            f"CHECK ({key} IS NOT NULL AND {key} < '{bound:%Y-%m-%d}') NOT VALID"
+        )
+
+    with op.get_context().autocommit_block():
+        # Rows from before 0005 have no block time; their insert time is the best guess
+        max_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM observed_trades")).scalar()
+        for start in range(0, int(max_id) + 1, BATCH):
+            op.execute(
+                "UPDATE observed_trades SET leader_block_time = timestamp "
+                f"WHERE leader_block_time IS NULL AND id >= {start} AND id < {start + BATCH}"
+            )
+        for table, key in TABLES.items():
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_legacy_range")
+            # Unique indexes the partitioned table requires (they include the key), built
+            # without blocking writes and picked up by ATTACH PARTITION
+            op.execute(
+                f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {table}_legacy_pkey "
+                f"ON {table} (id, {key})"
+            )
+        op.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {UNIQUE}_legacy "
+            "ON observed_trades (chain, tx_hash, wallet, leader_block_time)"
+        )
+
+    # Swap in the partitioned tables in one short transaction
+    op.execute(f"ALTER TABLE executed_trades DROP CONSTRAINT IF EXISTS {FK}")
+    op.execute("ALTER TABLE observed_trades ALTER COLUMN leader_block_time SET NOT NULL")
+    for table, key in TABLES.items():
+        legacy = f"{table}_legacy"
+        indexes = _indexes(bind, table)
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_pkey")
+        if table == "observed_trades":
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {UNIQUE}")
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        # The key-including unique indexes built above already belong to the legacy data
+        secondary = {
+            name: ddl
+            for name, ddl in indexes.items()
+            if name not in (f"{table}_pkey", UNIQUE, f"{legacy}_pkey", f"{UNIQUE}_legacy")
+        }
+        for name in secondary:
+            op.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})"
+        )
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {key})")
+        if table == "observed_trades":
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {UNIQUE} "
+                f"UNIQUE (chain, tx_hash, wallet, {key})"
+            )
+        # The recorded definitions name the table, which is now the partitioned parent
+        for ddl in secondary.values():
+            op.execute(ddl)
+
+        op.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{bound:%Y-%m-%d}')"
+        )
+        for offset in range(MONTHS_AHEAD + 1):
+            op.execute(_partition(table, _month(bound, offset)))
+        # Catches rows beyond the newest partition if the retention service falls behind
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Copies the hot partitions back into plain tables; archived partitions stay archived
+    for table in TABLES:
+        partitioned = f"{table}_partitioned"
+        indexes = _indexes(bind, table)
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        for name in indexes:
+            op.execute(f"ALTER INDEX {name} RENAME TO {name}_partitioned")
+        op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"DROP TABLE {partitioned}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        for name, ddl in indexes.items():
+            if name not in (f"{table}_pkey", UNIQUE):
+                op.execute(ddl.replace(" ON ONLY ", " ON "))
+
+    op.execute("ALTER TABLE observed_trades ALTER COLUMN leader_block_time DROP NOT NULL")
+    op.execute(
+        f"ALTER TABLE observed_trades ADD CONSTRAINT {UNIQUE} UNIQUE (chain, tx_hash, wallet)"
+    )
+    # NOT VALID: executions may still point at observed trades that were archived
+    op.execute(
+        f"ALTER TABLE executed_trades ADD CONSTRAINT {FK} FOREIGN KEY (observed_trade_id) "
+        "REFERENCES observed_trades (id) NOT VALID"
+    )
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "0009_observed_params"
+down_revision = "0008_partition_trades"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable without a default: a metadata-only change, even on the partitioned table.
+    # Older rows keep params NULL and the executor decodes their raw_input instead.
+    op.add_column(
+        "observed_trades",
+        sa.Column(
+            "params", sa.JSON().with_variant(postgresql.JSONB(), "postgresql"), nullable=True
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column("observed_trades", "params")
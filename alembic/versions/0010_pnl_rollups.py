@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0010_pnl_rollups"
+down_revision = "0009_observed_params"
+branch_labels = None
+depends_on = None
+
+# History so far, in the shape the enricher adds to incrementally. Wallet and token are
+# key columns, so missing values are stored as ''.
+BACKFILL = """
+    INSERT INTO pnl_rollups
+        (day, wallet, chain, token, trades, amount_in_usd, amount_out_usd, pnl_usd)
+    SELECT {day}, COALESCE(o.wallet, ''), COALESCE(e.chain, o.chain), COALESCE(e.token_out, ''),
+           COUNT(*), SUM(e.amount_in_usd), SUM(e.amount_out_usd), SUM(e.pnl_usd)
+    FROM executed_trades e JOIN observed_trades o ON o.id = e.observed_trade_id
+    WHERE e.status = 'success' AND e.pnl_usd IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def upgrade():
+    op.create_table(
+        "pnl_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("wallet", sa.String(64), primary_key=True),
+        sa.Column("chain", sa.String(16), primary_key=True),
+        sa.Column("token", sa.String(64), primary_key=True),
+        sa.Column("trades", sa.Integer, nullable=False),
+        sa.Column("amount_in_usd", sa.Float, nullable=False),
+        sa.Column("amount_out_usd", sa.Float, nullable=False),
+        sa.Column("pnl_usd", sa.Float, nullable=False),
+    )
+    day = "CAST(e.created_at AS DATE)"
+    if op.get_bind().dialect.name == "sqlite":
+        day = "date(e.created_at)"  # SQLite's CAST AS DATE yields just the year
+    op.execute(BACKFILL.format(day=day))
+
+
+def downgrade():
+    op.drop_table("pnl_rollups")
@@ -1,15 +1,22 @@
 from pathlib import Path
 
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from sqlalchemy import func, select
 
-from trade_clone_engine.analytics.metrics import get_summary
+from trade_clone_engine.analytics.latency import latency_histograms
+from trade_clone_engine.analytics.metrics import (
+    get_summary,
+    pnl_summary,
+    queue_depth,
+    volume_by_day,
+)
 from trade_clone_engine.chains.solana_watcher import SolanaWatcher
 from trade_clone_engine.config import AppSettings
 from trade_clone_engine.db import ExecutedTrade, ObservedTrade, make_session_factory
+from trade_clone_engine.telemetry import CONTENT_TYPE, QUEUE_DEPTH, render
 
 app = FastAPI(title="Trade Clone Engine API")
 settings = AppSettings()
@@ -29,6 +36,11 @@ def dashboard():
     return HTMLResponse(p.read_text())
 
 
+def _amount(value: int | None) -> str | None:
+    # Raw amounts exceed JavaScript's safe integer range, so they are served as strings
+    return str(value) if value is not None else None
+
+
 class TradeOut(BaseModel):
     id: int
     chain: str
@@ -41,6 +53,7 @@ class TradeOut(BaseModel):
     token_out: str | None
     amount_in_wei: str | None
     min_out_wei: str | None
+    params: dict | None
     processed: bool
 
     @classmethod
@@ -55,8 +68,9 @@ class TradeOut(BaseModel):
             method=m.method,
             token_in=m.token_in,
             token_out=m.token_out,
-            amount_in_wei=m.amount_in_wei,
-            min_out_wei=m.min_out_wei,
+            amount_in_wei=_amount(m.amount_in_wei),
+            min_out_wei=_amount(m.min_out_wei),
+            params=m.params,
             processed=m.processed,
         )
 
@@ -67,15 +81,29 @@ def health():
 
 
 @app.get("/trades")
-def list_trades(limit: int = 50):
+def list_trades(
+    limit: int = 50,
+    protocol: str | None = None,
+    method: str | None = None,
+    fee: int | None = None,
+    recipient: str | None = None,
+):
+    """Recent observed trades, optionally filtered on their decoded swap params."""
     from trade_clone_engine.db import session_scope
 
-    with session_scope(SessionFactory) as s:
-        rows = (
-            s.execute(select(ObservedTrade).order_by(ObservedTrade.id.desc()).limit(limit))
-            .scalars()
-            .all()
+    stmt = select(ObservedTrade).order_by(ObservedTrade.id.desc()).limit(limit)
+    if protocol:
+        stmt = stmt.where(ObservedTrade.params["protocol"].as_string() == protocol)
+    if method:
+        stmt = stmt.where(ObservedTrade.params["method"].as_string() == method)
+    if fee is not None:
+        stmt = stmt.where(ObservedTrade.params["fee"].as_integer() == fee)
+    if recipient:
+        stmt = stmt.where(
+            func.lower(ObservedTrade.params["recipient"].as_string()) == recipient.lower()
         )
+    with session_scope(SessionFactory) as s:
+        rows = s.execute(stmt).scalars().all()
         return [TradeOut.from_model(r).model_dump() for r in rows]
 
 
@@ -94,7 +122,7 @@ class ExecutionOut(BaseModel):
             observed_trade_id=m.observed_trade_id,
             status=m.status,
             tx_hash=m.tx_hash,
-            gas_spent_wei=m.gas_spent_wei,
+            gas_spent_wei=_amount(m.gas_spent_wei),
             error=m.error,
         )
 
@@ -119,25 +147,28 @@ def summary():
 
 
 @app.get("/pnl")
-def pnl_summary():
-    from trade_clone_engine.db import session_scope
+def pnl(days: int | None = None):
+    """Realized PnL of successful executions, optionally over the last `days` days."""
+    return pnl_summary(SessionFactory, days=max(1, int(days)) if days else None)
 
-    with session_scope(SessionFactory) as s:
-        total = s.scalar(
-            select(func.coalesce(func.sum(ExecutedTrade.pnl_usd), 0.0)).where(
-                ExecutedTrade.status == "success"
-            )
-        )
-        rows = s.execute(
-            select(ObservedTrade.wallet, func.coalesce(func.sum(ExecutedTrade.pnl_usd), 0.0))
-            .join(ExecutedTrade, ExecutedTrade.observed_trade_id == ObservedTrade.id)
-            .where(ExecutedTrade.status == "success")
-            .group_by(ObservedTrade.wallet)
-        ).all()
-        return {
-            "total_pnl_usd": float(total or 0.0),
-            "by_wallet": {w: float(v or 0.0) for w, v in rows},
-        }
+
+@app.get("/volume")
+def volume(days: int = 7, chain: str | None = None):
+    """Executed volume and gas per day, chain and token pair (raw amounts as strings)."""
+    return volume_by_day(SessionFactory, days=max(1, int(days)), chain=chain)
+
+
+@app.get("/metrics")
+def metrics():
+    for chain, depth in queue_depth(SessionFactory).items():
+        QUEUE_DEPTH.labels(chain=chain).set(depth)
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/latency")
+def latency(limit: int = 1000, chain: str | None = None):
+    """Stage-to-stage latency histograms (ms) over the most recent executed trades."""
+    return latency_histograms(SessionFactory, limit=max(1, int(limit)), chain=chain)
 
 
 @app.post("/backfill/solana")
@@ -2,12 +2,14 @@ from loguru import logger
 
 from trade_clone_engine.config import AppSettings
 from trade_clone_engine.discovery.runner import main_loop, run_discovery_once
+from trade_clone_engine.http_client import configure_http
 
 
 def main():
     logger.remove()
     logger.add(lambda m: print(m, end=""))
     settings = AppSettings()
+    configure_http(settings)
     if settings.discover_once:
         run_discovery_once(settings)
     else:
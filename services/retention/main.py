@@ -0,0 +1,21 @@
+from loguru import logger
+
+from trade_clone_engine.config import AppSettings
+from trade_clone_engine.db import make_engine
+from trade_clone_engine.retention import RetentionJob
+from trade_clone_engine.telemetry import start_metrics_server
+
+
+def main():
+    settings = AppSettings()
+    logger.remove()
+    logger.add(lambda msg: print(msg, end=""), level=settings.log_level)
+
+    start_metrics_server(settings.metrics_port)
+
+    job = RetentionJob.from_settings(settings, make_engine(settings.database_url))
+    job.run(settings.retention_interval_sec)
+
+
+if __name__ == "__main__":
+    main()
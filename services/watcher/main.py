@@ -3,6 +3,9 @@ from loguru import logger
 from trade_clone_engine.chains.evm import EvmWatcher
 from trade_clone_engine.config import AppSettings
 from trade_clone_engine.db import make_session_factory
+from trade_clone_engine.http_client import configure_http
+from trade_clone_engine.providers.instrumentation import configure_rpc_metrics, start_rpc_summary
+from trade_clone_engine.telemetry import start_metrics_server
 
 
 def main():
@@ -11,6 +14,10 @@ def main():
     logger.add(lambda msg: print(msg, end=""), level=settings.log_level)
 
     SessionFactory = make_session_factory(settings.database_url)
+    configure_http(settings)
+    start_metrics_server(settings.metrics_port)
+    configure_rpc_metrics(settings)
+    start_rpc_summary(settings.rpc_summary_interval_sec)
 
     # Start only EVM watcher for now
     watcher = EvmWatcher.create(settings)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+
+class FakeCall:
+    address = "0x00000000000000000000000000000000000000aa"
+
+    def __init__(self, value):
+        self.value = value
+
+    def call(self):
+        return self.value
+
+    def _encode_transaction_data(self):
+        return "0x095ea7b3"
+
+
+class FakeFunctions:
+    def __init__(self, token):
+        self.token = token
+
+    def allowance(self, owner, spender):
+        self.token.allowance_reads += 1
+        return FakeCall(self.token.onchain)
+
+    def approve(self, spender, value):
+        self.token.approved.append((spender, value))
+        return FakeCall(None)
+
+
+class FakeToken:
+    def __init__(self, onchain: int):
+        self.onchain = onchain
+        self.allowance_reads = 0
+        self.approved: list[tuple[str, int]] = []
+        self.functions = FakeFunctions(self)
+
+
+class FakeEth:
+    def __init__(self, status: int = 1):
+        self.status = status
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout=120):
+        return {"status": self.status, "logs": []}
+
+
+class FakeW3:
+    def __init__(self, status: int = 1):
+        self.eth = FakeEth(status)
+
+    def keccak(self, text: str):
+        return b"\x01" * 32
+
+
+class FakeWallet:
+    address = "0x000000000000000000000000000000000000dEaD"
+
+    def __init__(self, token: FakeToken, status: int = 1):
+        self.token = token
+        self.w3 = FakeW3(status)
+        self.sent: list[dict] = []
+
+    def erc20(self, addr):
+        return self.token
+
+    def send_tx(self, tx, gas_key=None, urgency=None):
+        self.sent.append(tx)
+        return f"0xapprove{len(self.sent)}"
+
+
+def test_allowance_read_once_and_tracked_locally():
+    from trade_clone_engine.execution.allowances import AllowanceCache
+
+    token = FakeToken(onchain=1_000)
+    cache = AllowanceCache(wallet=FakeWallet(token))
+
+    assert cache.ensure("0xTok", "0xRouter", 400) is None
+    cache.consume("0xTok", "0xRouter", 400)
+    assert cache.ensure("0xtok", "0xrouter", 500) is None
+    cache.consume("0xTok", "0xRouter", 500)
+    assert token.allowance_reads == 1
+    assert cache.get("0xTok", "0xRouter") == 100
+
+
+def test_approval_policies():
+    from trade_clone_engine.execution.allowances import MAX_UINT256, AllowanceCache
+
+    token = FakeToken(onchain=0)
+    wallet = FakeWallet(token)
+    cache = AllowanceCache(
+        wallet=wallet, policy="unlimited", trusted_spenders={"0xRouter"}, multiple=3.0
+    )
+    assert cache.approval_amount("0xrouter", 10) == MAX_UINT256
+    # Untrusted spenders never get an unlimited approval
+    assert cache.approval_amount("0xOther", 10) == 10
+
+    cache = AllowanceCache(wallet=wallet, policy="multiple", multiple=3.0)
+    txh = cache.ensure("0xTok", "0xRouter", 10)
+    assert txh == "0xapprove1"
+    assert token.approved == [("0xRouter", 30)]
+    # The approved amount covers the next two trades without another approval
+    cache.consume("0xTok", "0xRouter", 10)
+    assert cache.ensure("0xTok", "0xRouter", 10) is None
+    assert len(wallet.sent) == 1
+
+
+def test_failed_approval_invalidates_cache():
+    import pytest
+
+    from trade_clone_engine.execution.allowances import AllowanceCache
+
+    token = FakeToken(onchain=0)
+    cache = AllowanceCache(wallet=FakeWallet(token, status=0))
+    with pytest.raises(Exception, match="Approval"):
+        cache.ensure("0xTok", "0xRouter", 10)
+    cache.get("0xTok", "0xRouter")
+    assert token.allowance_reads == 2
+
+
+def test_state_override_probes_the_allowance_slot_once():
+    from trade_clone_engine.execution.allowances import AllowanceCache, allowance_slot
+
+    owner = FakeWallet.address
+    spender = "0x00000000000000000000000000000000000000bb"
+    # An OpenZeppelin ERC20 keeps its allowances mapping at slot 1
+    held = allowance_slot(owner, spender, 1)
+    probes = []
+
+    class Call:
+        def call(self, state_override=None):
+            (diff,) = [o["stateDiff"] for o in state_override.values()]
+            probes.append(diff)
+            return int(diff.get(held, "0x0"), 16)
+
+    token = FakeToken(onchain=0)
+    token.functions.allowance = lambda o, s: Call()
+    cache = AllowanceCache(wallet=FakeWallet(token))
+
+    override = cache.state_override("0xTok", spender, 500)
+    assert override == {"0xTok": {"stateDiff": {held: "0x" + (500).to_bytes(32, "big").hex()}}}
+    assert len(probes) == 2
+    cache.state_override("0xtok", spender, 700)
+    assert len(probes) == 2
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+
+def test_token_amounts_are_exact_ints_and_summed_in_sql(tmp_path):
+    from sqlalchemy.dialects import postgresql
+
+    from trade_clone_engine.analytics.metrics import volume_by_day
+    from trade_clone_engine.db import (
+        Base,
+        ExecutedTrade,
+        ObservedTrade,
+        TokenAmount,
+        make_engine,
+        make_session_factory,
+        session_scope,
+    )
+
+    assert TokenAmount().process_bind_param("42", postgresql.dialect()) == 42
+    assert TokenAmount().process_bind_param("", postgresql.dialect()) is None
+
+    db_url = f"sqlite+pysqlite:///{tmp_path / 'amounts.db'}"
+    Base.metadata.create_all(make_engine(db_url))
+    SessionFactory = make_session_factory(db_url)
+    uint256_max = 2**256 - 1
+    with session_scope(SessionFactory) as s:
+        obs = ObservedTrade(
+            chain="evm", tx_hash="0x1", block_number=1, wallet="w", amount_in_wei=uint256_max
+        )
+        s.add(obs)
+        s.flush()
+        for amount_in, gas, status, token_out in (
+            (100, 7, "success", "0xb"),
+            ("250", 3, "success", "0xb"),
+            (5, 1, "failed", "0xb"),
+            (9, 2, "success", "0xc"),
+        ):
+            s.add(
+                ExecutedTrade(
+                    observed_trade_id=obs.id,
+                    status=status,
+                    chain="evm:1",
+                    token_in="0xa",
+                    token_out=token_out,
+                    amount_in_wei=amount_in,
+                    amount_out_wei=amount_in,
+                    gas_spent_wei=gas,
+                )
+            )
+
+    with session_scope(SessionFactory) as s:
+        assert s.query(ObservedTrade).one().amount_in_wei == uint256_max
+        assert {r.amount_in_wei for r in s.query(ExecutedTrade)} == {100, 250, 5, 9}
+
+    # Output amounts of different tokens are never added together
+    row, other = volume_by_day(SessionFactory, days=1)
+    assert row["chain"] == "evm:1" and row["token_in"] == "0xa" and row["trades"] == 2
+    assert (row["token_out"], row["amount_out_wei"]) == ("0xb", "350")
+    assert (row["amount_in_wei"], row["gas_spent_wei"]) == ("350", "10")
+    assert (other["token_out"], other["amount_out_wei"], other["trades"]) == ("0xc", "9", 1)
+    assert volume_by_day(SessionFactory, days=1, chain="solana") == []
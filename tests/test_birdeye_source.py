@@ -34,7 +34,7 @@ def test_birdeye_paging_and_caps(monkeypatch):
     monkeypatch.setenv("TCE_BIRDEYE_CHAIN", "solana")
     monkeypatch.setenv("TCE_BIRDEYE_LIMIT", "7")  # per request
     monkeypatch.setenv("TCE_BIRDEYE_TOTAL_LIMIT", "12")  # total cap
-    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.get", fake_get)
 
     src = BirdeyeSource(api_key="x")
     out = src.top_wallets(limit=50)
@@ -61,7 +61,7 @@ def test_birdeye_error_returns_empty(monkeypatch):
         return FakeResp()
 
     monkeypatch.setenv("TCE_BIRDEYE_API_KEY", "x")
-    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.get", fake_get)
     src = BirdeyeSource(api_key="x")
     out = src.top_wallets(limit=5)
     assert out == []
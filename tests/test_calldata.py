@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+ROUTER = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
+
+
+def _registry():
+    from web3 import Web3
+
+    from trade_clone_engine.execution.contracts import ContractRegistry
+
+    return ContractRegistry(Web3())
+
+
+def test_decode_swap_normalizes_v2_and_v3():
+    from trade_clone_engine.execution.calldata import decode_swap
+
+    reg = _registry()
+    v2 = reg.decoder("uniswap_v2_router.json")
+    v3 = reg.decoder("uniswap_v3_router.json")
+
+    calldata = v2.functions.swapExactTokensForTokens(
+        10**30, 9, [WETH, DAI], ROUTER, 123
+    )._encode_transaction_data()
+    assert decode_swap(v2, v3, calldata) == {
+        "protocol": "v2",
+        "method": "swapExactTokensForTokens",
+        "path": [WETH, DAI],
+        "amount_in": str(10**30),  # beyond JSON's safe integers
+        "amount_out_min": "9",
+        "recipient": ROUTER,
+        "deadline": 123,
+    }
+
+    calldata = v3.functions.exactInputSingle(
+        (WETH, DAI, 3000, ROUTER, 456, 1000, 900, 0)
+    )._encode_transaction_data()
+    params = decode_swap(v2, v3, calldata)
+    assert params["protocol"] == "v3" and params["method"] == "exactInputSingle"
+    assert params["path"] == [WETH, DAI] and params["fee"] == 3000
+    assert params["amount_in"] == "1000" and params["amount_out_min"] == "900"
+    assert params["deadline"] == 456
+
+    assert decode_swap(v2, v3, "0xdeadbeef") is None
+
+
+def test_executor_plans_from_stored_params_without_decoding():
+    import pytest
+
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.db import ObservedTrade
+    from trade_clone_engine.execution.calldata import decode_swap
+    from trade_clone_engine.execution.evm_executor import EvmExecutor, UnsupportedTrade
+    from trade_clone_engine.execution.policy import WalletPolicy
+
+    class NoDecode:
+        def decode_function_input(self, data):
+            raise AssertionError("stored params should not be re-decoded")
+
+    ex = EvmExecutor.__new__(EvmExecutor)
+    ex.settings = AppSettings()
+    ex.v2_decoder = ex.v3_decoder = NoDecode()
+    policy = WalletPolicy(copy_ratio=0.5, slippage_bps=100, max_native_in_wei=0)
+    ex.policies = type("P", (), {"for_wallet": lambda self, wallet: policy})()
+
+    reg = _registry()
+    v2 = reg.decoder("uniswap_v2_router.json")
+    calldata = v2.functions.swapExactTokensForTokens(
+        1000, 9, [WETH, DAI], ROUTER, 123
+    )._encode_transaction_data()
+    params = decode_swap(v2, reg.decoder("uniswap_v3_router.json"), calldata)
+    rec = ObservedTrade(wallet="0xw", dex=ROUTER, params=params, raw_input=calldata)
+
+    intent, _ = ex._plan(rec)
+    assert intent.method == "swapExactTokensForTokens"
+    assert intent.path == [WETH, DAI] and intent.amount_in == 500
+
+    # Rows observed before params were stored are decoded from their calldata
+    ex.v2_decoder = v2
+    legacy = ObservedTrade(wallet="0xw", dex=ROUTER, raw_input=calldata)
+    assert ex._plan(legacy)[0].amount_in == 500
+
+    params = dict(params, method="addLiquidity")
+    with pytest.raises(UnsupportedTrade, match="addLiquidity"):
+        ex._plan(ObservedTrade(wallet="0xw", dex=ROUTER, params=params))
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+TOKEN_A = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+TOKEN_B = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+
+def _executor(settings):
+    from trade_clone_engine.execution.evm_executor import EvmExecutor
+
+    ex = EvmExecutor.__new__(EvmExecutor)
+    ex.settings = settings
+    return ex
+
+
+def test_allocate_splits_pro_rata():
+    from trade_clone_engine.execution.evm_executor import allocate
+
+    assert allocate(1000, [1, 1, 2]) == [250, 250, 500]
+    assert allocate(10, [1, 1, 1]) == [3, 3, 4]
+    assert allocate(None, [1, 2]) == [None, None]
+
+
+def test_claim_groups_same_pair_within_window(tmp_path):
+    from datetime import datetime, timedelta
+
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.db import (
+        Base,
+        ObservedTrade,
+        make_engine,
+        make_session_factory,
+        session_scope,
+    )
+
+    db_url = f"sqlite+pysqlite:///{tmp_path / 'c.db'}"
+    Base.metadata.create_all(make_engine(db_url))
+    SessionFactory = make_session_factory(db_url)
+    t0 = datetime.utcnow() - timedelta(minutes=1)
+    rows = [
+        (TOKEN_A, TOKEN_B, t0, "0xr"),
+        (TOKEN_A.lower(), TOKEN_B, t0 + timedelta(seconds=2), "0xR"),
+        (TOKEN_B, TOKEN_A, t0 + timedelta(seconds=1), "0xr"),  # other direction
+        (TOKEN_A, TOKEN_B, t0 + timedelta(seconds=30), "0xr"),  # outside the window
+        (TOKEN_A, TOKEN_B, t0 + timedelta(seconds=3), "0xother"),  # other router
+    ]
+    with session_scope(SessionFactory) as s:
+        for i, (tin, tout, ts, dex) in enumerate(rows):
+            s.add(
+                ObservedTrade(
+                    chain="evm",
+                    tx_hash=f"0x{i}",
+                    block_number=1,
+                    wallet=f"0xw{i}",
+                    token_in=tin,
+                    token_out=tout,
+                    dex=dex,
+                    timestamp=ts,
+                )
+            )
+
+    ex = _executor(AppSettings(coalesce_window_sec=5))
+    with session_scope(SessionFactory) as s:
+        assert ex._coalesce_delay(s) == 0.0  # the oldest trade's window has passed
+        assert [r.tx_hash for r in ex._claim(s)] == ["0x0", "0x1"]
+
+    # The run loop waits out a fresh trade's window before claiming, not inside _claim
+    with session_scope(SessionFactory) as s:
+        s.query(ObservedTrade).filter_by(tx_hash="0x0").one().timestamp = datetime.utcnow()
+    ex = _executor(AppSettings(coalesce_window_sec=60))
+    with session_scope(SessionFactory) as s:
+        assert 59 < ex._coalesce_delay(s) <= 60
+
+    ex = _executor(AppSettings(coalesce_window_sec=0))
+    with session_scope(SessionFactory) as s:
+        assert [r.tx_hash for r in ex._claim(s)] == ["0x0"]
+
+
+def test_group_executes_one_swap_and_allocates(monkeypatch):
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.execution.evm_executor import TradeIntent, UnsupportedTrade
+    from trade_clone_engine.execution.policy import WalletPolicy
+
+    ex = _executor(AppSettings(quote_amount_digits=0))
+    intents = {
+        1: TradeIntent("m", "0xr", TOKEN_A, TOKEN_B, 100, path=[TOKEN_A, TOKEN_B]),
+        2: TradeIntent("m", "0xr", TOKEN_A, TOKEN_B, 300, path=[TOKEN_A, TOKEN_B]),
+        # Another router, or another V3 fee tier, builds a different swap
+        4: TradeIntent("m", "0xother", TOKEN_A, TOKEN_B, 50, path=[TOKEN_A, TOKEN_B]),
+        5: TradeIntent("m", "0xr", TOKEN_A, TOKEN_B, 70, path=[TOKEN_A, TOKEN_B], fee=500),
+    }
+
+    class Rec:
+        def __init__(self, id):
+            self.id = id
+
+    def plan(rec):
+        if rec.id not in intents:
+            raise UnsupportedTrade("Unsupported method: x")
+        return intents[rec.id], WalletPolicy(1.0, 50 * rec.id, 0)
+
+    swaps = []
+
+    def execute(intent, policy, res):
+        swaps.append((intent.amount_in, policy.slippage_bps))
+        res.status, res.tx_hash, res.amount_out, res.gas_spent = "success", "0xh", 800, 40
+
+    monkeypatch.setattr(ex, "_plan", plan)
+    monkeypatch.setattr(ex, "_execute", execute)
+    results = ex._process_group([Rec(1), Rec(2), Rec(3), Rec(4), Rec(5)])
+    assert swaps == [(50, 200), (70, 250), (400, 50)]
+    assert [(r.amount_in, r.amount_out, r.gas_spent) for r in results[:2]] == [
+        (100, 200, 10),
+        (300, 600, 30),
+    ]
+    assert all(r.tx_hash == "0xh" for r in results[:2])
+    assert results[2].status == "skipped" and results[2].tx_hash is None
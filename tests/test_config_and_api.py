@@ -70,6 +70,16 @@ def test_api_endpoints_with_sqlite(tmp_path, monkeypatch):
             min_out_wei="900",
             raw_input="",
         )
+        s.add(
+            ObservedTrade(
+                chain="evm",
+                tx_hash="0x2",
+                block_number=2,
+                wallet="0xw",
+                method="exactInputSingle",
+                params={"protocol": "v3", "method": "exactInputSingle", "fee": 500},
+            )
+        )
         s.add(o)
         s.flush()
         e = ExecutedTrade(
@@ -91,6 +101,12 @@ def test_api_endpoints_with_sqlite(tmp_path, monkeypatch):
     r = client.get("/trades")
     assert r.status_code == 200
     assert isinstance(r.json(), list)
+    # Filters on the decoded swap params
+    r = client.get("/trades", params={"protocol": "v3", "fee": 500})
+    assert [t["tx_hash"] for t in r.json()] == ["0x2"]
+    assert r.json()[0]["params"]["method"] == "exactInputSingle"
+    assert client.get("/trades", params={"fee": 3000}).json() == []
+    assert client.get("/pnl").json() == {"total_pnl_usd": 0.0, "by_wallet": {}}
     r = client.get("/executions")
     assert r.status_code == 200
     assert isinstance(r.json(), list)
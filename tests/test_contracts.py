@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+
+def test_registry_caches_contracts_and_functions():
+    from web3 import Web3
+
+    from trade_clone_engine.execution.contracts import ContractRegistry
+
+    reg = ContractRegistry(Web3())
+    token = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+    a = reg.get(token, "erc20.json")
+    b = reg.get(token.upper().replace("0X", "0x"), "erc20.json")
+    assert a is b
+    assert a.address == Web3.to_checksum_address(token)
+
+    approve = reg.fn(token, "erc20.json", "approve")
+    assert approve is reg.fn(token, "erc20.json", "approve")
+    data = approve(a.address, 5)._encode_transaction_data()
+    assert data.startswith("0x095ea7b3")
+
+    # Only the most recently used contracts are kept
+    small = ContractRegistry(Web3(), max_size=2)
+    dai = "0x6b175474e89094c44da98b954eedeac495271d0f"
+    usdc = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+    weth = small.get(token, "erc20.json")
+    small.get(dai, "erc20.json")
+    assert small.get(token, "erc20.json") is weth
+    small.get(usdc, "erc20.json")
+    assert [k[0] for k in small._contracts] == [token, usdc]
+
+
+def test_decoder_round_trip():
+    from web3 import Web3
+
+    from trade_clone_engine.execution.contracts import ContractRegistry
+
+    reg = ContractRegistry(Web3())
+    router = reg.get("0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D", "uniswap_v2_router.json")
+    path = [
+        "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+        "0x6B175474E89094C44Da98b954EedeAC495271d0F",
+    ]
+    calldata = router.functions.swapExactTokensForTokens(
+        10, 9, path, router.address, 123
+    )._encode_transaction_data()
+    func, params = reg.decoder("uniswap_v2_router.json").decode_function_input(calldata)
+    assert func.fn_name == "swapExactTokensForTokens"
+    assert list(params["path"]) == path
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+
+
+class FakePrices:
+    def __init__(self, table):
+        self.table = table
+        self.calls = []
+
+    def get_many(self, chain, addresses):
+        self.calls.append((chain, sorted(addresses)))
+        return {a.lower(): self.table.get(a.lower()) for a in addresses}
+
+
+class FakeTokens:
+    def get_many(self, chain, addresses):
+        from trade_clone_engine.analytics.tokens import TokenMeta
+
+        decimals = {USDC: 6, WETH: 18}
+        return {a.lower(): TokenMeta(decimals=decimals.get(a.lower())) for a in addresses}
+
+
+def _session_factory(tmp_path):
+    from trade_clone_engine.db import Base, make_engine, make_session_factory
+
+    db_url = f"sqlite+pysqlite:///{tmp_path / 'enrich.db'}"
+    Base.metadata.create_all(make_engine(db_url))
+    return make_session_factory(db_url)
+
+
+def _trade(s, **kw):
+    from trade_clone_engine.db import ExecutedTrade, ObservedTrade
+
+    # One observed trade per executed trade: (chain, tx_hash, wallet) is unique
+    tx_hash = f"0x{s.query(ObservedTrade).count() + 1}"
+    obs = ObservedTrade(chain="evm", tx_hash=tx_hash, block_number=1, wallet="0xw")
+    s.add(obs)
+    s.flush()
+    row = ExecutedTrade(observed_trade_id=obs.id, token_in=USDC, token_out=WETH, **kw)
+    s.add(row)
+    return row
+
+
+def test_enricher_prices_batch_and_retries_later(tmp_path):
+    from sqlalchemy import select
+
+    from trade_clone_engine.analytics.enrichment import PnlEnricher
+    from trade_clone_engine.db import ExecutedTrade, session_scope
+
+    SessionFactory = _session_factory(tmp_path)
+    with session_scope(SessionFactory) as s:
+        _trade(
+            s,
+            chain="evm:1",
+            status="success",
+            amount_in_wei="2000000000",
+            amount_out_wei=str(10**18),
+        )
+        _trade(s, chain="evm:1", status="failed", amount_in_wei="1")
+        _trade(s, chain="evm:137", status="success", amount_in_wei="1", amount_out_wei="1")
+        _trade(s, chain="evm:1", status="skipped", amount_in_wei="1000000", amount_out_wei="1")
+
+    prices = FakePrices({USDC: 1.0})
+    enricher = PnlEnricher(SessionFactory, prices, FakeTokens(), chains=["evm:1"])
+    assert enricher.run_once() == 2
+    assert prices.calls == [(1, sorted([USDC, WETH]))]
+    # WETH unpriced: nothing to do until the retry interval passes
+    assert enricher.run_once() == 0
+
+    prices.table[WETH] = 2100.0
+    enricher.retry_sec = 0
+    assert enricher.run_once() == 2
+
+    with session_scope(SessionFactory) as s:
+        rows = s.execute(select(ExecutedTrade).order_by(ExecutedTrade.id)).scalars().all()
+        first = rows[0]
+        assert first.amount_in_usd == 2000.0 and first.amount_out_usd == 2100.0
+        assert first.pnl_usd == 100.0 and first.realized_at == first.created_at
+        assert rows[1].enriched_at is None and rows[2].enriched_at is None
+        assert rows[3].pnl_usd is not None
+    assert enricher.run_once() == 0
+
+
+def test_enricher_rolls_up_pnl_once_per_trade(tmp_path):
+    from trade_clone_engine.analytics.enrichment import PnlEnricher
+    from trade_clone_engine.analytics.metrics import pnl_summary
+    from trade_clone_engine.db import PnlRollup, session_scope
+
+    SessionFactory = _session_factory(tmp_path)
+    with session_scope(SessionFactory) as s:
+        for amount_out in (10**18, 2 * 10**18):
+            _trade(
+                s,
+                chain="evm:1",
+                status="success",
+                amount_in_wei="2000000000",
+                amount_out_wei=str(amount_out),
+            )
+        # Dry-run copies are priced but are not realized PnL
+        _trade(s, chain="evm:1", status="skipped", amount_in_wei="1", amount_out_wei="1")
+
+    prices = FakePrices({USDC: 1.0, WETH: 2100.0})
+    enricher = PnlEnricher(SessionFactory, prices, FakeTokens(), chains=["evm:1"])
+    assert enricher.run_once() == 3
+    enricher.retry_sec = 0
+    assert enricher.run_once() == 0  # priced rows are never added again
+
+    with session_scope(SessionFactory) as s:
+        (rollup,) = s.query(PnlRollup).all()
+        assert (rollup.wallet, rollup.chain, rollup.token) == ("0xw", "evm:1", WETH)
+        assert rollup.trades == 2 and rollup.amount_in_usd == 4000.0
+        assert rollup.pnl_usd == 100.0 + 2200.0
+
+    assert pnl_summary(SessionFactory) == {"total_pnl_usd": 2300.0, "by_wallet": {"0xw": 2300.0}}
+    assert pnl_summary(SessionFactory, days=1)["total_pnl_usd"] == 2300.0
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+
+class FakeEth:
+    def __init__(self):
+        self.fee_history_calls = 0
+        self.estimate_calls = 0
+        self.sent: list[bytes] = []
+
+    def fee_history(self, block_count, newest, percentiles):
+        self.fee_history_calls += 1
+        assert percentiles == [25, 50, 90]
+        gwei = 10**9
+        return {
+            "oldestBlock": 100,
+            "baseFeePerGas": [10 * gwei, 11 * gwei, 12 * gwei],
+            "reward": [[1 * gwei, 2 * gwei, 5 * gwei], [1 * gwei, 3 * gwei, 7 * gwei]],
+        }
+
+    def estimate_gas(self, tx):
+        self.estimate_calls += 1
+        return 100_000
+
+    def get_transaction_count(self, addr):
+        return 7
+
+    @property
+    def gas_price(self):  # pragma: no cover - must not be used with an oracle
+        raise AssertionError("gas_price should not be read when a fee oracle is set")
+
+
+class FakeW3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+def test_fee_oracle_percentiles_and_refresh_once_per_block():
+    from trade_clone_engine.execution.gas import FeeOracle
+
+    w3 = FakeW3()
+    oracle = FeeOracle.for_chain(w3, chain_id=1)
+    assert oracle.refresh_sec == 12.0
+    max_fee, tip = oracle.fees("high")
+    gwei = 10**9
+    assert tip == 6 * gwei  # median of 5 and 7 gwei
+    assert max_fee == 2 * 12 * gwei + tip
+    assert oracle.fees("low")[1] == 1 * gwei
+    assert oracle.refresh().block == 101
+    assert w3.eth.fee_history_calls == 1
+    oracle.refresh(force=True)
+    assert w3.eth.fee_history_calls == 2
+
+
+def test_send_tx_uses_oracle_and_gas_cache(monkeypatch):
+    from trade_clone_engine.execution.evm_wallet import EvmWallet
+    from trade_clone_engine.execution.gas import FeeOracle, GasEstimateCache
+
+    w3 = FakeW3()
+    signed_txs: list[dict] = []
+
+    class FakeAccount:
+        def sign_transaction(self, tx, key):
+            signed_txs.append(dict(tx))
+
+            class Signed:
+                rawTransaction = b"raw"
+
+            return Signed()
+
+    class FakeHash:
+        def hex(self):
+            return "0xhash"
+
+    w3.eth.account = FakeAccount()
+    w3.eth.send_raw_transaction = lambda raw: FakeHash()
+
+    wallet = EvmWallet(
+        w3=w3,
+        chain_id=1,
+        private_key="0x01",
+        address="0x000000000000000000000000000000000000dEaD",
+        fee_oracle=FeeOracle(w3=w3),
+        gas_cache=GasEstimateCache(buffer=1.5),
+    )
+    key = ("0xRouter", "swapExactTokensForTokens", 2)
+    wallet.send_tx({"to": "0xRouter", "data": "0x"}, gas_key=key)
+    wallet.send_tx({"to": "0xRouter", "data": "0x", "maxPriorityFeePerGas": 5}, gas_key=key)
+
+    assert w3.eth.estimate_calls == 1
+    assert signed_txs[0]["gas"] == signed_txs[1]["gas"] == 150_000
+    assert signed_txs[0]["maxPriorityFeePerGas"] == 2 * 10**9 + 500_000_000
+    # Explicit priority fee overrides are preserved
+    assert signed_txs[1]["maxPriorityFeePerGas"] == 5
+
+
+def test_reverted_receipt_drops_cached_gas_limit():
+    from types import SimpleNamespace
+
+    from trade_clone_engine.execution.evm_executor import (
+        EvmExecutor,
+        ExecutionResult,
+        TradeIntent,
+    )
+    from trade_clone_engine.execution.gas import GasEstimateCache
+
+    key = ("0xRouter", "swapExactTokensForTokens", 2)
+    cache = GasEstimateCache(buffer=1.0)
+    cache.get(key, lambda: 100_000)
+    receipt = {"status": 0, "gasUsed": 100_000, "effectiveGasPrice": 1}
+    eth = SimpleNamespace(wait_for_transaction_receipt=lambda tx, timeout: receipt)
+    ex = EvmExecutor.__new__(EvmExecutor)
+    ex.wallet = SimpleNamespace(w3=SimpleNamespace(eth=eth), address="0xme", gas_cache=cache)
+
+    intent = TradeIntent("swapExactTokensForTokens", "0xRouter", "0xa", "0xb", 1)
+    res = ExecutionResult(status="success", tx_hash="0x1")
+    ex._apply_receipt(intent, res, None, key)
+    assert res.status == "failed" and res.gas_spent == 100_000
+    # Out of gas: the next swap of this shape is estimated again
+    assert cache.get(key, lambda: 250_000) == 250_000
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_http_client_reuses_sessions_per_host_and_retries_transient_errors(monkeypatch):
+    import requests
+
+    from trade_clone_engine.http_client import HttpClient
+
+    calls = []
+    statuses = iter([503, 429, 200, 500, 500])
+
+    def fake_request(self, method, url, timeout=None, **kwargs):
+        calls.append((id(self), method, url, timeout))
+        if len(calls) == 1:
+            raise requests.ConnectionError("reset")
+        return FakeResponse(next(statuses))
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    client = HttpClient(retries=3, backoff_sec=0, backoff_max_sec=0)
+
+    r = client.get("https://api.example.com/quote", params={"a": 1})
+    assert r.status_code == 200
+    assert len(calls) == 4
+    assert len({session for session, *_ in calls}) == 1
+    assert calls[0][3] == (client.connect_timeout_sec, client.read_timeout_sec)
+
+    # Retries exhausted: the last response is returned for raise_for_status()
+    calls.clear()
+    r = client.post("https://other.example.com/swap", timeout=20, retries=1)
+    assert r.status_code == 500
+    assert len(calls) == 2 and calls[0][3] == (client.connect_timeout_sec, 20.0)
+    assert set(client._sessions) == {"api.example.com", "other.example.com"}
+
+
+def test_http_client_spaces_requests_to_the_host_rate_limit(monkeypatch):
+    import requests
+
+    from trade_clone_engine import http_client as mod
+
+    sleeps = []
+    monkeypatch.setattr(mod.time, "sleep", lambda sec: sleeps.append(sec))
+    monkeypatch.setattr(requests.Session, "request", lambda *a, **k: FakeResponse(200))
+    client = mod.HttpClient()
+    client.configure(rate_limits={"API.limited.com": 2.0})
+
+    for _ in range(3):
+        client.get("https://api.limited.com/prices")
+    client.get("https://unlimited.com/prices")
+    assert len(sleeps) == 2
+    assert 0.4 < sleeps[0] <= 0.5 and 0.9 < sleeps[1] <= 1.0
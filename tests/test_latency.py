@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+
+def test_histogram_buckets_and_percentiles():
+    from trade_clone_engine.analytics.latency import histogram
+
+    h = histogram([5.0, 40.0, 40.0, 900.0, 70000.0])
+    assert h["count"] == 5
+    assert h["buckets"]["10"] == 1 and h["buckets"]["50"] == 3 and h["buckets"]["1000"] == 4
+    assert h["buckets"]["60000"] == 4 and h["buckets"]["+Inf"] == 5
+    assert h["p50_ms"] == 40.0 and h["max_ms"] == 70000.0
+    assert histogram([]) == {"count": 0, "buckets": dict.fromkeys(h["buckets"], 0)}
+
+
+def test_latency_histograms_from_stage_timestamps(tmp_path):
+    from datetime import datetime, timedelta
+
+    from trade_clone_engine.analytics.latency import latency_histograms
+    from trade_clone_engine.db import (
+        Base,
+        ExecutedTrade,
+        ObservedTrade,
+        make_engine,
+        make_session_factory,
+        session_scope,
+    )
+
+    db_url = f"sqlite+pysqlite:///{tmp_path / 'latency.db'}"
+    Base.metadata.create_all(make_engine(db_url))
+    SessionFactory = make_session_factory(db_url)
+    t0 = datetime(2026, 1, 1, 12, 0, 0)
+
+    def at(ms):
+        return t0 + timedelta(milliseconds=ms)
+
+    with session_scope(SessionFactory) as s:
+        obs = ObservedTrade(
+            chain="evm",
+            tx_hash="0x1",
+            block_number=1,
+            wallet="0xw",
+            leader_block_time=t0,
+            detected_at=at(1200),
+            timestamp=at(1230),
+        )
+        s.add(obs)
+        s.flush()
+        s.add(
+            ExecutedTrade(
+                observed_trade_id=obs.id,
+                status="success",
+                claimed_at=at(1300),
+                quoted_at=at(1700),
+                signed_at=at(1720),
+                sent_at=at(1800),
+                confirmed_at=at(13800),
+            )
+        )
+        # Dry-run copy: never signed or sent
+        s.add(ExecutedTrade(observed_trade_id=obs.id, claimed_at=at(1300), quoted_at=at(1500)))
+
+    out = latency_histograms(SessionFactory)
+    assert out["leader_to_detected"]["count"] == 2
+    assert out["detected_to_persisted"]["p50_ms"] == 30.0
+    assert out["claimed_to_quoted"]["count"] == 2
+    assert out["signed_to_sent"]["count"] == 1 and out["signed_to_sent"]["max_ms"] == 80.0
+    assert out["sent_to_confirmed"]["buckets"]["10000"] == 0
+    assert out["sent_to_confirmed"]["buckets"]["30000"] == 1
+    assert out["leader_to_sent"]["p99_ms"] == 1800.0
+    assert latency_histograms(SessionFactory, chain="solana")["leader_to_sent"]["count"] == 0
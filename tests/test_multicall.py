@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+
+class FakeAggregate:
+    def __init__(self, results):
+        self.results = results
+        self.payload = None
+
+    def __call__(self, payload):
+        self.payload = payload
+        return self
+
+    def call(self, block_identifier="latest"):
+        return self.results
+
+
+class FakeRegistry:
+    def __init__(self, aggregate):
+        self.aggregate = aggregate
+
+    def fn(self, address, abi_name, name):
+        assert (abi_name, name) == ("multicall3.json", "aggregate3")
+        return self.aggregate
+
+
+def test_batch_decodes_results_and_maps_failures_to_none():
+    from web3 import Web3
+
+    from trade_clone_engine.execution.contracts import ContractRegistry
+    from trade_clone_engine.execution.multicall import MulticallReader
+
+    w3 = Web3()
+    reg = ContractRegistry(w3)
+    token = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+    router = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
+    allowance = reg.get(token, "erc20.json").functions.allowance(router, router)
+    amounts = reg.get(router, "uniswap_v2_router.json").functions.getAmountsOut(10, [token, token])
+    decimals = reg.get(token, "erc20.json").functions.decimals()
+
+    aggregate = FakeAggregate(
+        [
+            (True, w3.codec.encode(["uint256"], [123])),
+            (True, w3.codec.encode(["uint256[]"], [[10, 20]])),
+            (False, b""),
+        ]
+    )
+    reader = MulticallReader(w3, FakeRegistry(aggregate))
+    assert reader.read([allowance, amounts, decimals]) == [123, (10, 20), None]
+    assert [c[0] for c in aggregate.payload] == [token, router, token]
+    assert all(c[1] for c in aggregate.payload)
+
+
+def test_transport_failures_are_distinguishable_from_reverts():
+    from web3 import Web3
+    from web3.exceptions import ContractLogicError
+
+    from trade_clone_engine.execution.multicall import MulticallReader
+
+    class Down:
+        def __call__(self, payload):
+            return self
+
+        def call(self, block_identifier="latest"):
+            raise ConnectionError("node unreachable")
+
+    class Fn:
+        fn_name = "decimals"
+        address = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+        def __init__(self, error):
+            self.error = error
+
+        def _encode_transaction_data(self):
+            return "0x313ce567"
+
+        def call(self, block_identifier="latest"):
+            raise self.error
+
+    reader = MulticallReader(Web3(), FakeRegistry(Down()))
+    calls = [Fn(ContractLogicError("execution reverted")), Fn(ConnectionError("down"))]
+    failed = object()
+    assert reader.read(calls, failed=failed) == [None, failed]
+    assert reader.read(calls) == [None, None]
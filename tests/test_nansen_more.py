@@ -36,7 +36,7 @@ def test_nansen_dcas_post_body_and_parse(monkeypatch):
     monkeypatch.setenv("TCE_DISCOVER_ALLOWED_LABELS", "")
     monkeypatch.setenv("TCE_DISCOVER_DENIED_LABELS", "")
     monkeypatch.setenv("TCE_NANSEN_PER_PAGE", "10")
-    monkeypatch.setattr("requests.post", fake_post)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.post", fake_post)
 
     src = NansenSource(
         api_key="test-key",
@@ -69,7 +69,7 @@ def test_nansen_top_traders_get_parse(monkeypatch):
         }
         return FakeResp(True, payload)
 
-    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.get", fake_get)
     src = NansenSource(
         api_key="k",
         base_url="https://api.nansen.ai/api/v1",
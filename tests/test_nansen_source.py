@@ -41,7 +41,7 @@ def test_nansen_dex_trades_post_body_and_parse(monkeypatch):
     monkeypatch.setenv("TCE_DISCOVER_DENIED_LABELS", "30D Smart Trader")
     monkeypatch.setenv("TCE_NANSEN_PER_PAGE", "77")
 
-    monkeypatch.setattr("requests.post", fake_post)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.post", fake_post)
 
     src = NansenSource(
         api_key="test-key",
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+
+def _session_factory(tmp_path):
+    from trade_clone_engine.db import Base, make_engine, make_session_factory
+
+    db_url = f"sqlite+pysqlite:///{tmp_path / 'queue.db'}"
+    Base.metadata.create_all(make_engine(db_url))
+    return make_session_factory(db_url)
+
+
+def test_insert_or_ignore_skips_duplicate_observed_trades(tmp_path):
+    from trade_clone_engine.db import ObservedTrade, insert_or_ignore, session_scope
+
+    SessionFactory = _session_factory(tmp_path)
+
+    def observed(wallet="w1"):
+        return ObservedTrade(chain="solana", tx_hash="sig", block_number=1, wallet=wallet)
+
+    with session_scope(SessionFactory) as s:
+        rec = observed()
+        first = insert_or_ignore(s, rec)
+        assert first is not None and rec.id == first
+        assert insert_or_ignore(s, observed()) is None
+        # The same transaction is a separate trade for another followed wallet
+        assert insert_or_ignore(s, observed("w2")) not in (None, first)
+
+    with session_scope(SessionFactory) as s:
+        rows = s.query(ObservedTrade).order_by(ObservedTrade.id).all()
+        assert [r.wallet for r in rows] == ["w1", "w2"]
+        assert rows[0].processed is False and rows[0].timestamp is not None
+
+
+def test_queue_query_uses_partial_index(tmp_path):
+    from sqlalchemy import select, text
+
+    from trade_clone_engine.db import ObservedTrade, session_scope
+
+    SessionFactory = _session_factory(tmp_path)
+    with session_scope(SessionFactory) as s:
+        for i in range(200):
+            chain = "evm" if i % 2 else "solana"
+            s.add(ObservedTrade(chain=chain, tx_hash=f"0x{i}", block_number=i, wallet="w"))
+            s.flush()
+        s.execute(text("UPDATE observed_trades SET processed = 1 WHERE id < 190"))
+        s.execute(text("ANALYZE"))
+    stmt = (
+        select(ObservedTrade)
+        .where(ObservedTrade.processed.is_(False), ObservedTrade.chain == "evm")
+        .order_by(ObservedTrade.id.asc())
+        .limit(1)
+    )
+    with session_scope(SessionFactory) as s:
+        sql = str(stmt.compile(s.get_bind(), compile_kwargs={"literal_binds": True}))
+        plan = " ".join(str(row[-1]) for row in s.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "ix_observed_trades_unprocessed" in plan
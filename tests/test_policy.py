@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+
+
+def test_policy_index_lookup_and_reload(tmp_path):
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.execution.policy import PolicyIndex
+
+    wallets_yaml = tmp_path / "wallets.yaml"
+    wallets_yaml.write_text(
+        """
+wallets:
+  - chain: evm
+    address: "0xAbC0000000000000000000000000000000000001"
+    copy_ratio: 0.5
+    slippage_bps: 100
+    allowed_tokens: ["0xTokA", "0xTokB"]
+  - chain: solana
+    address: "9xQeWvG816bUx9EPm2Tbd2Ykqg3k9uADuZbL9g1z3Q2E"
+    denied_tokens: ["BadMint111"]
+        """.strip()
+    )
+    settings = AppSettings(wallets_config=str(wallets_yaml), copy_ratio=0.2, slippage_bps=300)
+    index = PolicyIndex(settings, check_interval_sec=0.0)
+
+    evm = index.for_wallet("0xabc0000000000000000000000000000000000001")
+    assert evm.copy_ratio == 0.5
+    assert evm.slippage_bps == 100
+    assert evm.tokens_ok(["0xtoka", "0xTOKB"])
+    assert not evm.tokens_ok(["0xtoka", "0xOther"])
+
+    sol = index.for_wallet("9xQeWvG816bUx9EPm2Tbd2Ykqg3k9uADuZbL9g1z3Q2E")
+    assert sol.copy_ratio == 0.2
+    assert not sol.tokens_ok(["So11111111111111111111111111111111111111112", "BadMint111"])
+
+    unknown = index.for_wallet("0xdead")
+    assert unknown.copy_ratio == 0.2 and unknown.slippage_bps == 300
+
+    # Edits to the file are picked up once its mtime changes
+    wallets_yaml.write_text(
+        """
+wallets:
+  - chain: evm
+    address: "0xabc0000000000000000000000000000000000001"
+    copy_ratio: 0.1
+        """.strip()
+    )
+    st = wallets_yaml.stat()
+    os.utime(wallets_yaml, (st.st_atime, st.st_mtime + 5))
+    assert index.for_wallet("0xabc0000000000000000000000000000000000001").copy_ratio == 0.1
+
+
+def test_policy_index_parses_file_once(tmp_path, monkeypatch):
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.execution.policy import PolicyIndex
+
+    wallets_yaml = tmp_path / "wallets.yaml"
+    wallets_yaml.write_text("wallets: []\n")
+    settings = AppSettings(wallets_config=str(wallets_yaml))
+    calls = []
+    original = AppSettings.wallet_overrides
+
+    def counting(self):
+        calls.append(1)
+        return original(self)
+
+    monkeypatch.setattr(AppSettings, "wallet_overrides", counting)
+    index = PolicyIndex(settings, check_interval_sec=0.0)
+    for _ in range(100):
+        index.for_wallet("0x1")
+    assert len(calls) == 1
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+
+class FakeSource:
+    def __init__(self, name, table, fail=False):
+        self.name = name
+        self.table = table
+        self.fail = fail
+        self.calls: list[list[str]] = []
+
+    def prices(self, chain, addresses):
+        self.calls.append(list(addresses))
+        if self.fail:
+            raise RuntimeError("rate limited")
+        return {a: self.table[a] for a in addresses if a in self.table}
+
+
+def test_batched_lookup_with_fallback_source_and_ttl():
+    from trade_clone_engine.analytics.pricing import PriceService
+
+    primary = FakeSource("a", {"0xaa": 1.0})
+    secondary = FakeSource("b", {"0xbb": 2.0})
+    svc = PriceService(sources=[primary, secondary], ttl_sec=60, stale_sec=600)
+
+    assert svc.get_many(1, ["0xAA", "0xbb", "0xcc"]) == {"0xaa": 1.0, "0xbb": 2.0, "0xcc": None}
+    assert primary.calls == [["0xaa", "0xbb", "0xcc"]]
+    assert secondary.calls == [["0xbb", "0xcc"]]
+    # Cached, including the unpriced token
+    assert svc.get(1, "0xcc") is None and svc.get(1, "0xAA") == 1.0
+    assert len(primary.calls) == 1
+
+
+def test_stale_entries_served_while_refreshing():
+    import time
+
+    from trade_clone_engine.analytics.pricing import PriceService
+
+    source = FakeSource("a", {"0xaa": 1.0})
+    svc = PriceService(sources=[source], ttl_sec=0.01, stale_sec=600)
+    assert svc.get(1, "0xaa") == 1.0
+    source.table["0xaa"] = 3.0
+    time.sleep(0.02)
+    assert svc.get(1, "0xaa") == 1.0  # stale value, refresh scheduled
+    for _ in range(100):
+        if svc.get(1, "0xaa") == 3.0:
+            break
+        time.sleep(0.01)
+    assert svc.get(1, "0xaa") == 3.0
+
+    # A failing source keeps the last known price
+    source.fail = True
+    svc.stale_sec = 0
+    assert svc.get(1, "0xaa") == 3.0
+
+
+def test_failed_refresh_backs_off_and_caps_staleness():
+    import time
+
+    from trade_clone_engine.analytics.pricing import PriceService
+
+    source = FakeSource("a", {"0xaa": 1.0})
+    svc = PriceService(sources=[source], ttl_sec=0, stale_sec=0, retry_sec=600, max_stale_sec=600)
+    assert svc.get(1, "0xaa") == 1.0
+    source.fail = True
+    # The failure is remembered: later lookups serve the old price without a new request
+    assert [svc.get(1, "0xaa") for _ in range(3)] == [1.0, 1.0, 1.0]
+    assert len(source.calls) == 2
+
+    # Past max_stale_sec the old price is dropped rather than served
+    price, _ = svc._cache[(1, "0xaa")]
+    svc._cache[(1, "0xaa")] = (price, time.monotonic() - 601)
+    svc._retry_at.clear()
+    assert svc.get(1, "0xaa") is None
+
+
+def test_coingecko_batches_contract_addresses(monkeypatch):
+    from trade_clone_engine.analytics import pricing
+
+    seen = []
+
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"0xaa": {"usd": 1.5}, "0xbb": {"usd": 2.5}}
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        seen.append((url, params["contract_addresses"]))
+        return Resp()
+
+    monkeypatch.setattr(pricing.http_client, "get", fake_get)
+    out = pricing.CoinGeckoSource().prices(137, ["0xaa", "0xbb"])
+    assert out == {"0xaa": 1.5, "0xbb": 2.5}
+    assert seen == [
+        ("https://api.coingecko.com/api/v3/simple/token_price/polygon-pos", "0xaa,0xbb")
+    ]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+
+def test_bucket_rounds_down_to_significant_digits():
+    from trade_clone_engine.aggregators.cache import QuoteCache
+
+    cache = QuoteCache(amount_digits=3)
+    assert cache.bucket(123_456_789) == 123_000_000
+    assert cache.bucket(999) == 999
+    assert QuoteCache(amount_digits=0).bucket(123_456) == 123_456
+
+
+def test_concurrent_lookups_are_coalesced_and_cached():
+    import threading
+    import time
+
+    from trade_clone_engine.aggregators.cache import QuoteCache
+
+    cache = QuoteCache(ttl_sec=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"buyAmount": 5}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch(("k",), fetch)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"buyAmount": 5}] * 5
+    assert cache.get_or_fetch(("k",), fetch) == {"buyAmount": 5}
+    assert len(calls) == 1
+
+
+def test_zeroex_quotes_share_bucketed_cache(monkeypatch):
+    from trade_clone_engine.aggregators import zeroex
+    from trade_clone_engine.aggregators.cache import quote_cache
+
+    quote_cache.configure(ttl_sec=60, amount_digits=4)
+    seen = []
+
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"to": "0xr", "data": "0x", "value": "0", "buyAmount": "42"}
+
+    def fake_get(url, params=None, timeout=None):
+        seen.append(params["sellAmount"])
+        return Resp()
+
+    monkeypatch.setattr(zeroex.http_client, "get", fake_get)
+    a = zeroex.get_swap_quote("https://api.0x.org", 1, "0xA", "0xB", 1_234_567, "0xMe", 50)
+    b = zeroex.get_swap_quote("https://api.0x.org", 1, "0xa", "0xb", 1_234_999, "0xme", 50)
+    assert seen == ["1234000"]
+    assert a is b and a["sellAmount"] == 1_234_000
+    quote_cache.clear()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+
+def test_race_picks_best_and_records_latencies():
+    from trade_clone_engine.execution.quotes import Quote, QuoteEngine
+
+    def fail():
+        raise RuntimeError("boom")
+
+    engine = QuoteEngine(budget_ms=1000)
+    res = engine.race(
+        {
+            "uniswap_v2": lambda: Quote(venue="", amount_out=100),
+            "1inch": lambda: Quote(venue="", amount_out=120),
+            "0x": fail,
+            "empty": lambda: None,
+        }
+    )
+    assert res.best.venue == "1inch"
+    assert [q.venue for q in res.quotes] == ["uniswap_v2", "1inch"]
+    assert res.errors == {"0x": "boom", "empty": "no quote"}
+    assert set(res.latencies_ms) == {"uniswap_v2", "1inch", "0x", "empty"}
+    assert res.summary()["1inch"]["amount_out"] == "120"
+
+
+def test_race_ties_go_to_first_venue_and_slow_venues_time_out():
+    import time
+
+    from trade_clone_engine.execution.quotes import Quote, QuoteEngine
+
+    def slow():
+        time.sleep(0.5)
+        return Quote(venue="", amount_out=10**9)
+
+    engine = QuoteEngine(budget_ms=100)
+    res = engine.race(
+        {
+            "uniswap_v3": lambda: Quote(venue="", amount_out=50),
+            "uniswap_v2": lambda: Quote(venue="", amount_out=50),
+            "slow": slow,
+        }
+    )
+    assert res.best.venue == "uniswap_v3"
+    assert res.errors["slow"] == "timeout"
+
+
+def test_batch_venue_contributes_several_quotes():
+    from trade_clone_engine.execution.quotes import Quote, QuoteEngine
+
+    res = QuoteEngine(budget_ms=1000).race(
+        {
+            "onchain": lambda: [
+                Quote(venue="uniswap_v2", amount_out=90),
+                Quote(venue="uniswap_v3_500", amount_out=110),
+            ],
+            "0x": lambda: Quote(venue="", amount_out=100),
+        }
+    )
+    assert res.best.venue == "uniswap_v3_500"
+    assert [q.venue for q in res.quotes] == ["uniswap_v2", "uniswap_v3_500", "0x"]
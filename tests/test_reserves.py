@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+ROUTER = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
+FACTORY = (
+    "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f",
+    "0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f",
+)
+
+
+class FakeEth:
+    block_number = 100
+
+
+class FakeW3:
+    eth = FakeEth()
+
+
+class FakeReader:
+    """Answers getReserves/token0 pairs of calls from a {pair: (r0, r1, token0)} table."""
+
+    def __init__(self, table):
+        from web3 import Web3
+
+        from trade_clone_engine.execution.contracts import ContractRegistry
+
+        self.contracts = ContractRegistry(Web3())
+        self.table = table
+        self.batches = 0
+
+    def read(self, calls, block_identifier="latest"):
+        self.batches += 1
+        out = []
+        for fn in calls:
+            r0, r1, token0 = self.table.get(fn.address.lower(), (None, None, None))
+            if fn.fn_name == "getReserves":
+                out.append(None if r0 is None else (r0, r1, 0))
+            else:
+                out.append(token0)
+        return out
+
+
+def test_pair_address_matches_uniswap_create2():
+    from trade_clone_engine.execution.reserves import pair_address
+
+    assert pair_address(*FACTORY, WETH, USDC) == "0xB4e16d0168e52d35CaCD2c6185b44281Ec28C9Dc"
+
+
+def test_multi_hop_quote_and_sync_updates():
+    from trade_clone_engine.execution.reserves import SYNC_TOPIC, ReserveTracker, get_amount_out
+
+    tracker = ReserveTracker(
+        w3=FakeW3(), reader=None, factories={ROUTER: FACTORY}, fees_bps={ROUTER: 30}
+    )
+    usdc_weth = tracker.pair_for(ROUTER, USDC, WETH).lower()
+    weth_dai = tracker.pair_for(ROUTER, WETH, DAI).lower()
+    tracker.reader = FakeReader(
+        {
+            usdc_weth: (2_000_000 * 10**6, 1_000 * 10**18, USDC),
+            weth_dai: (2_000_000 * 10**18, 1_000 * 10**18, DAI),
+        }
+    )
+
+    out = tracker.amount_out(ROUTER, 1_000 * 10**6, [USDC, WETH, DAI])
+    mid = get_amount_out(1_000 * 10**6, 2_000_000 * 10**6, 1_000 * 10**18)
+    assert out == get_amount_out(mid, 1_000 * 10**18, 2_000_000 * 10**18)
+    assert tracker.reader.batches == 1
+
+    # A Sync at or before the seed block is already reflected; later ones replace reserves
+    data = "0x" + f"{10**12:064x}" + f"{10**18:064x}"
+    log = {"address": usdc_weth, "topics": ["0x" + SYNC_TOPIC], "data": data, "blockNumber": 100}
+    tracker.apply_log(log)
+    assert tracker.amount_out(ROUTER, 10**6, [USDC, WETH]) == get_amount_out(
+        10**6, 2_000_000 * 10**6, 1_000 * 10**18
+    )
+    tracker.apply_log({**log, "blockNumber": 101, "logIndex": 3})
+    assert tracker.amount_out(ROUTER, 10**6, [USDC, WETH]) == get_amount_out(10**6, 10**12, 10**18)
+    # A second swap in the same block wins; replayed or earlier logs are ignored
+    later = "0x" + f"{2 * 10**12:064x}" + f"{10**18 // 2:064x}"
+    tracker.apply_log({**log, "data": later, "blockNumber": 101, "logIndex": 7})
+    tracker.apply_log({**log, "blockNumber": 101, "logIndex": 3})
+    tracker.apply_log({**log, "blockNumber": 101, "logIndex": 5})
+    assert tracker.amount_out(ROUTER, 10**6, [USDC, WETH]) == get_amount_out(
+        10**6, 2 * 10**12, 10**18 // 2
+    )
+    assert tracker.reader.batches == 1
+
+
+def test_unknown_router_or_missing_pair_falls_back():
+    from trade_clone_engine.execution.reserves import ReserveTracker
+
+    tracker = ReserveTracker(
+        w3=FakeW3(), reader=FakeReader({}), factories={ROUTER: FACTORY}, fees_bps={ROUTER: 30}
+    )
+    assert tracker.amount_out("0x0000000000000000000000000000000000000001", 1, [USDC, WETH]) is None
+    assert tracker.amount_out(ROUTER, 1, [USDC, WETH]) is None
+    # A fork whose fee is not configured is never quoted locally
+    unpriced = ReserveTracker(w3=FakeW3(), reader=FakeReader({}), factories={ROUTER: FACTORY})
+    assert not unpriced.supports(ROUTER)
+
+
+def test_pair_seeded_during_poll_gets_its_missed_logs():
+    from types import SimpleNamespace
+
+    from trade_clone_engine.execution.reserves import ReserveTracker
+
+    queries = []
+    eth = SimpleNamespace(block_number=100)
+    tracker = ReserveTracker(
+        w3=SimpleNamespace(eth=eth), reader=None, factories={ROUTER: FACTORY}, fees_bps={ROUTER: 30}
+    )
+    usdc_weth = tracker.pair_for(ROUTER, USDC, WETH).lower()
+    weth_dai = tracker.pair_for(ROUTER, WETH, DAI).lower()
+    tracker.reader = FakeReader({usdc_weth: (10, 20, USDC), weth_dai: (30, 40, DAI)})
+    tracker.seed([usdc_weth])
+
+    def get_logs(query):
+        queries.append(query)
+        if len(queries) == 1:
+            # The executor seeds another pair at block 101 while the poll is in flight
+            eth.block_number = 101
+            tracker.seed([weth_dai])
+            eth.block_number = 105
+        return []
+
+    eth.get_logs = get_logs
+    eth.block_number = 105
+    tracker.poll()
+    tracker.poll()
+    assert (queries[0]["fromBlock"], queries[0]["toBlock"]) == (101, 105)
+    assert len(queries[0]["address"]) == 1
+    # The second poll replays from the new pair's seed block, for both pairs
+    assert (queries[1]["fromBlock"], queries[1]["toBlock"]) == (102, 105)
+    assert {a.lower() for a in queries[1]["address"]} == {usdc_weth, weth_dai}
+
+
+def test_missing_pairs_are_cached_and_idle_pairs_evicted(monkeypatch):
+    from types import SimpleNamespace
+
+    from trade_clone_engine.execution import reserves
+    from trade_clone_engine.execution.reserves import ReserveTracker
+
+    queries = []
+    eth = SimpleNamespace(block_number=100, get_logs=lambda q: queries.append(q) or [])
+    tracker = ReserveTracker(
+        w3=SimpleNamespace(eth=eth),
+        reader=None,
+        factories={ROUTER: FACTORY},
+        fees_bps={ROUTER: 30},
+        idle_sec=60,
+        max_pairs=2,
+    )
+    usdc_weth = tracker.pair_for(ROUTER, USDC, WETH).lower()
+    weth_dai = tracker.pair_for(ROUTER, WETH, DAI).lower()
+    tracker.reader = FakeReader({usdc_weth: (10, 20, USDC), weth_dai: (30, 40, DAI)})
+
+    # No USDC/DAI pair: looked up once, then answered from the missing-pair cache
+    assert tracker.amount_out(ROUTER, 1, [USDC, DAI]) is None
+    assert tracker.amount_out(ROUTER, 1, [USDC, DAI]) is None
+    assert tracker.reader.batches == 1
+
+    assert tracker.amount_out(ROUTER, 10, [USDC, WETH, DAI]) is not None
+    assert tracker.reader.batches == 2
+
+    # Log queries are split into chunks of addresses
+    monkeypatch.setattr(reserves, "LOG_ADDRESSES_PER_QUERY", 1)
+    eth.block_number = 101
+    tracker.poll()
+    assert sorted(len(q["address"]) for q in queries) == [1, 1]
+
+    # Past max_pairs the least recently used pair goes; past idle_sec every unused one
+    tracker._used[usdc_weth] -= 30
+    tracker.max_pairs = 1
+    assert tracker.evict() == 1 and set(tracker._pairs) == {weth_dai}
+    assert tracker.evict(tracker._used[weth_dai] + 61) == 1 and not tracker._pairs
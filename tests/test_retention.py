@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+
+def test_partition_bounds_and_expiry():
+    from datetime import datetime
+
+    from trade_clone_engine.retention import Partition, expired, month_start, parse_upper_bound
+
+    assert month_start(datetime(2026, 12, 17, 9, 30)) == datetime(2026, 12, 1)
+    assert month_start(datetime(2026, 12, 17), 1) == datetime(2027, 1, 1)
+    assert month_start(datetime(2026, 1, 5), -1) == datetime(2025, 12, 1)
+
+    bound = "FOR VALUES FROM ('2026-01-01 00:00:00') TO ('2026-02-01 00:00:00')"
+    assert parse_upper_bound(bound) == datetime(2026, 2, 1)
+    assert parse_upper_bound("FOR VALUES FROM (MINVALUE) TO ('2025-11-01 00:00:00')") == datetime(
+        2025, 11, 1
+    )
+    assert parse_upper_bound("DEFAULT") is None
+
+    parts = [
+        Partition("t_legacy", datetime(2025, 11, 1)),
+        Partition("t_2025_11", datetime(2025, 12, 1)),
+        Partition("t_2025_12", datetime(2026, 1, 1)),
+        Partition("t_default", None),
+    ]
+    # A partition only expires once its last possible row is past the cutoff
+    assert [p.name for p in expired(parts, datetime(2025, 12, 15))] == ["t_legacy", "t_2025_11"]
+
+
+def test_retention_creates_ahead_then_archives_before_dropping(monkeypatch, tmp_path):
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    import pytest
+
+    from trade_clone_engine import retention
+    from trade_clone_engine.retention import Partition, RetentionJob
+
+    existing = {
+        "observed_trades": [
+            Partition("observed_trades_legacy", datetime(2026, 8, 1)),
+            Partition("observed_trades_2026_08", datetime(2026, 9, 1)),
+            Partition("observed_trades_default", None),
+        ],
+        "executed_trades": [
+            Partition("executed_trades_legacy", datetime(2026, 8, 1)),
+            Partition("executed_trades_default", None),
+        ],
+    }
+    calls: list[tuple] = []
+
+    class FakeConn:
+        def execute(self, stmt, params=None):
+            sql = str(stmt).strip()
+            calls.append(("sql", sql))
+            if "executed_trades_2026_10" in sql:
+                raise RuntimeError("lock timeout")
+            # October observed trades piled up in the default partition
+            stranded = "FROM observed_trades_default" in sql and "'2026-10-01'" in sql
+            return SimpleNamespace(scalar=lambda: stranded, rowcount=4)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    engine = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"), begin=FakeConn, connect=FakeConn
+    )
+    monkeypatch.setattr(retention, "list_partitions", lambda conn, parent: existing[parent])
+
+    def fake_write(conn, parent, partition, path, batch_rows):
+        calls.append(("archive", partition))
+        if partition == "executed_trades_legacy":
+            raise RuntimeError("disk full")
+        path.write_bytes(b"PAR1")
+        return 3
+
+    monkeypatch.setattr(retention, "write_parquet", fake_write)
+    job = RetentionJob(engine, archive_dir=str(tmp_path), retention_days=30, months_ahead=1)
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        job.run_once(datetime(2026, 10, 19))
+
+    sql = [c[1] for c in calls if c[0] == "sql"]
+    # October and November partitions are created; months covered by existing ranges are not
+    assert any("observed_trades_2026_10 PARTITION OF observed_trades" in s for s in sql)
+    assert any("FROM ('2026-11-01') TO ('2026-12-01')" in s for s in sql)
+    assert not any("observed_trades_2026_08 PARTITION OF" in s for s in sql)
+
+    # Rows stranded in the default partition are moved into the new month
+    october = [
+        s for s in sql if "observed_trades_2026_10" in s or "PARTITION observed_trades_default" in s
+    ]
+    assert [s.split(" WHERE ")[0] for s in october] == [
+        "ALTER TABLE observed_trades DETACH PARTITION observed_trades_default",
+        "CREATE TABLE IF NOT EXISTS observed_trades_2026_10 PARTITION OF observed_trades "
+        "FOR VALUES FROM ('2026-10-01') TO ('2026-11-01')",
+        "INSERT INTO observed_trades_2026_10 SELECT * FROM observed_trades_default",
+        "ALTER TABLE observed_trades ATTACH PARTITION observed_trades_default DEFAULT",
+    ]
+    assert (
+        "DELETE FROM observed_trades_default WHERE leader_block_time >= '2026-10-01'"
+        in " ".join(sql)
+    )
+    # A month that cannot be created does not stop the others or archiving
+    assert any("executed_trades_2026_11 PARTITION OF" in s for s in sql)
+
+    # Expired observed partitions are archived then dropped, oldest first
+    order = [
+        c
+        for c in calls
+        if c[0] == "archive" or ("DETACH" in c[1] or "DROP" in c[1]) and "_default" not in c[1]
+    ]
+    assert order[:4] == [
+        ("archive", "observed_trades_legacy"),
+        ("sql", "ALTER TABLE observed_trades DETACH PARTITION observed_trades_legacy"),
+        ("sql", "DROP TABLE observed_trades_legacy"),
+        ("archive", "observed_trades_2026_08"),
+    ]
+    assert (tmp_path / "observed_trades" / "observed_trades_2026_08.parquet").exists()
+    assert not any("DROP TABLE observed_trades_default" in s for s in sql)
+    # A partition whose archive failed is kept
+    assert not any("executed_trades_legacy" in s for s in sql)
+    assert not list((tmp_path / "executed_trades").glob("*.parquet"))
+
+
+def test_retention_is_a_noop_without_partitioning():
+    from types import SimpleNamespace
+
+    from trade_clone_engine.retention import RetentionJob
+
+    engine = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+    assert RetentionJob(engine).run_once() == 0
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+
+class FakeEth:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = []
+        self.overrides = []
+
+    def call(self, tx, block, state_override=None):
+        self.calls.append(tx)
+        self.overrides.append(state_override)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class FakeW3:
+    def __init__(self, outcome):
+        self.eth = FakeEth(outcome)
+
+
+def test_simulate_evm_reads_output_and_separates_reverts_from_rpc_errors():
+    from eth_abi import encode
+    from web3.exceptions import ContractLogicError
+
+    from trade_clone_engine.execution.simulation import shortfall_bps, simulate_evm
+
+    tx = {"to": "0xr", "data": "0xdead", "value": 0, "gas": 1, "nonce": 3}
+    w3 = FakeW3(encode(["uint256[]"], [[1000, 250, 990]]))
+    sim = simulate_evm(w3, tx, "0xme", "uint256[]")
+    assert sim.amount_out == 990 and not sim.reverted
+    assert w3.eth.calls == [{"to": "0xr", "data": "0xdead", "value": 0, "from": "0xme"}]
+
+    sim = simulate_evm(FakeW3(ContractLogicError("execution reverted: STF")), tx, "0xme")
+    assert sim.reverted and "STF" in sim.error
+    sim = simulate_evm(FakeW3(TimeoutError("rpc down")), tx, "0xme")
+    assert not sim.reverted and sim.amount_out is None
+
+    assert shortfall_bps(9_000, 10_000) == 1000
+    assert shortfall_bps(11_000, 10_000) == 0
+
+
+def test_executor_skips_swaps_that_revert_or_fall_short_in_simulation():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from eth_abi import encode
+    from web3.exceptions import ContractLogicError
+
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.execution.evm_executor import EvmExecutor, ExecutionResult
+    from trade_clone_engine.execution.quotes import Quote
+
+    prepared = []
+
+    class Wallet:
+        address = "0xme"
+
+        def __init__(self, outcome):
+            self.w3 = FakeW3(outcome)
+
+        def prepare_tx(self, tx, gas_key=None):
+            prepared.append(gas_key)
+            return tx
+
+    ex = EvmExecutor.__new__(EvmExecutor)
+    ex.settings = AppSettings(simulate_max_shortfall_bps=300)
+    ex._sim_pool = ThreadPoolExecutor(max_workers=1)
+    quote = Quote(venue="uniswap_v3", amount_out=1000, gas_key=("k",), returns="uint256")
+
+    cases = [
+        (encode(["uint256"], [980]), None),
+        (encode(["uint256"], [900]), "1000 bps below uniswap_v3 quote"),
+        (ContractLogicError("execution reverted: Too little received"), "Too little received"),
+    ]
+    for outcome, error in cases:
+        ex.wallet = Wallet(outcome)
+        res = ExecutionResult()
+        skipped = ex._simulate({"to": "0xr", "data": "0x"}, quote, res)
+        assert skipped == (error is not None)
+        assert (error or "") in (res.error or "")
+    assert prepared == [("k",)] * 3
+
+
+def test_executor_simulates_before_paying_for_an_approval():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from web3.exceptions import ContractLogicError
+
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.execution.evm_executor import (
+        EvmExecutor,
+        ExecutionResult,
+        TradeIntent,
+    )
+    from trade_clone_engine.execution.quotes import Quote, QuoteResult
+
+    override = {"0xtok": {"stateDiff": {"0x01": "0x02"}}}
+    approved = []
+
+    class Allowances:
+        def needs_approval(self, token, spender, amount):
+            return True
+
+        def state_override(self, token, spender, amount):
+            return override
+
+        def ensure(self, token, spender, amount):
+            approved.append(token)
+
+    class Wallet:
+        address = "0xme"
+        w3 = FakeW3(ContractLogicError("execution reverted: Too little received"))
+
+    quote = Quote(venue="uniswap_v2", amount_out=1000, spender="0xrouter", tx={"to": "0xr"})
+    ex = EvmExecutor.__new__(EvmExecutor)
+    ex.settings = AppSettings(dry_run=False)
+    ex._sim_pool = ThreadPoolExecutor(max_workers=1)
+    ex.wallet = Wallet()
+    ex.allowances = Allowances()
+    ex.quotes = type("Q", (), {"race": lambda self, venues: QuoteResult(best=quote)})()
+    ex._venues = lambda intent, slippage_bps: []
+    intent = TradeIntent(
+        method="swap", router="0xr", token_in="0xtok", token_out="0xout", amount_in=10
+    )
+    policy = type("P", (), {"slippage_bps": 100})()
+
+    res = ExecutionResult()
+    ex._execute(intent, policy, res)
+    assert "Too little received" in res.error
+    assert Wallet.w3.eth.overrides == [override]
+    assert approved == []
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 
 def test_solana_backfill_inserts_observed_trades(tmp_path, monkeypatch):
+    from datetime import datetime
+
     from trade_clone_engine.chains.solana_watcher import SolanaWatcher
     from trade_clone_engine.config import AppSettings
     from trade_clone_engine.db import (
@@ -37,9 +39,18 @@ wallets:
             self.calls.append(("sigs", addr, before, limit))
             # First page: two signatures; then empty
             if before is None:
-                return {"result": [{"signature": "sig1"}, {"signature": "sig2"}]}
+                return {
+                    "result": [
+                        {"signature": "sig1", "blockTime": 1_700_000_000},
+                        {"signature": "sig2"},
+                    ]
+                }
             return {"result": []}
 
+        def get_block_time(self, slot):
+            self.calls.append(("block_time", slot))
+            return {"result": 1_700_000_400}
+
         def get_transaction(self, sig, max_supported_transaction_version=0):
             self.calls.append(("tx", sig))
             # Create a simple pre/post delta for the same owner
@@ -73,3 +84,9 @@ wallets:
         # Ensure chain and wallet set
         assert all(r.chain == "solana" for r in rows)
         assert all(r.wallet == owner for r in rows)
+        # The block time is part of the dedupe key, so it always comes from the chain
+        times = {r.tx_hash: r.leader_block_time for r in rows}
+        assert times == {
+            "sig1": datetime(2023, 11, 14, 22, 13, 20),
+            "sig2": datetime(2023, 11, 14, 22, 20),
+        }
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+OWNER = "Owner1111111111111111111111111111111111111"
+SIG_OK = "5" * 88
+SIG_ERR = "4" * 88
+SIG_LOST = "3" * 88
+
+
+class FakeClient:
+    def __init__(self):
+        self.statuses = {
+            SIG_OK: {"confirmationStatus": "confirmed", "err": None},
+            SIG_ERR: {"confirmationStatus": "confirmed", "err": {"InstructionError": [0, 1]}},
+        }
+        self.status_calls = 0
+
+    def get_signature_statuses(self, signatures):
+        self.status_calls += 1
+        return {"result": {"value": [self.statuses.get(str(s)) for s in signatures]}}
+
+    def get_transaction(self, signature, max_supported_transaction_version=0):
+        balance = {"owner": OWNER, "mint": "M", "uiTokenAmount": {"amount": "100"}}
+        after = {**balance, "uiTokenAmount": {"amount": "350"}}
+        return {"result": {"meta": {"preTokenBalances": [balance], "postTokenBalances": [after]}}}
+
+
+def test_tracker_resolves_pending_swaps_in_one_status_call(tmp_path):
+    from trade_clone_engine.db import (
+        Base,
+        ExecutedTrade,
+        ObservedTrade,
+        make_engine,
+        make_session_factory,
+        session_scope,
+    )
+    from trade_clone_engine.execution.solana_confirmations import SignatureTracker
+
+    db_url = f"sqlite+pysqlite:///{tmp_path / 'sol.db'}"
+    Base.metadata.create_all(make_engine(db_url))
+    SessionFactory = make_session_factory(db_url)
+    with session_scope(SessionFactory) as s:
+        obs = ObservedTrade(chain="solana", tx_hash="x", block_number=1, wallet="w")
+        s.add(obs)
+        s.flush()
+        for sig in (SIG_OK, SIG_ERR, SIG_LOST):
+            s.add(
+                ExecutedTrade(
+                    observed_trade_id=obs.id, status="pending", tx_hash=sig, chain="solana"
+                )
+            )
+
+    client = FakeClient()
+    tracker = SignatureTracker(client, SessionFactory, owner=OWNER, timeout_sec=60)
+    assert tracker.resume() == 3
+    tracker.poll_once()
+    assert client.status_calls == 1
+    assert tracker.in_flight() == 1  # SIG_LOST not seen yet, still within the timeout
+
+    tracker.timeout_sec = 0
+    tracker.poll_once()
+    assert tracker.in_flight() == 0
+
+    with session_scope(SessionFactory) as s:
+        rows = {r.tx_hash: r for r in s.query(ExecutedTrade).all()}
+        assert rows[SIG_OK].status == "success" and rows[SIG_OK].amount_out_wei == 250
+        assert rows[SIG_OK].confirmed_at is not None
+        assert rows[SIG_ERR].status == "failed" and "InstructionError" in rows[SIG_ERR].error
+        assert rows[SIG_LOST].status == "failed" and rows[SIG_LOST].confirmed_at is None
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+WSOL = "So11111111111111111111111111111111111111112"
+USDC = "EPjFWvd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+def test_recorded_amount_is_the_quoted_amount(monkeypatch):
+    from trade_clone_engine.aggregators import jupiter
+    from trade_clone_engine.config import AppSettings
+    from trade_clone_engine.db import ObservedTrade
+    from trade_clone_engine.execution.policy import WalletPolicy
+    from trade_clone_engine.execution.solana_executor import SolanaExecutor
+
+    quoted = []
+
+    def get_quote(url, input_mint, output_mint, amount, slippage_bps):
+        quoted.append(amount)
+        return {"inAmount": str(amount)}
+
+    monkeypatch.setattr(jupiter, "get_quote", get_quote)
+    policy = WalletPolicy(copy_ratio=0.5, slippage_bps=100, max_native_in_wei=0)
+    ex = SolanaExecutor(
+        settings=AppSettings(dry_run=True, quote_amount_digits=4),
+        client=None,
+        keypair=None,
+        pubkey=None,
+        policies=type("P", (), {"for_wallet": lambda self, wallet: policy})(),
+    )
+    rec = ObservedTrade(wallet="w", token_in=WSOL, token_out=USDC, amount_in_wei=2_469_135)
+
+    res = ex._execute(rec, claimed_at=None)
+    assert quoted == [1_234_000]
+    assert res.amount_in == 1_234_000 and ex._record(rec, res).amount_in_wei == 1_234_000
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+
+def test_priority_fee_percentile_clamped_and_cached_per_slot_window(monkeypatch):
+    from trade_clone_engine.execution import solana_fees
+
+    posts = []
+
+    class Resp:
+        content = b'{"jsonrpc": "2.0", "id": 1, "result": []}'
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            # Oldest slot's high fee falls outside the lookback window
+            fees = [{"slot": 100, "prioritizationFee": 900_000}]
+            fees += [{"slot": 100 + i, "prioritizationFee": i * 1000} for i in range(1, 11)]
+            return {"jsonrpc": "2.0", "id": 1, "result": fees}
+
+    def fake_post(url, json=None, timeout=None, retries=None):
+        posts.append(json["params"][0])
+        return Resp()
+
+    monkeypatch.setattr(solana_fees.http_client, "post", fake_post)
+    route = {
+        "inputMint": "MintA",
+        "outputMint": "MintB",
+        "routePlan": [{"swapInfo": {"ammKey": "Pool1"}}, {"swapInfo": {"ammKey": "Pool1"}}],
+    }
+    accounts = solana_fees.route_accounts(route)
+    assert accounts == ["Pool1", "MintA", "MintB"]
+
+    est = solana_fees.PriorityFeeEstimator(
+        "http://rpc", percentile=50, lookback_slots=10, min_micro_lamports=500
+    )
+    assert est.estimate(accounts) == 5000
+    assert est.estimate(list(reversed(accounts))) == 5000
+    assert len(posts) == 1
+
+    est.max_micro_lamports = 2000
+    est.window_slots = 0
+    assert est.estimate(accounts) == 2000
+    assert len(posts) == 2
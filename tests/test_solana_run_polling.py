@@ -2,6 +2,8 @@ from __future__ import annotations
 
 
 def test_solana_run_processes_one_iteration_and_inserts(tmp_path, monkeypatch):
+    from datetime import datetime
+
     from trade_clone_engine.chains.solana_watcher import SolanaWatcher
     from trade_clone_engine.config import AppSettings
     from trade_clone_engine.db import (
@@ -33,11 +35,15 @@ wallets:
 
         def get_signatures_for_address(self, addr, limit=100):
             self.calls += 1
-            if self.calls == 1:
+            if self.calls <= 2:
                 return {"result": [{"signature": "sigX"}]}
             # Raise KeyboardInterrupt to stop the while loop on next iteration
             raise KeyboardInterrupt
 
+        def get_block_time(self, slot):
+            # Not known to the node on the first poll; the signature is retried
+            return {"result": 1_700_000_000 if self.calls > 1 else None}
+
         def get_transaction(self, sig, max_supported_transaction_version=0):
             mint_in = "So11111111111111111111111111111111111111112"
             pre = [{"owner": owner, "mint": mint_in, "uiTokenAmount": {"amount": "300"}}]
@@ -59,6 +65,7 @@ wallets:
         assert len(rows) == 1
         assert rows[0].wallet == owner
         assert rows[0].chain == "solana"
+        assert rows[0].leader_block_time == datetime(2023, 11, 14, 22, 13, 20)
 
 
 def test_solana_run_no_wallets_returns(monkeypatch):
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import base64
+import struct
+
+
+def _transfer(payer):
+    from solders.pubkey import Pubkey
+    from solders.system_program import TransferParams, transfer
+
+    return transfer(TransferParams(from_pubkey=payer, to_pubkey=Pubkey.new_unique(), lamports=1))
+
+
+def test_sign_transaction_detects_legacy_and_v0_messages():
+    from solders.hash import Hash
+    from solders.keypair import Keypair
+    from solders.message import Message, MessageV0
+    from solders.signature import Signature
+    from solders.transaction import VersionedTransaction
+
+    from trade_clone_engine.execution.solana_signing import message_version, sign_transaction
+
+    kp = Keypair()
+    ix = _transfer(kp.pubkey())
+    for message, version in (
+        (Message.new_with_blockhash([ix], kp.pubkey(), Hash.new_unique()), None),
+        (MessageV0.try_compile(kp.pubkey(), [ix], [], Hash.new_unique()), 0),
+    ):
+        # Jupiter returns transactions with an empty (default) signature slot
+        unsigned = bytes(VersionedTransaction.populate(message, [Signature.default()]))
+        assert message_version(unsigned) == version
+        signed = sign_transaction(unsigned, kp)
+        assert message_version(signed) == version
+        tx = VersionedTransaction.from_bytes(signed)
+        assert tx.verify_with_results() == [True]
+
+
+def test_swap_builder_compiles_v0_tx_with_cached_blockhash_and_lookup_tables():
+    from solders.hash import Hash
+    from solders.instruction import AccountMeta
+    from solders.keypair import Keypair
+    from solders.pubkey import Pubkey
+    from solders.transaction import VersionedTransaction
+
+    from trade_clone_engine.execution.solana_signing import SwapBuilder
+
+    kp = Keypair()
+    blockhash = Hash.new_unique()
+    table_key = Pubkey.new_unique()
+    pool = Pubkey.new_unique()
+    # Lookup table account: 56 byte header, then the addresses
+    header = struct.pack("<IQQB", 1, 2**64 - 1, 0, 0) + b"\x00" * 35
+    table_data = header + bytes(pool)
+
+    class FakeClient:
+        def __init__(self):
+            self.calls = []
+
+        def get_latest_blockhash(self):
+            self.calls.append("blockhash")
+            return {"result": {"value": {"blockhash": str(blockhash)}}}
+
+        def get_multiple_accounts(self, keys):
+            self.calls.append("tables")
+            data = base64.b64encode(table_data).decode()
+            return {"result": {"value": [{"data": [data, "base64"]} for _ in keys]}}
+
+    ix = _transfer(kp.pubkey())
+
+    def as_jupiter(instruction, extra=()):
+        metas = [
+            {"pubkey": str(m.pubkey), "isSigner": m.is_signer, "isWritable": m.is_writable}
+            for m in list(instruction.accounts) + list(extra)
+        ]
+        return {
+            "programId": str(instruction.program_id),
+            "accounts": metas,
+            "data": base64.b64encode(bytes(instruction.data)).decode(),
+        }
+
+    resp = {
+        "computeBudgetInstructions": [],
+        "setupInstructions": [as_jupiter(ix)],
+        "swapInstruction": as_jupiter(ix, [AccountMeta(pool, False, True)]),
+        "addressLookupTableAddresses": [str(table_key)],
+    }
+    client = FakeClient()
+    builder = SwapBuilder(client)
+    tx = VersionedTransaction.from_bytes(builder.build(resp, kp))
+    assert tx.verify_with_results() == [True]
+    assert tx.message.recent_blockhash == blockhash
+    assert len(tx.message.instructions) == 2
+    # The pool is loaded through the lookup table rather than listed in the message
+    assert pool not in tx.message.account_keys
+    assert tx.message.address_table_lookups[0].account_key == table_key
+
+    builder.build(resp, kp)
+    assert sorted(client.calls) == ["blockhash", "tables"]
+
+    # Tables are refetched once their TTL has passed
+    builder.table_ttl_sec = 0
+    builder.build(resp, kp)
+    assert client.calls.count("tables") == 2
@@ -25,7 +25,7 @@ def test_dune_source_parses_rows(monkeypatch):
         payload = {"result": {"rows": [{"wallet": "0xAbCdE"}, {"address": "0x1234"}]}}
         return FakeResp(payload)
 
-    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.get", fake_get)
     src = DuneSource(api_key="k", query_id=1)
     out = src.top_wallets(limit=5)
     addrs = {w["address"] for w in out}
@@ -51,7 +51,7 @@ def test_nansen_generic_fallback(monkeypatch):
     def fake_get(url, headers=None, timeout=None):
         return FakeResp()
 
-    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.get", fake_get)
     src = NansenSource(
         api_key="k", base_url="https://api.nansen.ai/api/v1", endpoint_path="anything"
     )
@@ -73,7 +73,7 @@ def test_nansen_error_returns_empty(monkeypatch):
     def fake_get(url, headers=None, timeout=None):
         return FakeResp()
 
-    monkeypatch.setattr("requests.get", fake_get)
+    monkeypatch.setattr("trade_clone_engine.http_client.http_client.get", fake_get)
     src = NansenSource(
         api_key="k",
         base_url="https://api.nansen.ai/api/v1",
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+
+def _value(name: str, **labels) -> float:
+    from prometheus_client import REGISTRY
+
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_declared_metrics_render_in_prometheus_text():
+    from trade_clone_engine.telemetry import QUEUE_DEPTH, QUOTE_LATENCY, render
+
+    QUEUE_DEPTH.labels(chain='evm"1').set(3)
+    QUOTE_LATENCY.labels(venue="test-venue").observe(0.05)
+    QUOTE_LATENCY.labels(venue="test-venue").observe(0.5)
+
+    text = render().decode()
+    assert "# TYPE tce_queue_depth gauge" in text
+    assert 'tce_queue_depth{chain="evm\\"1"} 3.0' in text
+    assert 'tce_quote_latency_seconds_bucket{le="0.1",venue="test-venue"} 1.0' in text
+    assert 'tce_quote_latency_seconds_count{venue="test-venue"} 2.0' in text
+
+
+def test_metrics_server_and_rpc_instrumentation():
+    import urllib.request
+    from types import SimpleNamespace
+
+    import pytest
+    from web3 import Web3
+    from web3.providers.base import BaseProvider
+
+    from trade_clone_engine.providers.instrumentation import (
+        InstrumentedClient,
+        configure_rpc_metrics,
+        instrument_web3,
+        rpc_component,
+        rpc_summary,
+    )
+    from trade_clone_engine.telemetry import start_metrics_server
+
+    class Provider(BaseProvider):
+        def make_request(self, method, params):
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x10"}
+
+        def is_connected(self, show_traceback=False):
+            return True
+
+    w3 = instrument_web3(Web3(Provider()), "evm:99", "executor")
+    labels = {"chain": "evm:99", "method": "eth_blockNumber", "component": "executor"}
+    # Payloads are only sized when byte sampling is enabled
+    assert w3.eth.block_number == 16
+    assert _value("tce_rpc_bytes_total", direction="received", **labels) == 0
+    configure_rpc_metrics(SimpleNamespace(rpc_bytes_sample_rate=1.0))
+    try:
+        assert w3.eth.block_number == 16
+    finally:
+        configure_rpc_metrics(SimpleNamespace(rpc_bytes_sample_rate=0))
+    with rpc_component("receipts"):
+        assert w3.eth.block_number == 16
+    assert _value("tce_rpc_calls_total", **labels) == 2
+    assert _value("tce_rpc_calls_total", **{**labels, "component": "receipts"}) == 1
+    assert _value("tce_rpc_latency_seconds_count", **labels) == 2
+    assert _value("tce_rpc_bytes_total", direction="received", **labels) > 0
+    assert _value("tce_rpc_errors_total", **labels) == 0
+
+    class SolClient:
+        endpoint = "http://sol"
+
+        def get_slot(self):
+            return {"result": 5}
+
+        def get_balance(self, key):
+            raise ConnectionError("down")
+
+    client = InstrumentedClient(SolClient(), "watcher", chain="solana-test")
+    assert client.get_slot() == {"result": 5} and client.endpoint == "http://sol"
+    with pytest.raises(ConnectionError):
+        client.get_balance("x")
+    sol = {"chain": "solana-test", "component": "watcher"}
+    assert _value("tce_rpc_calls_total", method="get_slot", **sol) == 1
+    assert _value("tce_rpc_errors_total", method="get_balance", **sol) == 1
+    summary = {(r["chain"], r["method"]): r for r in rpc_summary(top=0)}
+    assert summary[("solana-test", "get_balance")]["errors"] == 1
+    assert summary[("evm:99", "eth_blockNumber")]["calls"] >= 1
+
+    server = start_metrics_server(0)
+    assert server is None
+    server = start_metrics_server(_free_port())
+    try:
+        port = server.server_address[1]
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+        assert (
+            'tce_rpc_calls_total{chain="solana-test",component="watcher",method="get_slot"} 1.0'
+            in body
+        )
+    finally:
+        server.shutdown()
+
+
+def _free_port() -> int:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
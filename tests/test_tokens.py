@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+NOT_A_TOKEN = "0x000000000000000000000000000000000000dEaD"
+
+
+class FakeReader:
+    def __init__(self):
+        from web3 import Web3
+
+        from trade_clone_engine.execution.contracts import ContractRegistry
+
+        self.contracts = ContractRegistry(Web3())
+        self.batches = []
+        self.down: set[str] = set()  # addresses whose calls fail in transport
+
+    def read(self, calls, block_identifier="latest", failed=None):
+        self.batches.append(len(calls))
+        answers = {
+            USDC: {"decimals": 6, "symbol": "USDC"},
+            DAI: {"decimals": 18, "symbol": "DAI"},
+        }
+        return [
+            failed if fn.address in self.down else answers.get(fn.address, {}).get(fn.fn_name)
+            for fn in calls
+        ]
+
+
+def _session_factory(tmp_path):
+    from trade_clone_engine.db import Base, make_engine, make_session_factory
+
+    db_url = f"sqlite+pysqlite:///{tmp_path / 'tokens.db'}"
+    Base.metadata.create_all(make_engine(db_url))
+    return make_session_factory(db_url)
+
+
+def test_evm_metadata_fetched_once_and_persisted(tmp_path):
+    from trade_clone_engine.analytics.tokens import TokenMetadataCache, chain_key, to_units
+
+    SessionFactory = _session_factory(tmp_path)
+    reader = FakeReader()
+    cache = TokenMetadataCache(SessionFactory, evm_reader=reader)
+    chain = chain_key(1)
+
+    metas = cache.get_many(chain, [USDC, NOT_A_TOKEN])
+    assert metas[USDC.lower()].decimals == 6 and metas[USDC.lower()].symbol == "USDC"
+    assert metas[NOT_A_TOKEN.lower()].decimals is None
+    assert cache.decimals(chain, USDC.lower()) == 6
+    assert reader.batches == [4]
+    assert to_units(2_500_000, 6) == 2.5
+
+    # A fresh process reads the table instead of the chain
+    other = TokenMetadataCache(SessionFactory, evm_reader=FakeReader())
+    assert other.decimals(chain, USDC) == 6
+    assert other.decimals(chain, NOT_A_TOKEN) is None
+    assert other.evm_reader.batches == []
+    assert other.decimals(chain, None) == 18
+
+
+def test_solana_mint_decimals_from_account_data(tmp_path):
+    import base64
+
+    from trade_clone_engine.analytics.tokens import TokenMetadataCache
+
+    mint = "Es9vMFrzaCERmJfrF4H2FYxTea7PhYRYrRyYLfnLKz7j"
+    data = bytes(44) + bytes([6]) + bytes(37)
+
+    class FakeClient:
+        def __init__(self):
+            self.calls = 0
+
+        def get_multiple_accounts(self, pubkeys):
+            self.calls += 1
+            return {"result": {"value": [{"data": [base64.b64encode(data).decode(), "base64"]}]}}
+
+    client = FakeClient()
+    cache = TokenMetadataCache(_session_factory(tmp_path), sol_client=client)
+    assert cache.decimals("solana", mint) == 6
+    assert cache.decimals("solana", mint) == 6
+    assert client.calls == 1
+
+
+def test_transient_failures_are_not_cached(tmp_path):
+    from trade_clone_engine.analytics.tokens import TokenMetadataCache, chain_key
+    from trade_clone_engine.db import TokenMetadata, session_scope
+
+    SessionFactory = _session_factory(tmp_path)
+    reader = FakeReader()
+    reader.down = {DAI}
+    cache = TokenMetadataCache(SessionFactory, evm_reader=reader)
+    chain = chain_key(1)
+
+    # DAI's reads failed, USDC's did not: only USDC is stored
+    metas = cache.get_many(chain, [USDC, DAI])
+    assert set(metas) == {USDC.lower()}
+    with session_scope(SessionFactory) as s:
+        assert [r.address for r in s.query(TokenMetadata)] == [USDC.lower()]
+
+    # The next lookup asks the chain again
+    reader.down = set()
+    assert cache.decimals(chain, DAI) == 18
+    assert reader.batches == [4, 2]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class QuoteCache:
+    """Short-lived cache for aggregator quotes with coalescing of identical lookups.
+
+    Amounts are rounded down to `amount_digits` significant digits before quoting, so
+    followers copying the same trade with slightly different sizes share one quote. The
+    bucketed amount is what gets quoted and swapped, which keeps cached calldata valid.
+    Concurrent lookups for a key that is already being fetched wait for that request
+    instead of issuing their own.
+    """
+
+    ttl_sec: float = 3.0
+    amount_digits: int = 4
+    max_entries: int = 1024
+    _entries: dict[tuple, tuple[float, Any]] = field(default_factory=dict)
+    _inflight: dict[tuple, Future] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def configure(self, ttl_sec: float | None = None, amount_digits: int | None = None) -> None:
+        if ttl_sec is not None:
+            self.ttl_sec = float(ttl_sec)
+        if amount_digits is not None:
+            self.amount_digits = int(amount_digits)
+        self.clear()
+
+    def bucket(self, amount: int) -> int:
+        amount = int(amount)
+        if self.amount_digits <= 0 or amount <= 0:
+            return amount
+        step = 10 ** max(0, len(str(amount)) - self.amount_digits)
+        return amount // step * step
+
+    def get_or_fetch(self, key: tuple, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                return hit[1]
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._inflight[key] = fut
+        if not owner:
+            return fut.result()
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.ttl_sec > 0 and value is not None:
+                self._store(key, value)
+        fut.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: tuple, value: Any) -> None:
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            while len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (now + self.ttl_sec, value)
+
+
+# Shared by all aggregator clients in the process
+quote_cache = QuoteCache()
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
-import requests
+from trade_clone_engine.aggregators.cache import quote_cache
+from trade_clone_engine.http_client import http_client
 
 
 def get_quote(quote_url: str, input_mint: str, output_mint: str, amount: int, slippage_bps: int):
+    amount = quote_cache.bucket(amount)
+    key = ("jupiter", quote_url, input_mint, output_mint, amount, slippage_bps)
+    return quote_cache.get_or_fetch(
+        key, lambda: _fetch_quote(quote_url, input_mint, output_mint, amount, slippage_bps)
+    )
+
+
+def _fetch_quote(quote_url: str, input_mint: str, output_mint: str, amount: int, slippage_bps: int):
     params = {
         "inputMint": input_mint,
         "outputMint": output_mint,
@@ -11,7 +20,7 @@ def get_quote(quote_url: str, input_mint: str, output_mint: str, amount: int, sl
         "slippageBps": str(slippage_bps),
         "onlyDirectRoutes": "false",
     }
-    r = requests.get(quote_url, params=params, timeout=15)
+    r = http_client.get(quote_url, params=params)
     r.raise_for_status()
     data = r.json()
     # Return the first route
@@ -19,7 +28,12 @@ def get_quote(quote_url: str, input_mint: str, output_mint: str, amount: int, sl
     return routes[0] if routes else None
 
 
-def get_swap_transaction(swap_url: str, route: dict, user_public_key: str):
+def _swap_payload(
+    route: dict,
+    user_public_key: str,
+    compute_unit_price_micro_lamports: int | None,
+    dynamic_compute_unit_limit: bool,
+) -> dict:
     payload = {
         "route": route,
         "userPublicKey": user_public_key,
@@ -28,7 +42,43 @@ def get_swap_transaction(swap_url: str, route: dict, user_public_key: str):
         "asLegacyTransaction": False,
         "useSharedAccounts": True,
     }
-    r = requests.post(swap_url, json=payload, timeout=20)
+    if compute_unit_price_micro_lamports:
+        payload["computeUnitPriceMicroLamports"] = int(compute_unit_price_micro_lamports)
+    if dynamic_compute_unit_limit:
+        # Jupiter simulates the swap and sets a tight compute unit limit, so the priority
+        # fee (price x limit) is not paid on unused units
+        payload["dynamicComputeUnitLimit"] = True
+    return payload
+
+
+def get_swap_transaction(
+    swap_url: str,
+    route: dict,
+    user_public_key: str,
+    compute_unit_price_micro_lamports: int | None = None,
+    dynamic_compute_unit_limit: bool = False,
+):
+    payload = _swap_payload(
+        route, user_public_key, compute_unit_price_micro_lamports, dynamic_compute_unit_limit
+    )
+    r = http_client.post(swap_url, json=payload, timeout=20)
     r.raise_for_status()
     j = r.json()
     return j.get("swapTransaction")
+
+
+def get_swap_instructions(
+    swap_instructions_url: str,
+    route: dict,
+    user_public_key: str,
+    compute_unit_price_micro_lamports: int | None = None,
+    dynamic_compute_unit_limit: bool = False,
+) -> dict | None:
+    """Instructions and lookup tables of a swap, for assembling the transaction locally."""
+    payload = _swap_payload(
+        route, user_public_key, compute_unit_price_micro_lamports, dynamic_compute_unit_limit
+    )
+    r = http_client.post(swap_instructions_url, json=payload, timeout=20)
+    r.raise_for_status()
+    j = r.json()
+    return j if j.get("swapInstruction") else None
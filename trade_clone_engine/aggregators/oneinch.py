@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-import requests
+from trade_clone_engine.aggregators.cache import quote_cache
+from trade_clone_engine.http_client import http_client
 
 
 def get_swap_quote(
@@ -12,6 +13,34 @@ def get_swap_quote(
     from_address: str,
     slippage_bps: int,
     api_key: str | None = None,
+):
+    amount_in = quote_cache.bucket(amount_in)
+    key = (
+        "1inch",
+        chain_id,
+        src_token.lower(),
+        dst_token.lower(),
+        amount_in,
+        slippage_bps,
+        (from_address or "").lower(),
+    )
+    return quote_cache.get_or_fetch(
+        key,
+        lambda: _fetch_swap_quote(
+            base_url, chain_id, src_token, dst_token, amount_in, from_address, slippage_bps, api_key
+        ),
+    )
+
+
+def _fetch_swap_quote(
+    base_url: str,
+    chain_id: int,
+    src_token: str,
+    dst_token: str,
+    amount_in: int,
+    from_address: str,
+    slippage_bps: int,
+    api_key: str | None,
 ):
     slippage = max(0.0, slippage_bps / 100.0)
     url = f"{base_url}/{chain_id}/swap"
@@ -26,7 +55,7 @@ def get_swap_quote(
     headers = {"Accept": "application/json"}
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
-    r = requests.get(url, params=params, headers=headers, timeout=15)
+    r = http_client.get(url, params=params, headers=headers)
     r.raise_for_status()
     data = r.json()
     # Expected fields: tx { to, data, value }, toTokenAmount, protocols
@@ -39,4 +68,5 @@ def get_swap_quote(
         "value": int(tx.get("value") or 0),
         "allowanceTarget": spender,
         "buyAmount": to_token_amount,
+        "sellAmount": amount_in,
     }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-import requests
+from trade_clone_engine.aggregators.cache import quote_cache
+from trade_clone_engine.http_client import http_client
 
 
 def get_swap_quote(
@@ -11,6 +12,32 @@ def get_swap_quote(
     sell_amount: int,
     taker_address: str,
     slippage_bps: int,
+):
+    sell_amount = quote_cache.bucket(sell_amount)
+    key = (
+        "0x",
+        chain_id,
+        sell_token.lower(),
+        buy_token.lower(),
+        sell_amount,
+        slippage_bps,
+        (taker_address or "").lower(),
+    )
+    return quote_cache.get_or_fetch(
+        key,
+        lambda: _fetch_swap_quote(
+            base_url, sell_token, buy_token, sell_amount, taker_address, slippage_bps
+        ),
+    )
+
+
+def _fetch_swap_quote(
+    base_url: str,
+    sell_token: str,
+    buy_token: str,
+    sell_amount: int,
+    taker_address: str,
+    slippage_bps: int,
 ):
     slippage_pct = max(0.0, slippage_bps / 10_000.0)
     # Base URL example: https://api.0x.org or https://base.api.0x.org for Base
@@ -23,7 +50,7 @@ def get_swap_quote(
         "takerAddress": taker_address,
         "slippagePercentage": str(slippage_pct),
     }
-    r = requests.get(url, params=params, timeout=15)
+    r = http_client.get(url, params=params)
     r.raise_for_status()
     data = r.json()
     # Fields: to, data, value, allowanceTarget, buyAmount
@@ -33,4 +60,5 @@ def get_swap_quote(
         "value": int(data.get("value") or 0),
         "allowanceTarget": data.get("allowanceTarget"),
         "buyAmount": int(data.get("buyAmount") or 0),
+        "sellAmount": sell_amount,
     }
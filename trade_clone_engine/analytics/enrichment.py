@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import or_, select
+
+from trade_clone_engine.analytics.pricing import PriceService
+from trade_clone_engine.analytics.tokens import TokenMetadataCache, chain_key, to_units
+from trade_clone_engine.config import AppSettings
+from trade_clone_engine.db import (
+    ExecutedTrade,
+    ObservedTrade,
+    PnlRollup,
+    session_scope,
+    upsert_add,
+)
+
+
+def price_chain(chain: str) -> int | str:
+    """PriceService chain for a chain key: 'solana' or the EVM chain id."""
+    return "solana" if chain == "solana" else int(chain.split(":", 1)[1])
+
+
+def add_to_rollups(session, rows: list[ExecutedTrade]) -> None:
+    """Adds newly priced executions to the per-day PnL rollups (successful ones only)."""
+    rows = [r for r in rows if r.status == "success"]
+    if not rows:
+        return
+    wallets = dict(
+        session.execute(
+            select(ObservedTrade.id, ObservedTrade.wallet).where(
+                ObservedTrade.id.in_({r.observed_trade_id for r in rows})
+            )
+        ).all()
+    )
+    totals: dict[tuple, list] = {}
+    for r in rows:
+        key = (
+            r.created_at.date(),
+            wallets.get(r.observed_trade_id) or "",  # key column; observed wallet is nullable
+            r.chain,
+            r.token_out or "",
+        )
+        t = totals.setdefault(key, [0, 0.0, 0.0, 0.0])
+        t[0] += 1
+        t[1] += r.amount_in_usd
+        t[2] += r.amount_out_usd
+        t[3] += r.pnl_usd
+    for (day, wallet, chain, token), (n, usd_in, usd_out, pnl) in totals.items():
+        upsert_add(
+            session,
+            PnlRollup.__table__,
+            {"day": day, "wallet": wallet, "chain": chain, "token": token},
+            {"trades": n, "amount_in_usd": usd_in, "amount_out_usd": usd_out, "pnl_usd": pnl},
+        )
+
+
+@dataclass
+class PnlEnricher:
+    """Fills USD amounts and PnL for executed trades, outside the executors.
+
+    Executors only record raw amounts. This worker picks up rows of its chains that still
+    lack `amount_in_usd`/`amount_out_usd`, prices each batch with one lookup per chain,
+    and sets `pnl_usd` and `realized_at` once both sides are known, adding the trade to
+    the PnL rollups in the same transaction. Rows that cannot be priced yet are retried
+    every `retry_sec` until they are `max_age_sec` old.
+    """
+
+    SessionFactory: object
+    prices: PriceService
+    tokens: TokenMetadataCache
+    chains: list[str] = field(default_factory=list)  # chain keys, e.g. ['evm:1', 'solana']
+    batch_size: int = 200
+    retry_sec: float = 300.0
+    max_age_sec: float = 86400.0
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings, SessionFactory) -> PnlEnricher:
+        from trade_clone_engine.execution.evm_wallet import EvmWallet
+        from trade_clone_engine.execution.multicall import MulticallReader
+
+        wallet = EvmWallet.create(
+            rpc_url=settings.evm_rpc_ws_url,
+            chain_id=settings.evm_chain_id,
+            private_key=None,
+            explicit_address=None,
+            component="enricher",
+        )
+        chains = [chain_key(settings.evm_chain_id)]
+        sol_client = None
+        if settings.enrich_solana:
+            from solana.rpc.api import Client
+
+            from trade_clone_engine.providers.instrumentation import InstrumentedClient
+
+            sol_client = InstrumentedClient(Client(settings.sol_rpc_url), "enricher")
+            chains.append("solana")
+        tokens = TokenMetadataCache(
+            SessionFactory,
+            evm_reader=MulticallReader(wallet.w3, wallet.contracts),
+            sol_client=sol_client,
+        )
+        return cls(
+            SessionFactory=SessionFactory,
+            prices=PriceService.from_settings(settings),
+            tokens=tokens,
+            chains=chains,
+            batch_size=settings.enrich_batch_size,
+            retry_sec=settings.enrich_retry_sec,
+            max_age_sec=settings.enrich_max_age_sec,
+        )
+
+    def run_once(self) -> int:
+        """Enriches one batch; returns the number of rows attempted."""
+        now = datetime.utcnow()
+        with session_scope(self.SessionFactory) as s:
+            rows = (
+                s.execute(
+                    select(ExecutedTrade)
+                    .where(
+                        ExecutedTrade.chain.in_(self.chains),
+                        ExecutedTrade.status.in_(("success", "skipped")),
+                        or_(
+                            ExecutedTrade.amount_in_usd.is_(None),
+                            ExecutedTrade.amount_out_usd.is_(None),
+                        ),
+                        or_(
+                            ExecutedTrade.enriched_at.is_(None),
+                            ExecutedTrade.enriched_at < now - timedelta(seconds=self.retry_sec),
+                        ),
+                        ExecutedTrade.created_at >= now - timedelta(seconds=self.max_age_sec),
+                    )
+                    .order_by(ExecutedTrade.id.asc())
+                    .limit(self.batch_size)
+                    # Workers sharing a chain never price (and roll up) the same row twice
+                    .with_for_update(skip_locked=True)
+                )
+                .scalars()
+                .all()
+            )
+            by_chain: dict[str, list[ExecutedTrade]] = {}
+            for row in rows:
+                by_chain.setdefault(row.chain, []).append(row)
+            unpriced = {r.id for r in rows if r.pnl_usd is None}
+            for chain, group in by_chain.items():
+                self._enrich(chain, group, now)
+            add_to_rollups(s, [r for r in rows if r.id in unpriced and r.pnl_usd is not None])
+            return len(rows)
+
+    def _enrich(self, chain: str, rows: list[ExecutedTrade], now: datetime) -> None:
+        tokens = {t for r in rows for t in (r.token_in, r.token_out) if t}
+        try:
+            prices = self.prices.get_many(price_chain(chain), list(tokens))
+            metas = self.tokens.get_many(chain, list(tokens))
+        except Exception as e:
+            logger.warning("Enriching {} {} trades failed: {}", len(rows), chain, e)
+            prices, metas = {}, {}
+
+        def usd(token: str | None, amount_raw: str | None) -> float | None:
+            if not token or not amount_raw:
+                return None
+            key = token if chain == "solana" else token.lower()
+            meta = metas.get(key)
+            price = prices.get(key)
+            units = to_units(amount_raw, meta.decimals if meta else None)
+            return units * price if units is not None and price is not None else None
+
+        for row in rows:
+            row.enriched_at = now
+            if row.amount_in_usd is None:
+                row.amount_in_usd = usd(row.token_in, row.amount_in_wei)
+            if row.amount_out_usd is None:
+                row.amount_out_usd = usd(row.token_out, row.amount_out_wei)
+            if row.amount_in_usd is not None and row.amount_out_usd is not None:
+                row.pnl_usd = row.amount_out_usd - row.amount_in_usd
+                row.realized_at = row.created_at
+
+    def run(self, interval_sec: float = 5.0) -> None:
+        logger.info("Starting PnL enricher for {}", ", ".join(self.chains))
+        while True:
+            try:
+                # A full batch means there is a backlog: keep going without sleeping
+                if self.run_once() < self.batch_size:
+                    time.sleep(interval_sec)
+            except KeyboardInterrupt:
+                logger.info("Enricher interrupted; shutting down.")
+                break
+            except Exception as e:
+                logger.exception("Enricher error: {}", e)
+                time.sleep(interval_sec)
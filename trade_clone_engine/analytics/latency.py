@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import select
+
+from trade_clone_engine.db import ExecutedTrade, ObservedTrade, session_scope
+
+# Upper bounds of the histogram buckets, in milliseconds (plus an implicit +Inf)
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+
+# (interval, from stage, to stage); stages are columns on the observed/executed trade
+INTERVALS = (
+    ("leader_to_detected", "leader_block_time", "detected_at"),
+    ("detected_to_persisted", "detected_at", "persisted_at"),
+    ("persisted_to_claimed", "persisted_at", "claimed_at"),
+    ("claimed_to_quoted", "claimed_at", "quoted_at"),
+    ("quoted_to_signed", "quoted_at", "signed_at"),
+    ("signed_to_sent", "signed_at", "sent_at"),
+    ("sent_to_confirmed", "sent_at", "confirmed_at"),
+    ("leader_to_sent", "leader_block_time", "sent_at"),
+    ("detected_to_sent", "detected_at", "sent_at"),
+)
+
+
+def _ms(start: datetime | None, end: datetime | None) -> float | None:
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds() * 1000.0
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def histogram(values_ms: list[float]) -> dict:
+    """Cumulative bucket counts (Prometheus style) and percentiles for one interval."""
+    values = sorted(values_ms)
+    buckets = {str(b): sum(1 for v in values if v <= b) for b in BUCKETS_MS}
+    buckets["+Inf"] = len(values)
+    out: dict = {"count": len(values), "buckets": buckets}
+    if values:
+        out.update(
+            p50_ms=_percentile(values, 0.5),
+            p90_ms=_percentile(values, 0.9),
+            p99_ms=_percentile(values, 0.99),
+            max_ms=values[-1],
+        )
+    return out
+
+
+def latency_histograms(SessionFactory, limit: int = 1000, chain: str | None = None) -> dict:
+    """Per-stage latency histograms over the most recent `limit` executed trades.
+
+    Block times have one-second resolution, so intervals starting at the leader's block
+    are only accurate to about a second.
+    """
+    stmt = (
+        select(ObservedTrade, ExecutedTrade)
+        .join(ExecutedTrade, ExecutedTrade.observed_trade_id == ObservedTrade.id)
+        .order_by(ExecutedTrade.id.desc())
+        .limit(limit)
+    )
+    if chain:
+        stmt = stmt.where(ObservedTrade.chain == chain)
+    series: dict[str, list[float]] = {name: [] for name, _, _ in INTERVALS}
+    with session_scope(SessionFactory) as s:
+        for obs, ex in s.execute(stmt).all():
+            stages = {
+                "leader_block_time": obs.leader_block_time,
+                "detected_at": obs.detected_at,
+                "persisted_at": obs.timestamp,
+                "claimed_at": ex.claimed_at,
+                "quoted_at": ex.quoted_at,
+                "signed_at": ex.signed_at,
+                "sent_at": ex.sent_at,
+                "confirmed_at": ex.confirmed_at,
+            }
+            for name, start, end in INTERVALS:
+                ms = _ms(stages[start], stages[end])
+                if ms is not None:
+                    series[name].append(ms)
+    return {name: histogram(values) for name, values in series.items()}
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 from sqlalchemy import func, select
 
-from trade_clone_engine.db import ExecutedTrade, ObservedTrade, session_scope
+from trade_clone_engine.db import ExecutedTrade, ObservedTrade, PnlRollup, session_scope
 
 
 @dataclass
@@ -51,3 +52,72 @@ def get_summary(SessionFactory) -> Summary:
             failed=failed,
             skipped=skipped,
         )
+
+
+def queue_depth(SessionFactory) -> dict[str, int]:
+    """Unprocessed observed trades per chain."""
+    with session_scope(SessionFactory) as s:
+        rows = s.execute(
+            select(ObservedTrade.chain, func.count())
+            .where(ObservedTrade.processed.is_(False))
+            .group_by(ObservedTrade.chain)
+        ).all()
+        return {chain: int(n) for chain, n in rows}
+
+
+def volume_by_day(SessionFactory, days: int = 7, chain: str | None = None) -> list[dict]:
+    """Successful executions per (day, chain, token_in, token_out), summed in SQL.
+
+    Raw amounts are NUMERIC(78,0), so the sums stay exact on Postgres. Output amounts
+    are only summable within one output token, hence the pair grouping.
+    """
+    day = func.date(ExecutedTrade.created_at)
+    stmt = (
+        select(
+            day,
+            ExecutedTrade.chain,
+            ExecutedTrade.token_in,
+            ExecutedTrade.token_out,
+            func.count(),
+            func.sum(ExecutedTrade.amount_in_wei),
+            func.sum(ExecutedTrade.amount_out_wei),
+            func.sum(ExecutedTrade.gas_spent_wei),
+        )
+        .where(
+            ExecutedTrade.status == "success",
+            ExecutedTrade.created_at >= datetime.utcnow() - timedelta(days=days),
+        )
+        .group_by(day, ExecutedTrade.chain, ExecutedTrade.token_in, ExecutedTrade.token_out)
+        .order_by(day, ExecutedTrade.chain, ExecutedTrade.token_in, ExecutedTrade.token_out)
+    )
+    if chain:
+        stmt = stmt.where(ExecutedTrade.chain == chain)
+    with session_scope(SessionFactory) as s:
+        return [
+            {
+                "day": str(d),
+                "chain": c,
+                "token_in": token_in,
+                "token_out": token_out,
+                "trades": int(n),
+                "amount_in_wei": str(amount_in) if amount_in is not None else None,
+                "amount_out_wei": str(amount_out) if amount_out is not None else None,
+                "gas_spent_wei": str(gas) if gas is not None else None,
+            }
+            for d, c, token_in, token_out, n, amount_in, amount_out, gas in s.execute(stmt).all()
+        ]
+
+
+def pnl_summary(SessionFactory, days: int | None = None) -> dict:
+    """Realized PnL in total and per followed wallet, read from the daily rollups."""
+    pnl = func.coalesce(func.sum(PnlRollup.pnl_usd), 0.0)
+    by_wallet = select(PnlRollup.wallet, pnl).group_by(PnlRollup.wallet)
+    if days:
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+        by_wallet = by_wallet.where(PnlRollup.day >= since)
+    with session_scope(SessionFactory) as s:
+        rows = s.execute(by_wallet).all()
+    return {
+        "total_pnl_usd": float(sum(v or 0.0 for _, v in rows)),
+        "by_wallet": {w: float(v or 0.0) for w, v in rows},
+    }
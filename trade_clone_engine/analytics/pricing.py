@@ -1,49 +1,249 @@
 from __future__ import annotations
 
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from loguru import logger
+
+from trade_clone_engine.http_client import http_client
 
 CHAIN_TO_COINGECKO_PLATFORM = {
     1: "ethereum",
+    137: "polygon-pos",
     8453: "base",
+    "solana": "solana",
+}
+
+# CoinGecko coin ids for each chain's native coin
+CHAIN_TO_COINGECKO_NATIVE = {
+    1: "ethereum",
+    137: "polygon-ecosystem-token",
+    8453: "ethereum",  # Base native is ETH
+    "solana": "solana",
 }
 
+CHAIN_TO_DEFILLAMA = {1: "ethereum", 137: "polygon", 8453: "base", "solana": "solana"}
+
+# Key used for a chain's native coin (token address None)
+NATIVE = ""
+
+
+def _norm(chain, address: str | None) -> str:
+    if not address:
+        return NATIVE
+    return address if chain == "solana" else address.lower()
+
+
+class PriceSource(Protocol):
+    name: str
+
+    def prices(self, chain, addresses: list[str]) -> dict[str, float]:
+        """USD prices for `addresses` (normalized; NATIVE for the native coin)."""
+        ...
+
+
+@dataclass
+class CoinGeckoSource:
+    name: str = "coingecko"
+    base_url: str = "https://api.coingecko.com/api/v3"
+    api_key: str | None = None
+    batch_size: int = 50
+
+    def prices(self, chain, addresses: list[str]) -> dict[str, float]:
+        headers = {"x-cg-demo-api-key": self.api_key} if self.api_key else {}
+        out: dict[str, float] = {}
+        if NATIVE in addresses and chain in CHAIN_TO_COINGECKO_NATIVE:
+            coin = CHAIN_TO_COINGECKO_NATIVE[chain]
+            r = http_client.get(
+                f"{self.base_url}/simple/price",
+                params={"ids": coin, "vs_currencies": "usd"},
+                headers=headers,
+                timeout=10,
+            )
+            r.raise_for_status()
+            usd = (r.json() or {}).get(coin, {}).get("usd")
+            if usd is not None:
+                out[NATIVE] = float(usd)
+        platform = CHAIN_TO_COINGECKO_PLATFORM.get(chain)
+        tokens = [a for a in addresses if a != NATIVE]
+        if not platform:
+            return out
+        for i in range(0, len(tokens), self.batch_size):
+            chunk = tokens[i : i + self.batch_size]
+            r = http_client.get(
+                f"{self.base_url}/simple/token_price/{platform}",
+                params={"contract_addresses": ",".join(chunk), "vs_currencies": "usd"},
+                headers=headers,
+                timeout=10,
+            )
+            r.raise_for_status()
+            # Responses key EVM addresses in lowercase
+            data = {_norm(chain, k): v for k, v in (r.json() or {}).items()}
+            for address in chunk:
+                usd = (data.get(address) or {}).get("usd")
+                if usd is not None:
+                    out[address] = float(usd)
+        return out
+
+
+@dataclass
+class DefiLlamaSource:
+    name: str = "defillama"
+    base_url: str = "https://coins.llama.fi"
+    batch_size: int = 100
+
+    def prices(self, chain, addresses: list[str]) -> dict[str, float]:
+        prefix = CHAIN_TO_DEFILLAMA.get(chain)
+        if not prefix:
+            return {}
+        out: dict[str, float] = {}
+        tokens = [a for a in addresses if a != NATIVE]
+        for i in range(0, len(tokens), self.batch_size):
+            chunk = tokens[i : i + self.batch_size]
+            coins = ",".join(f"{prefix}:{a}" for a in chunk)
+            r = http_client.get(f"{self.base_url}/prices/current/{coins}", timeout=10)
+            r.raise_for_status()
+            data = (r.json() or {}).get("coins") or {}
+            for key, rec in data.items():
+                address = _norm(chain, key.split(":", 1)[-1])
+                if rec.get("price") is not None:
+                    out[address] = float(rec["price"])
+        return out
+
+
+SOURCES = {"coingecko": CoinGeckoSource, "defillama": DefiLlamaSource}
+
+
+@dataclass
+class PriceService:
+    """USD prices with a TTL cache, batched lookups and stale-while-revalidate.
+
+    Fresh entries (younger than `ttl_sec`) are served from memory. Entries up to
+    `stale_sec` old are served as-is while a background refresh runs. Anything older or
+    unknown is fetched synchronously, all missing tokens of a chain in one batch; each
+    source in order fills what the previous ones did not price. Tokens no source prices
+    are cached as None for `ttl_sec` too.
+
+    When every source fails, the last known price keeps being served, without asking the
+    sources again for `retry_sec`, until it is `max_stale_sec` old.
+    """
+
+    sources: list[PriceSource] = field(default_factory=lambda: [CoinGeckoSource()])
+    ttl_sec: float = 60.0
+    stale_sec: float = 600.0
+    retry_sec: float = 30.0
+    max_stale_sec: float = 3600.0
+    _cache: dict[tuple, tuple[float | None, float]] = field(default_factory=dict)
+    _retry_at: dict[tuple, float] = field(default_factory=dict)
+    _refreshing: set[tuple] = field(default_factory=set)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _pool: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def from_settings(cls, settings) -> PriceService:
+        sources: list[PriceSource] = []
+        for name in (settings.price_sources or "").split(","):
+            name = name.strip().lower()
+            if name == "coingecko":
+                sources.append(
+                    CoinGeckoSource(
+                        base_url=settings.coingecko_base_url, api_key=settings.coingecko_api_key
+                    )
+                )
+            elif name in SOURCES:
+                sources.append(SOURCES[name]())
+            elif name:
+                logger.warning("Unknown price source {!r}; ignoring", name)
+        return cls(
+            sources=sources,
+            ttl_sec=settings.price_ttl_sec,
+            stale_sec=settings.price_stale_sec,
+            retry_sec=settings.price_retry_sec,
+            max_stale_sec=settings.price_max_stale_sec,
+        )
+
+    def get(self, chain, address: str | None) -> float | None:
+        return self.get_many(chain, [address]).get(_norm(chain, address))
+
+    def get_many(self, chain, addresses: list[str | None]) -> dict[str, float | None]:
+        now = time.monotonic()
+        out: dict[str, float | None] = {}
+        missing: list[str] = []
+        stale: list[str] = []
+        for address in dict.fromkeys(_norm(chain, a) for a in addresses):
+            hit = self._cache.get((chain, address))
+            age = now - hit[1] if hit else None
+            backoff = now < self._retry_at.get((chain, address), 0.0)
+            if hit is not None and age < self.stale_sec:
+                out[address] = hit[0]
+                if age >= self.ttl_sec and not backoff:
+                    stale.append(address)
+            elif hit is not None and hit[0] is not None and backoff and age < self.max_stale_sec:
+                out[address] = hit[0]  # sources failed moments ago
+            else:
+                missing.append(address)
+        if missing:
+            out.update(self._fetch(chain, missing))
+        if stale:
+            self._revalidate(chain, stale)
+        return out
+
+    def _fetch(self, chain, addresses: list[str]) -> dict[str, float | None]:
+        prices: dict[str, float] = {}
+        for source in self.sources:
+            todo = [a for a in addresses if a not in prices]
+            if not todo:
+                break
+            try:
+                prices.update(source.prices(chain, todo))
+            except Exception as e:
+                logger.debug("Price source {} failed: {}", source.name, e)
+        now = time.monotonic()
+        out: dict[str, float | None] = {}
+        with self._lock:
+            for address in addresses:
+                price = prices.get(address)
+                old = self._cache.get((chain, address))
+                fallback = old is not None and old[0] is not None
+                if price is None and fallback and now - old[1] < self.max_stale_sec:
+                    # Sources failed: keep serving the last known price for now
+                    self._retry_at[(chain, address)] = now + self.retry_sec
+                    out[address] = old[0]
+                    continue
+                self._retry_at.pop((chain, address), None)
+                self._cache[(chain, address)] = (price, now)
+                out[address] = price
+        return out
+
+    def _revalidate(self, chain, addresses: list[str]) -> None:
+        with self._lock:
+            todo = [a for a in addresses if (chain, a) not in self._refreshing]
+            self._refreshing.update((chain, a) for a in todo)
+            if not todo:
+                return
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prices")
+
+        def run():
+            try:
+                self._fetch(chain, todo)
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update((chain, a) for a in todo)
+
+        self._pool.submit(run)
+
+
+_default_service: PriceService | None = None
+
 
 def get_token_price_usd(
     chain_id: int, token_address: str | None, native_symbol: str = "ETH"
 ) -> float | None:
-    if not token_address:
-        # Native coin
-        if chain_id == 1:
-            ids = "ethereum"
-        elif chain_id == 8453:
-            ids = "ethereum"  # Base native is ETH
-        else:
-            return None
-        r = requests.get(
-            "https://api.coingecko.com/api/v3/simple/price",
-            params={"ids": ids, "vs_currencies": "usd"},
-            timeout=10,
-        )
-        if r.ok:
-            return float(r.json().get(ids, {}).get("usd"))
-        return None
-
-    platform = CHAIN_TO_COINGECKO_PLATFORM.get(chain_id)
-    if not platform:
-        return None
-    r = requests.get(
-        f"https://api.coingecko.com/api/v3/simple/token_price/{platform}",
-        params={"contract_addresses": token_address, "vs_currencies": "usd"},
-        timeout=10,
-    )
-    if not r.ok:
-        return None
-    data = r.json() or {}
-    token_key = token_address.lower()
-    rec = data.get(token_key)
-    if not rec:
-        # Some responses use checksum
-        rec = next(iter(data.values()), None)
-    if not rec:
-        return None
-    return float(rec.get("usd")) if rec.get("usd") is not None else None
+    global _default_service
+    if _default_service is None:
+        _default_service = PriceService()
+    return _default_service.get(chain_id, token_address)
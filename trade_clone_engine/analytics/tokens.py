@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import base64
+import threading
+from dataclasses import dataclass, field
+
+from loguru import logger
+from sqlalchemy import select, tuple_
+
+from trade_clone_engine.db import TokenMetadata, session_scope
+
+# SPL Mint layout: COption<Pubkey> mint_authority (36 bytes) + u64 supply, then u8 decimals
+MINT_DECIMALS_OFFSET = 44
+
+# getMultipleAccounts accepts at most 100 keys per request
+SOLANA_BATCH = 100
+
+# Marks a read that failed in transport (as opposed to reverting)
+_UNAVAILABLE = object()
+
+NATIVE_DECIMALS = {"solana": 9}
+
+
+@dataclass(frozen=True)
+class TokenMeta:
+    decimals: int | None
+    symbol: str | None = None
+
+
+def chain_key(chain_id: int | str) -> str:
+    """'solana' for Solana, 'evm:<chain id>' for EVM chains (which share chain='evm' rows)."""
+    return "solana" if str(chain_id) == "solana" else f"evm:{int(chain_id)}"
+
+
+def to_units(amount_raw: int | str | None, decimals: int | None) -> float | None:
+    if amount_raw is None or decimals is None:
+        return None
+    return int(amount_raw) / 10**decimals
+
+
+def _norm(chain: str, address: str) -> str:
+    # EVM addresses are case-insensitive; Solana mints are case-sensitive base58
+    return address if chain == "solana" else address.lower()
+
+
+@dataclass
+class TokenMetadataCache:
+    """Decimals and symbol per token, fetched once and persisted in token_metadata.
+
+    Lookups hit memory first, then the table, and only tokens never seen before are
+    read from chain: ERC20 decimals()/symbol() in one Multicall3 batch, SPL mints via
+    getMultipleAccounts. Addresses that are not tokens (their decimals() call reverts) are
+    stored with null decimals so they are not fetched again; tokens whose reads failed
+    for any other reason are left out and retried on the next lookup.
+    """
+
+    SessionFactory: object
+    evm_reader: object | None = None  # MulticallReader for the executor's chain
+    sol_client: object | None = None
+    _known: dict[tuple[str, str], TokenMeta] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def get(self, chain: str, address: str | None) -> TokenMeta | None:
+        if not address:
+            return TokenMeta(decimals=NATIVE_DECIMALS.get(chain, 18))
+        return self.get_many(chain, [address]).get(_norm(chain, address))
+
+    def decimals(self, chain: str, address: str | None) -> int | None:
+        meta = self.get(chain, address)
+        return meta.decimals if meta else None
+
+    def get_many(self, chain: str, addresses: list[str]) -> dict[str, TokenMeta]:
+        wanted = {_norm(chain, a) for a in addresses if a}
+        out = {a: self._known[(chain, a)] for a in wanted if (chain, a) in self._known}
+        missing = wanted - out.keys()
+        if missing:
+            out.update(self._load(chain, missing))
+            missing -= out.keys()
+        if missing:
+            fetched = self._fetch(chain, sorted(missing))
+            self._store(chain, fetched)
+            out.update(fetched)
+        with self._lock:
+            self._known.update({(chain, a): m for a, m in out.items()})
+        return out
+
+    def _load(self, chain: str, addresses: set[str]) -> dict[str, TokenMeta]:
+        with session_scope(self.SessionFactory) as s:
+            rows = s.execute(
+                select(TokenMetadata).where(
+                    tuple_(TokenMetadata.chain, TokenMetadata.address).in_(
+                        [(chain, a) for a in addresses]
+                    )
+                )
+            ).scalars()
+            return {r.address: TokenMeta(decimals=r.decimals, symbol=r.symbol) for r in rows}
+
+    def _store(self, chain: str, metas: dict[str, TokenMeta]) -> None:
+        if not metas:
+            return
+        try:
+            with session_scope(self.SessionFactory) as s:
+                for address, meta in metas.items():
+                    s.merge(
+                        TokenMetadata(
+                            chain=chain, address=address, decimals=meta.decimals, symbol=meta.symbol
+                        )
+                    )
+        except Exception as e:
+            # Another process may have stored the same token first
+            logger.debug("Storing token metadata failed: {}", e)
+
+    def _fetch(self, chain: str, addresses: list[str]) -> dict[str, TokenMeta]:
+        try:
+            if chain == "solana":
+                return self._fetch_solana(addresses)
+            return self._fetch_evm(addresses)
+        except Exception as e:
+            # Transient RPC failure: do not persist, try again on the next lookup
+            logger.warning("Token metadata lookup failed for {} tokens: {}", len(addresses), e)
+            return {}
+
+    def _fetch_evm(self, addresses: list[str]) -> dict[str, TokenMeta]:
+        if self.evm_reader is None:
+            return {}
+        calls = []
+        for address in addresses:
+            erc20 = self.evm_reader.contracts.get(address, "erc20.json")
+            calls.append(erc20.functions.decimals())
+            calls.append(erc20.functions.symbol())
+        results = self.evm_reader.read(calls, failed=_UNAVAILABLE)
+        out = {}
+        for i, address in enumerate(addresses):
+            decimals, symbol = results[2 * i], results[2 * i + 1]
+            if decimals is _UNAVAILABLE or symbol is _UNAVAILABLE:
+                continue
+            out[address] = TokenMeta(
+                decimals=int(decimals) if decimals is not None else None,
+                symbol=str(symbol)[:32] if symbol else None,
+            )
+        if len(out) < len(addresses):
+            logger.warning(
+                "Token metadata unavailable for {} tokens; retrying later",
+                len(addresses) - len(out),
+            )
+        return out
+
+    def _fetch_solana(self, addresses: list[str]) -> dict[str, TokenMeta]:
+        if self.sol_client is None:
+            return {}
+        from solders.pubkey import Pubkey
+
+        out = {}
+        for i in range(0, len(addresses), SOLANA_BATCH):
+            chunk = addresses[i : i + SOLANA_BATCH]
+            resp = self.sol_client.get_multiple_accounts([Pubkey.from_string(a) for a in chunk])
+            accounts = getattr(resp, "value", None)
+            if accounts is None:
+                accounts = ((resp or {}).get("result") or {}).get("value") or []
+            for address, acc in zip(chunk, accounts, strict=False):
+                data = _account_data(acc)
+                decimals = data[MINT_DECIMALS_OFFSET] if len(data) > MINT_DECIMALS_OFFSET else None
+                out[address] = TokenMeta(decimals=decimals)
+        return out
+
+
+def _account_data(acc) -> bytes:
+    if acc is None:
+        return b""
+    data = acc.get("data") if isinstance(acc, dict) else getattr(acc, "data", b"")
+    if isinstance(data, list | tuple) and data:
+        # JSON-RPC shape: [base64, "base64"]
+        return base64.b64decode(data[0])
+    return bytes(data or b"")
@@ -4,14 +4,24 @@ import json
 import time
 from collections.abc import Iterable
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 
 from loguru import logger
 from web3 import Web3
 from web3.contract import Contract
 
+from trade_clone_engine.analytics.tokens import chain_key
 from trade_clone_engine.config import AppSettings
-from trade_clone_engine.db import ObservedTrade, session_scope
+from trade_clone_engine.db import ObservedTrade, insert_or_ignore, session_scope, utc_from_unix
+from trade_clone_engine.execution.calldata import decode_swap
+from trade_clone_engine.providers.instrumentation import instrument_web3
+from trade_clone_engine.telemetry import (
+    WATCHER_BLOCKS,
+    WATCHER_HEAD_LAG_BLOCKS,
+    WATCHER_HEAD_LAG_SECONDS,
+    WATCHER_TRADES,
+)
 
 
 @dataclass
@@ -40,6 +50,7 @@ class EvmWatcher:
 
                 hpprov = _HTTPProvider
             w3 = Web3(hpprov(url))
+        instrument_web3(w3, chain_key(settings.evm_chain_id), "watcher")
         logger.info(
             "Connected to EVM provider: {} (chain id {})",
             settings.evm_rpc_ws_url,
@@ -70,20 +81,9 @@ class EvmWatcher:
         ]
         return addr in candidates
 
-    def decode_method(self, to_addr: str, input_data: bytes) -> tuple[str | None, dict | None]:
-        # Attempt Uniswap v2
-        try:
-            func, params = self.v2_router.decode_function_input(input_data)
-            return func.fn_name, params
-        except Exception:
-            pass
-        # Attempt Uniswap v3
-        try:
-            func, params = self.v3_router.decode_function_input(input_data)
-            return func.fn_name, params
-        except Exception:
-            pass
-        return None, None
+    def decode_swap(self, input_data: bytes | str) -> dict | None:
+        """Decoded swap arguments (see `calldata.swap_params`), stored for the executor."""
+        return decode_swap(self.v2_router, self.v3_router, input_data)
 
     def follow_addresses(self) -> set[str]:
         return set(a.lower() for a in self.settings.wallets_to_follow(chain="evm"))
@@ -96,6 +96,7 @@ class EvmWatcher:
 
         last_block = self.w3.eth.block_number
         logger.info("Initial block: {}", last_block)
+        chain = chain_key(self.settings.evm_chain_id)
 
         while True:
             try:
@@ -106,6 +107,13 @@ class EvmWatcher:
 
                 for bn in range(last_block + 1, latest + 1):
                     block = self.w3.eth.get_block(bn, full_transactions=True)
+                    detected_at = datetime.utcnow()
+                    block_time = utc_from_unix(block.get("timestamp"))
+                    WATCHER_BLOCKS.labels(chain=chain).inc()
+                    WATCHER_HEAD_LAG_BLOCKS.labels(chain=chain).set(latest - bn)
+                    if block_time is not None:
+                        lag = (detected_at - block_time).total_seconds()
+                        WATCHER_HEAD_LAG_SECONDS.labels(chain=chain).set(lag)
                     txs: Iterable = block.transactions or []
                     for tx in txs:
                         from_addr = (tx["from"] or "").lower()
@@ -117,56 +125,14 @@ class EvmWatcher:
                             if not self.is_known_dex(to_addr):
                                 continue
 
-                            method, params = (None, None)
+                            params = None
                             if input_data and input_data != "0x":
-                                try:
-                                    method, params = self.decode_method(to_addr, input_data)
-                                except Exception as e:
-                                    logger.debug("decode error: {}", e)
-
-                            # Determine token_in/out and amounts across V2/V3 shapes
-                            token_in = None
-                            token_out = None
-                            amount_in = None
-                            min_out = None
-
-                            if params:
-                                # V2 path-based
-                                if isinstance(params.get("path"), list | tuple) and params.get(
-                                    "path"
-                                ):
-                                    token_in = str(params.get("path")[0])
-                                    token_out = str(params.get("path")[-1])
-                                # V3 exactInputSingle tuple
-                                if isinstance(params.get("params"), dict):
-                                    p = params.get("params")
-                                    token_in = (
-                                        str(p.get("tokenIn")) if p.get("tokenIn") else token_in
-                                    )
-                                    token_out = (
-                                        str(p.get("tokenOut")) if p.get("tokenOut") else token_out
-                                    )
-                                    amount_in = (
-                                        str(p.get("amountIn"))
-                                        if p.get("amountIn") is not None
-                                        else amount_in
-                                    )
-                                    min_out = (
-                                        str(p.get("amountOutMinimum"))
-                                        if p.get("amountOutMinimum") is not None
-                                        else min_out
-                                    )
-
-                                amount_in = (
-                                    str(params.get("amountIn"))
-                                    if amount_in is None and params.get("amountIn") is not None
-                                    else amount_in
-                                )
-                                min_out = (
-                                    str(params.get("amountOutMin"))
-                                    if min_out is None and params.get("amountOutMin") is not None
-                                    else min_out
-                                )
+                                params = self.decode_swap(input_data)
+                            path = params["path"] if params else []
+                            token_in = path[0] if path else None
+                            token_out = path[-1] if path else None
+                            amount_in = params["amount_in"] if params else None
+                            min_out = params["amount_out_min"] if params else None
 
                             if amount_in is None:
                                 amount_in = str(tx.get("value")) if tx.get("value") else None
@@ -180,7 +146,7 @@ class EvmWatcher:
                                     block_number=bn,
                                     wallet=from_addr,
                                     dex=to_addr,
-                                    method=method,
+                                    method=params["method"] if params else None,
                                     token_in=token_in,
                                     token_out=token_out,
                                     amount_in_wei=amount_in,
@@ -188,8 +154,13 @@ class EvmWatcher:
                                     raw_input=input_data
                                     if isinstance(input_data, str)
                                     else input_data.hex(),
+                                    params=params,
+                                    leader_block_time=block_time,
+                                    detected_at=detected_at,
                                 )
-                                s.add(rec)
+                                if insert_or_ignore(s, rec) is None:
+                                    continue  # already stored, e.g. re-scanned after a restart
+                            WATCHER_TRADES.labels(chain=chain).inc()
                             logger.info(
                                 "Observed trade: {} {} {} -> {} (method: {})",
                                 rec.wallet,
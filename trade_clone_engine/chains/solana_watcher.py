@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 
 from loguru import logger
 from solana.rpc.api import Client
 
 from trade_clone_engine.config import AppSettings
-from trade_clone_engine.db import ObservedTrade, session_scope
+from trade_clone_engine.db import ObservedTrade, insert_or_ignore, session_scope, utc_from_unix
+from trade_clone_engine.providers.instrumentation import InstrumentedClient
+from trade_clone_engine.telemetry import (
+    WATCHER_HEAD_LAG_SECONDS,
+    WATCHER_SIGNATURES,
+    WATCHER_TRADES,
+)
 
 
 @dataclass
@@ -16,9 +23,23 @@ class SolanaWatcher:
 
     @classmethod
     def create(cls, settings: AppSettings) -> SolanaWatcher:
-        client = Client(settings.sol_rpc_url)
+        client = InstrumentedClient(Client(settings.sol_rpc_url), "watcher")
         return cls(settings=settings, client=client)
 
+    def block_time(self, res: dict, listed: int | None = None) -> datetime | None:
+        """Block time of a fetched transaction, or None if the node does not know it yet.
+
+        It is part of the dedupe key, so it must come from the chain: the transaction's
+        blockTime, else the one listed with its signature, else getBlockTime for its slot.
+        """
+        ts = res.get("blockTime") or listed
+        if ts is None and res.get("slot") is not None:
+            try:
+                ts = self.client.get_block_time(int(res["slot"])).get("result")
+            except Exception as e:
+                logger.debug("getBlockTime failed for slot {}: {}", res.get("slot"), e)
+        return utc_from_unix(ts)
+
     def wallets(self) -> list[str]:
         return self.settings.wallets_to_follow(chain="solana")
 
@@ -52,10 +73,17 @@ class SolanaWatcher:
                         if sig in seen:
                             continue
                         seen.add(sig)
+                        detected_at = datetime.utcnow()
                         txr = self.client.get_transaction(sig, max_supported_transaction_version=0)
+                        WATCHER_SIGNATURES.labels(chain="solana").inc()
                         res = txr.get("result")
                         if not res:
                             continue
+                        block_time = self.block_time(res, s.get("blockTime"))
+                        if block_time is None:
+                            seen.discard(sig)  # retried on the next poll
+                            continue
+                        _observe_lag(block_time, detected_at)
                         meta = res.get("meta") or {}
                         pre = meta.get("preTokenBalances") or []
                         post = meta.get("postTokenBalances") or []
@@ -89,11 +117,15 @@ class SolanaWatcher:
                                 method="swap",
                                 token_in=mint_in,
                                 token_out=mint_out,
-                                amount_in_wei=str(amount_in) if amount_in is not None else None,
-                                min_out_wei=str(amount_out) if amount_out is not None else None,
+                                amount_in_wei=amount_in,
+                                min_out_wei=amount_out,
                                 raw_input="",
+                                leader_block_time=block_time,
+                                detected_at=detected_at,
                             )
-                            sdb.add(rec)
+                            if insert_or_ignore(sdb, rec) is None:
+                                continue
+                        WATCHER_TRADES.labels(chain="solana").inc()
                         logger.info("Observed Solana trade: {} {} -> {}", w, mint_in, mint_out)
             except KeyboardInterrupt:
                 logger.info("Solana watcher interrupted; shutting down.")
@@ -160,6 +192,7 @@ class SolanaWatcher:
                     sig = value.get("signature")
                     if not sig:
                         continue
+                    detected_at = datetime.utcnow()
                     # Filter to our wallets if ALL is enabled or mentions are present
                     if self.settings.sol_subscribe_all:
                         m = value.get("mentions") or []
@@ -173,9 +206,15 @@ class SolanaWatcher:
                         ):
                             continue
                     txr = self.client.get_transaction(sig, max_supported_transaction_version=0)
+                    WATCHER_SIGNATURES.labels(chain="solana").inc()
                     res = txr.get("result")
                     if not res:
                         continue
+                    block_time = self.block_time(res)
+                    if block_time is None:
+                        logger.debug("Skipping {}: block time unknown", sig)
+                        continue
+                    _observe_lag(block_time, detected_at)
                     meta = res.get("meta") or {}
                     pre = meta.get("preTokenBalances") or []
                     post = meta.get("postTokenBalances") or []
@@ -212,11 +251,15 @@ class SolanaWatcher:
                             method="swap",
                             token_in=mint_in,
                             token_out=mint_out,
-                            amount_in_wei=str(amount_in) if amount_in is not None else None,
-                            min_out_wei=str(amount_out) if amount_out is not None else None,
+                            amount_in_wei=amount_in,
+                            min_out_wei=amount_out,
                             raw_input="",
+                            leader_block_time=block_time,
+                            detected_at=detected_at,
                         )
-                        sdb.add(rec)
+                        if insert_or_ignore(sdb, rec) is None:
+                            continue
+                    WATCHER_TRADES.labels(chain="solana").inc()
                     logger.info("Observed Solana trade (sub): {} {} -> {}", w, mint_in, mint_out)
             except Exception as e:
                 logger.exception("Solana subscription error: {}", e)
@@ -245,6 +288,10 @@ class SolanaWatcher:
                         res = txr.get("result")
                         if not res:
                             continue
+                        block_time = self.block_time(res, s.get("blockTime"))
+                        if block_time is None:
+                            logger.debug("Skipping {}: block time unknown", sig)
+                            continue
                         meta = res.get("meta") or {}
                         pre = meta.get("preTokenBalances") or []
                         post = meta.get("postTokenBalances") or []
@@ -263,17 +310,7 @@ class SolanaWatcher:
                             elif qa > pa:
                                 amount_out = qa - pa
                                 mint_out = p.get("mint")
-                        # Dedupe by (chain, tx_hash)
                         with session_scope(SessionFactory) as sdb:
-                            exists = (
-                                sdb.query(ObservedTrade.id)
-                                .filter(
-                                    ObservedTrade.chain == "solana", ObservedTrade.tx_hash == sig
-                                )
-                                .first()
-                            )
-                            if exists:
-                                continue
                             rec = ObservedTrade(
                                 chain="solana",
                                 tx_hash=sig,
@@ -283,13 +320,19 @@ class SolanaWatcher:
                                 method="swap",
                                 token_in=mint_in,
                                 token_out=mint_out,
-                                amount_in_wei=str(amount_in) if amount_in is not None else None,
-                                min_out_wei=str(amount_out) if amount_out is not None else None,
+                                amount_in_wei=amount_in,
+                                min_out_wei=amount_out,
                                 raw_input="",
+                                leader_block_time=block_time,
                             )
-                            sdb.add(rec)
-                            total += 1
+                            if insert_or_ignore(sdb, rec) is not None:
+                                total += 1
                 except Exception as e:
                     logger.debug("Backfill page failed for {}: {}", w, e)
                     break
         return total
+
+
+def _observe_lag(block_time: datetime, detected_at: datetime) -> None:
+    lag = (detected_at - block_time).total_seconds()
+    WATCHER_HEAD_LAG_SECONDS.labels(chain="solana").set(lag)
@@ -31,6 +31,37 @@ class DexRouters(BaseModel):
         8453: "0x61fFE014bA17989E743c5F6cB21bF9697530B21e",  # Base
     }
 
+    # Routers used to quote the other Uniswap protocol version when racing on-chain quotes.
+    # Only SwapRouter (v1) deployments are listed: SwapRouter02 has a different ABI.
+    v2_default_router: dict[int, str] = {
+        1: "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D",  # Uniswap V2
+        137: "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff",  # QuickSwap V2
+    }
+    v3_default_router: dict[int, str] = {
+        1: "0xE592427A0AEce92De3Edee1F18E0157C05861564",  # Uniswap V3 SwapRouter
+        137: "0xE592427A0AEce92De3Edee1F18E0157C05861564",  # Uniswap V3 SwapRouter
+    }
+    v3_fee_tiers: list[int] = [500, 3000, 10000]
+
+    # Factory and pair init code hash behind each V2 router, to derive pair addresses (CREATE2)
+    v2_factories: dict[str, tuple[str, str]] = {
+        "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D": (  # Uniswap V2
+            "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f",
+            "0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f",
+        ),
+        "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff": (  # QuickSwap V2
+            "0x5757371414417b8C6CAad45bAeF941aBc7d3Ab32",
+            "0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f",
+        ),
+    }
+
+    # Swap fee (bps) of each V2 router's pairs; routes of routers not listed here are
+    # always quoted via getAmountsOut
+    v2_fee_bps: dict[str, int] = {
+        "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D": 30,  # Uniswap V2: 0.3%
+        "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff": 30,  # QuickSwap V2: 0.3%
+    }
+
     # Wrapped native per chain (WETH)
     native_wrapped: dict[int, str] = {
         1: "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",  # WETH9
@@ -55,12 +86,28 @@ class AppSettings(BaseSettings):
     sol_executor_pubkey: str | None = None
     jupiter_quote_url: str = "https://quote-api.jup.ag/v6/quote"
     jupiter_swap_url: str = "https://quote-api.jup.ag/v6/swap"
+    jupiter_swap_instructions_url: str = "https://quote-api.jup.ag/v6/swap-instructions"
     sol_subscribe_logs: bool = False
     sol_subscribe_all: bool = (
         False  # if true, subscribe to all logs and filter locally (best-effort)
     )
     sol_backfill_pages: int = 0  # number of pages to backfill on startup (polling watcher)
     sol_backfill_limit: int = 100  # signatures per page during backfill
+    sol_max_in_flight: int = 8  # swaps sent but not yet confirmed, across the executor
+    sol_confirm_timeout_sec: float = 90.0  # mark a swap failed if unconfirmed this long
+    sol_confirm_poll_sec: float = 0.5  # getSignatureStatuses interval while swaps are in flight
+    # Priority fees from getRecentPrioritizationFees on the route's accounts
+    sol_priority_fee: bool = True
+    sol_priority_fee_percentile: float = 75.0
+    sol_priority_fee_window_slots: int = 4  # reuse an estimate for this many slots
+    sol_priority_fee_lookback_slots: int = 20  # recent slots the percentile is taken over
+    sol_priority_fee_min_micro_lamports: int = 0
+    sol_priority_fee_max_micro_lamports: int = 1_000_000  # per compute unit
+    sol_dynamic_compute_limit: bool = True  # let Jupiter size the compute unit limit
+    # Build swaps from Jupiter's swap instructions with a locally cached blockhash
+    sol_local_swap_build: bool = False
+    sol_blockhash_refresh_sec: float = 5.0
+    sol_lookup_table_ttl_sec: float = 300.0  # refetch cached address lookup tables this often
 
     # Execution
     dry_run: bool = True
@@ -72,9 +119,17 @@ class AppSettings(BaseSettings):
     tx_deadline_seconds: int = 600
     max_priority_fee_gwei: float | None = None
     max_fee_gwei: float | None = None
+    # Fee oracle: priority fee urgency 'low' | 'normal' | 'high' (eth_feeHistory percentiles)
+    gas_urgency: str = "normal"
+    gas_fee_refresh_sec: float | None = None  # defaults to the chain's block time
+    gas_estimate_buffer: float = 1.2  # multiplier applied to cached gas estimates
+    # ERC20 approvals: 'exact' | 'multiple' (of trade size) | 'unlimited' (trusted routers only)
+    approval_policy: str = "exact"
+    approval_multiple: float = 4.0
+    approval_trusted_spenders: str | None = None  # comma-separated, in addition to dex routers
 
     # Aggregators
-    aggregator: str | None = None  # '1inch' | '0x'
+    aggregator: str | None = None  # '1inch' | '0x', or a comma-separated list to race both
     oneinch_base_url: str = "https://api.1inch.dev/swap/v5.2"
     oneinch_api_key: str | None = None
     zeroex_base_url: str = "https://api.0x.org"
@@ -83,6 +138,38 @@ class AppSettings(BaseSettings):
     zeroex_base_url_arbitrum: str = "https://arbitrum.api.0x.org"
     zeroex_base_url_optimism: str = "https://optimism.api.0x.org"
 
+    # Quote racing across aggregators and on-chain quoters
+    quote_budget_ms: int = 1500  # quotes arriving later than this are ignored
+    # Also quote Uniswap V3 fee tiers for V2 trades, and the V2 router for V3 trades
+    quote_cross_protocol: bool = True
+    quote_cache_ttl_sec: float = 3.0  # aggregator quotes are reused this long; 0 disables
+    quote_amount_digits: int = 4  # copy amounts rounded down to N significant digits; 0 = exact
+
+    # Shared keep-alive HTTP client for aggregator, price, trace and discovery APIs
+    http_connect_timeout_sec: float = 3.05
+    http_read_timeout_sec: float = 15.0  # default when a call does not set its own
+    http_retries: int = 2  # on connection errors, timeouts and 429/5xx
+    http_backoff_sec: float = 0.25  # first retry delay, doubling (with jitter) up to 5s
+    http_pool_size: int = 16  # keep-alive connections per host
+    # Max requests/sec per host, e.g. {"api.coingecko.com": 0.5}
+    http_rate_limits: dict[str, float] = {}
+
+    # Local Uniswap V2 reserves, kept current from Sync logs, for RPC-free V2 quotes
+    v2_local_reserves: bool = True
+    v2_reserve_stale_sec: float = 30.0  # fall back to getAmountsOut if Sync polling lags this much
+    v2_reserve_idle_sec: float = 3600.0  # stop tracking pairs no route used for this long
+    v2_reserve_max_pairs: int = 5000  # and the least recently used ones beyond this many
+    v2_missing_pair_ttl_sec: float = 300.0  # remember hops with no deployed pair this long
+
+    # Dry-run built swaps (eth_call / simulateTransaction) and skip ones that would revert
+    simulate_swaps: bool = True
+    # Also skip EVM swaps whose simulated output is this far below the quote
+    simulate_max_shortfall_bps: int = 500
+
+    # Coalesce same-pair copy trades observed within this window into one swap; 0 disables
+    coalesce_window_sec: float = 0.0
+    coalesce_max_trades: int = 20
+
     # Discovery feature toggles
     enable_gmgn: bool = False
 
@@ -97,11 +184,34 @@ class AppSettings(BaseSettings):
     nansen_base_url: str | None = None
     nansen_endpoint_path: str | None = None
 
+    # USD prices: sources tried in order ('coingecko', 'defillama'), cached per token
+    price_sources: str = "coingecko,defillama"
+    price_ttl_sec: float = 60.0
+    price_stale_sec: float = 600.0  # serve prices up to this old while refreshing in background
+    price_retry_sec: float = 30.0  # after all sources fail, wait this long before asking again
+    price_max_stale_sec: float = 3600.0  # never serve a price older than this
+    coingecko_base_url: str = "https://api.coingecko.com/api/v3"
+    coingecko_api_key: str | None = None
+
+    # PnL enricher: prices executed trades in the background (services/enricher)
+    enrich_interval_sec: float = 5.0
+    enrich_batch_size: int = 200
+    enrich_retry_sec: float = 300.0  # retry trades that could not be priced this often
+    enrich_max_age_sec: float = 86400.0  # give up on trades older than this
+    enrich_solana: bool = True  # also price Solana trades (disable on extra EVM-chain workers)
+
+    # Retention (services/retention, Postgres only): trade tables are partitioned by month;
+    # partitions entirely older than retention_days are archived to Parquet and dropped
+    retention_days: int = 90  # 0 keeps everything
+    retention_archive_dir: str = "archive"
+    retention_interval_sec: float = 3600.0
+    partition_months_ahead: int = 2  # monthly partitions created in advance
+
     # Alchemy (optional for traces/receipts)
     alchemy_api_key: str | None = None
     alchemy_base_url: str | None = None
 
-    # Aggregator per chain (overrides global aggregator). Values: '1inch' | '0x'
+    # Aggregator per chain (overrides global aggregator). Values: '1inch' | '0x' | '1inch,0x'
     aggregator_chain_1: str | None = None
     aggregator_chain_137: str | None = None
     aggregator_chain_8453: str | None = None
@@ -117,6 +227,7 @@ class AppSettings(BaseSettings):
 
     # Config files
     wallets_config: str = "config/wallets.yaml"
+    policy_reload_interval_sec: float = 2.0  # how often executors check wallets.yaml for changes
 
     # Dex routers
     dex_routers: DexRouters = DexRouters()
@@ -127,8 +238,19 @@ class AppSettings(BaseSettings):
     # Logging
     log_level: str = "INFO"
 
+    # Prometheus metrics at http://<service>:<port>/metrics (the API serves /metrics itself)
+    metrics_port: int = 9100  # 0 disables
+    rpc_summary_interval_sec: float = 300.0  # log the busiest RPC methods this often; 0 disables
+    rpc_bytes_sample_rate: float = 0.0  # share of RPC calls sized for tce_rpc_bytes_total; 0 = off
+
     # --- Validators to coerce empty strings in optional envs to None ---
-    @field_validator("max_priority_fee_gwei", "max_fee_gwei", "dune_query_id", mode="before")
+    @field_validator(
+        "max_priority_fee_gwei",
+        "max_fee_gwei",
+        "gas_fee_refresh_sec",
+        "dune_query_id",
+        mode="before",
+    )
     @classmethod
     def _empty_str_to_none(cls, v):
         if v == "":
@@ -2,17 +2,24 @@ from __future__ import annotations
 
 from collections.abc import Generator
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
+    JSON,
     Boolean,
+    Date,
     DateTime,
-    ForeignKey,
+    Index,
     Integer,
+    Numeric,
     String,
     Text,
+    TypeDecorator,
+    UniqueConstraint,
     create_engine,
 )
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -27,6 +34,32 @@ class Base(DeclarativeBase):
     pass
 
 
+class TokenAmount(TypeDecorator):
+    """Raw token amount (wei, lamports, base units) as an exact integer.
+
+    Stored as NUMERIC(78,0), which holds any uint256, so amounts can be summed and
+    bucketed in SQL. SQLite (tests, local runs) has no exact 78-digit type and keeps
+    the decimal string instead. Python code always sees `int`.
+    """
+
+    impl = Numeric(78, 0)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String(80))
+        return dialect.type_descriptor(Numeric(78, 0, asdecimal=True))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or value == "":
+            return None
+        value = int(value)
+        return str(value) if dialect.name == "sqlite" else value
+
+    def process_result_value(self, value, dialect):
+        return int(value) if value is not None else None
+
+
 class WalletFollow(Base):
     __tablename__ = "wallet_follows"
 
@@ -38,10 +71,21 @@ class WalletFollow(Base):
 
 
 class ObservedTrade(Base):
+    """A followed wallet's swap, as seen by a watcher.
+
+    On Postgres the table is range-partitioned by month on `leader_block_time` (see
+    `trade_clone_engine.retention`); the primary key and the unique constraint there
+    also carry that column.
+    """
+
     __tablename__ = "observed_trades"
+    # A leader transaction is stored once per followed wallet, however often it is seen
+    __table_args__ = (
+        UniqueConstraint("chain", "tx_hash", "wallet", name="uq_observed_trades_chain_tx_wallet"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    chain: Mapped[str] = mapped_column(String(16), index=True)
+    chain: Mapped[str] = mapped_column(String(16))  # leading column of the unique constraint
     tx_hash: Mapped[str] = mapped_column(String(80), index=True)
     block_number: Mapped[int] = mapped_column(Integer)
     wallet: Mapped[str] = mapped_column(String(64), index=True)
@@ -49,37 +93,175 @@ class ObservedTrade(Base):
     method: Mapped[str | None] = mapped_column(String(64))
     token_in: Mapped[str | None] = mapped_column(String(64))
     token_out: Mapped[str | None] = mapped_column(String(64))
-    amount_in_wei: Mapped[str | None] = mapped_column(String(80))
-    min_out_wei: Mapped[str | None] = mapped_column(String(80))
+    amount_in_wei: Mapped[int | None] = mapped_column(TokenAmount)
+    min_out_wei: Mapped[int | None] = mapped_column(TokenAmount)
     raw_input: Mapped[str | None] = mapped_column(Text)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    processed: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    # Decoded swap arguments (execution.calldata.swap_params), so nothing re-decodes raw_input
+    params: Mapped[dict | None] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=True
+    )
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # persisted
+    processed: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Latency stages: leader's block time and when the watcher saw the transaction. The
+    # block time is the partition key and part of the dedupe key, so watchers always take
+    # it from the chain; the insert-time default only serves rows written by hand.
+    leader_block_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    detected_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
-    executions: Mapped[list[ExecutedTrade]] = relationship(back_populates="observed_trade")
+    executions: Mapped[list[ExecutedTrade]] = relationship(
+        back_populates="observed_trade",
+        primaryjoin="ObservedTrade.id == foreign(ExecutedTrade.observed_trade_id)",
+    )
+
+
+# Executor queue: only the unprocessed tail, in id order per chain. Queue queries must
+# filter on exactly `processed.is_(False)` for the planner to match the predicate.
+Index(
+    "ix_observed_trades_unprocessed",
+    ObservedTrade.chain,
+    ObservedTrade.id,
+    postgresql_where=ObservedTrade.processed.is_(False),
+    sqlite_where=ObservedTrade.processed.is_(False),
+)
 
 
 class ExecutedTrade(Base):
+    """Outcome of copying an observed trade.
+
+    Range-partitioned by month on `created_at` on Postgres. Partitioned tables cannot be
+    the target of a single-column foreign key, so `observed_trade_id` is a plain indexed
+    reference; the retention job archives both tables by age.
+    """
+
     __tablename__ = "executed_trades"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    observed_trade_id: Mapped[int] = mapped_column(ForeignKey("observed_trades.id"), index=True)
+    observed_trade_id: Mapped[int] = mapped_column(Integer, index=True)
     status: Mapped[str] = mapped_column(String(32), default="skipped")  # skipped|success|failed
     tx_hash: Mapped[str | None] = mapped_column(String(80), index=True)
-    gas_spent_wei: Mapped[str | None] = mapped_column(String(80))
+    gas_spent_wei: Mapped[int | None] = mapped_column(TokenAmount)
     error: Mapped[str | None] = mapped_column(Text)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
 
     # PnL/amount tracking
     token_in: Mapped[str | None] = mapped_column(String(64), index=True)
     token_out: Mapped[str | None] = mapped_column(String(64), index=True)
-    amount_in_wei: Mapped[str | None] = mapped_column(String(80))
-    amount_out_wei: Mapped[str | None] = mapped_column(String(80))
+    amount_in_wei: Mapped[int | None] = mapped_column(TokenAmount)
+    amount_out_wei: Mapped[int | None] = mapped_column(TokenAmount)
     amount_in_usd: Mapped[float | None] = mapped_column()
     amount_out_usd: Mapped[float | None] = mapped_column()
     pnl_usd: Mapped[float | None] = mapped_column()
     realized_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Chain key ('evm:<id>' | 'solana') and last pricing attempt, for the PnL enricher
+    chain: Mapped[str | None] = mapped_column(String(16), nullable=True, index=True)
+    enriched_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    # Venue that won the quote race, and every venue's quote/latency for that trade
+    venue: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    quotes: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+    # Latency stages of our copy; created_at is when the outcome was recorded
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    quoted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    signed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    confirmed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    observed_trade: Mapped[ObservedTrade] = relationship(
+        back_populates="executions",
+        primaryjoin="ObservedTrade.id == foreign(ExecutedTrade.observed_trade_id)",
+    )
+
+
+class PnlRollup(Base):
+    """Realized PnL of successful executions per (day, followed wallet, chain, token bought).
+
+    Maintained incrementally by the PnL enricher as it prices executions, so PnL queries
+    read a few rows per day instead of joining the full trade history.
+    """
+
+    __tablename__ = "pnl_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    wallet: Mapped[str] = mapped_column(String(64), primary_key=True)
+    chain: Mapped[str] = mapped_column(String(16), primary_key=True)  # 'evm:<id>' | 'solana'
+    token: Mapped[str] = mapped_column(String(64), primary_key=True)  # token_out of the trades
+    trades: Mapped[int] = mapped_column(Integer, default=0)
+    amount_in_usd: Mapped[float] = mapped_column(default=0.0)
+    amount_out_usd: Mapped[float] = mapped_column(default=0.0)
+    pnl_usd: Mapped[float] = mapped_column(default=0.0)
+
+
+class TokenMetadata(Base):
+    __tablename__ = "token_metadata"
+
+    chain: Mapped[str] = mapped_column(String(16), primary_key=True)  # 'evm:<id>' | 'solana'
+    address: Mapped[str] = mapped_column(String(64), primary_key=True)
+    decimals: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    symbol: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+def utc_from_unix(ts: int | float | None) -> datetime | None:
+    """Naive UTC datetime (like the rest of the schema) for a unix timestamp."""
+    if ts is None:
+        return None
+    return datetime.utcfromtimestamp(int(ts))
+
+
+def insert_or_ignore(session: Session, obj: Base) -> int | None:
+    """Inserts a new ORM object unless it violates a unique constraint.
+
+    Uses INSERT ... ON CONFLICT DO NOTHING where supported, so concurrent watchers can
+    store the same trade without a read-before-write. Returns (and sets) the new id,
+    or None if the row already existed.
+    """
+    table = obj.__table__
+    values = {c.key: getattr(obj, c.key) for c in table.columns if getattr(obj, c.key) is not None}
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**values).on_conflict_do_nothing().returning(table.c.id)
+        new_id = session.execute(stmt).scalar()
+    else:
+        try:
+            with session.begin_nested():
+                new_id = session.execute(table.insert().values(**values)).inserted_primary_key[0]
+        except IntegrityError:
+            new_id = None
+    if new_id is not None:
+        obj.id = new_id
+    return new_id
+
+
+def upsert_add(session: Session, table, keys: dict, increments: dict) -> None:
+    """Adds `increments` to the row of `table` identified by `keys`, creating it if needed.
 
-    observed_trade: Mapped[ObservedTrade] = relationship(back_populates="executions")
+    A single INSERT ... ON CONFLICT DO UPDATE where supported, so concurrent writers never
+    lose an update; elsewhere the row is locked and updated, or inserted.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: table.c[c] + stmt.excluded[c] for c in increments},
+        )
+        session.execute(stmt)
+        return
+    where = [table.c[k] == v for k, v in keys.items()]
+    updated = session.execute(
+        table.update().where(*where).values({c: table.c[c] + v for c, v in increments.items()})
+    ).rowcount
+    if not updated:
+        session.execute(table.insert().values(**keys, **increments))
 
 
 def make_engine(database_url: str):
@@ -26,8 +26,8 @@ WITH swaps AS (
     s.tx_hash,
     s.block_time,
     s.is_meme,
-    s.amount_in_raw * p_in.price_usd / 1e18 AS amount_in_usd,
-    s.amount_out_raw * p_out.price_usd / 1e18 AS amount_out_usd
+    s.amount_in_raw * p_in.price_usd / POWER(10, p_in.decimals) AS amount_in_usd,
+    s.amount_out_raw * p_out.price_usd / POWER(10, p_out.decimals) AS amount_out_usd
   FROM swaps s
   LEFT JOIN prices.usd p_in ON p_in.contract_address = s.token_in AND p_in.minute = date_trunc('minute', s.block_time)
   LEFT JOIN prices.usd p_out ON p_out.contract_address = s.token_out AND p_out.minute = date_trunc('minute', s.block_time)
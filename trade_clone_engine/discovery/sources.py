@@ -4,9 +4,10 @@ import os
 from dataclasses import dataclass
 from typing import Any
 
-import requests
 from loguru import logger
 
+from trade_clone_engine.http_client import http_client
+
 WalletRec = dict[str, Any]
 
 
@@ -22,7 +23,7 @@ class DuneSource:
             return []
         headers = {"X-DUNE-API-KEY": self.api_key}
         url = f"{self.base_url}/query/{self.query_id}/results"
-        r = requests.get(url, headers=headers, timeout=30)
+        r = http_client.get(url, headers=headers, timeout=30)
         if not r.ok:
             logger.warning("DuneSource error: {}", r.text)
             return []
@@ -94,7 +95,7 @@ class BirdeyeSource:
                     "offset": offset,
                     "limit": req_limit,
                 }
-                r = requests.get(url, headers=headers, params=params, timeout=20)
+                r = http_client.get(url, headers=headers, params=params, timeout=20)
                 if not r.ok:
                     logger.warning("Birdeye error ({}): {}", r.status_code, url)
                     break
@@ -143,7 +144,7 @@ class GMGNSource:
         # Placeholder implementation; endpoint depends on GMGN plan.
         try:
             url = f"{self.base_url}/solana/traders/top"
-            r = requests.get(url, timeout=20)
+            r = http_client.get(url, timeout=20)
             if not r.ok:
                 logger.warning("GMGN error ({}): {}", r.status_code, url)
                 return []
@@ -261,9 +262,9 @@ class NansenSource:
                     filters["exclude_smart_money_labels"] = exclude_labels
                 if filters:
                     body["filters"] = filters
-                r = requests.post(url, headers=headers, json=body, timeout=30)
+                r = http_client.post(url, headers=headers, json=body, timeout=30)
             else:
-                r = requests.get(url, headers=headers, timeout=20)
+                r = http_client.get(url, headers=headers, timeout=20)
             if not r.ok:
                 logger.warning("Nansen error: {} => {}", url, r.text)
                 return []
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from eth_utils import keccak
+from loguru import logger
+
+from trade_clone_engine.execution.contracts import hexstr
+from trade_clone_engine.execution.evm_wallet import EvmWallet, unsigned_tx
+from trade_clone_engine.providers.instrumentation import rpc_component
+
+MAX_UINT256 = 2**256 - 1
+
+APPROVAL_POLICIES = ("exact", "multiple", "unlimited")
+
+# Storage slots tried for a token's allowance mapping, in Solidity and Vyper layouts
+ALLOWANCE_SLOTS_PROBED = 12
+_PROBE_VALUE = 10**30 + 7
+
+
+def _word(value: int | str) -> bytes:
+    if isinstance(value, str):
+        return bytes.fromhex(value.removeprefix("0x")).rjust(32, b"\0")
+    return int(value).to_bytes(32, "big")
+
+
+def allowance_slot(owner: str, spender: str, slot: int, vyper: bool = False) -> str:
+    """Storage key of `allowance[owner][spender]` for a mapping declared at `slot`."""
+    if vyper:
+        inner = keccak(_word(slot) + _word(owner))
+        return "0x" + keccak(inner + _word(spender)).hex()
+    inner = keccak(_word(owner) + _word(slot))
+    return "0x" + keccak(_word(spender) + inner).hex()
+
+
+@dataclass
+class AllowanceCache:
+    """Tracks ERC20 allowances granted by the executor wallet, per (token, spender).
+
+    The on-chain allowance is read once per key; afterwards the cached value is kept
+    current from our own approval receipts and decremented as swaps spend it.
+    """
+
+    wallet: EvmWallet
+    policy: str = "exact"  # 'exact' | 'multiple' | 'unlimited'
+    multiple: float = 1.0
+    trusted_spenders: set[str] = field(default_factory=set)
+    receipt_timeout: int = 120
+    _known: dict[tuple[str, str], int] = field(default_factory=dict)
+    # token -> (mapping slot, vyper layout), or None when no probed slot matched
+    _slots: dict[str, tuple[int, bool] | None] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.policy not in APPROVAL_POLICIES:
+            logger.warning("Unknown approval policy {!r}; using 'exact'", self.policy)
+            self.policy = "exact"
+        self.trusted_spenders = {s.lower() for s in self.trusted_spenders}
+
+    @staticmethod
+    def _key(token: str, spender: str) -> tuple[str, str]:
+        return token.lower(), spender.lower()
+
+    def get(self, token: str, spender: str) -> int:
+        key = self._key(token, spender)
+        if key not in self._known:
+            erc20 = self.wallet.erc20(token)
+            self._known[key] = int(erc20.functions.allowance(self.wallet.address, spender).call())
+        return self._known[key]
+
+    def is_known(self, token: str, spender: str) -> bool:
+        return self._key(token, spender) in self._known
+
+    def seed(self, token: str, spender: str, value: int) -> None:
+        self._known[self._key(token, spender)] = int(value)
+
+    def invalidate(self, token: str, spender: str) -> None:
+        self._known.pop(self._key(token, spender), None)
+
+    def needs_approval(self, token: str, spender: str, amount: int) -> bool:
+        return self.get(token, spender) < amount
+
+    def state_override(self, token: str, spender: str, amount: int) -> dict | None:
+        """eth_call state override granting `spender` an allowance of `amount` of `token`.
+
+        Lets a swap be simulated before paying for its approval. The allowance mapping's
+        slot is found once per token by probing; None if no probed slot matched.
+        """
+        token_key = token.lower()
+        if token_key not in self._slots:
+            self._slots[token_key] = self._probe_slot(token, spender)
+        found = self._slots[token_key]
+        if found is None:
+            return None
+        key = allowance_slot(self.wallet.address, spender, *found)
+        return {token: {"stateDiff": {key: "0x" + _word(amount).hex()}}}
+
+    def _probe_slot(self, token: str, spender: str) -> tuple[int, bool] | None:
+        allowance = self.wallet.erc20(token).functions.allowance(self.wallet.address, spender)
+        probe = "0x" + _word(_PROBE_VALUE).hex()
+        for vyper in (False, True):
+            for slot in range(ALLOWANCE_SLOTS_PROBED):
+                key = allowance_slot(self.wallet.address, spender, slot, vyper)
+                try:
+                    value = allowance.call(state_override={token: {"stateDiff": {key: probe}}})
+                except Exception as e:
+                    logger.debug("Allowance slot probe of {} failed: {}", token, e)
+                    return None
+                if int(value) == _PROBE_VALUE:
+                    return slot, vyper
+        logger.debug("No allowance slot found for {}", token)
+        return None
+
+    def approval_amount(self, spender: str, amount: int) -> int:
+        if self.policy == "unlimited" and spender.lower() in self.trusted_spenders:
+            return MAX_UINT256
+        if self.policy == "multiple":
+            return max(int(amount), int(amount * max(1.0, self.multiple)))
+        return int(amount)
+
+    def ensure(self, token: str, spender: str, amount: int) -> str | None:
+        """Approve `spender` if the known allowance is short; returns the approve tx hash.
+
+        Waits for the approval receipt so the swap that follows cannot race it.
+        """
+        if self.get(token, spender) >= amount:
+            return None
+        value = self.approval_amount(spender, amount)
+        logger.info("Approving {} for {} wei of {} ({})", spender, value, token, self.policy)
+        erc20 = self.wallet.erc20(token)
+        tx = unsigned_tx(erc20.functions.approve(spender, value))
+        tx_hash = self.wallet.send_tx(tx, gas_key=(token, "approve", 0))
+        logger.info("Approve tx: {}", tx_hash)
+        with rpc_component("receipts"):
+            rcpt = self.wallet.w3.eth.wait_for_transaction_receipt(
+                tx_hash, timeout=self.receipt_timeout
+            )
+        if not rcpt or rcpt.get("status") != 1:
+            self.invalidate(token, spender)
+            raise Exception(f"Approval {tx_hash} failed")
+        self.seed(token, spender, self._approved_value(rcpt, token, value))
+        return tx_hash
+
+    def consume(self, token: str, spender: str, amount: int) -> None:
+        key = self._key(token, spender)
+        known = self._known.get(key)
+        # OpenZeppelin-style tokens do not decrement an infinite allowance
+        if known is None or known == MAX_UINT256:
+            return
+        self._known[key] = max(0, known - int(amount))
+
+    def _approved_value(self, rcpt, token: str, fallback: int) -> int:
+        approval_sig = self.wallet.w3.keccak(text="Approval(address,address,uint256)").hex()
+        for lg in rcpt.get("logs", []):
+            topics = lg.get("topics", [])
+            if (
+                lg.get("address", "").lower() == token.lower()
+                and topics
+                and hexstr(topics[0]) == hexstr(approval_sig)
+            ):
+                data = lg.get("data", "0x0")
+                raw = data.hex() if hasattr(data, "hex") else str(data)
+                return int(raw or "0", 16)
+        return int(fallback)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from loguru import logger
+
+
+def _amount(value) -> str | None:
+    # uint256 exceeds JSON's safe integer range, so amounts are kept as decimal strings
+    return str(int(value)) if value is not None else None
+
+
+def swap_params(protocol: str, method: str, params: dict) -> dict:
+    """JSON-safe view of decoded Uniswap router arguments, the same for V2 and V3.
+
+    Keys: protocol ('v2' | 'v3'), method, path (token addresses, in order), amount_in and
+    amount_out_min (decimal strings; no amount_in for swaps paid in native value),
+    recipient, deadline and, for V3, fee.
+    """
+    args = params.get("params") if isinstance(params.get("params"), dict) else params
+    if protocol == "v3":
+        path = [a for a in (args.get("tokenIn"), args.get("tokenOut")) if a]
+    else:
+        path = list(args.get("path") or [])
+    recipient = args.get("to", args.get("recipient"))
+    out = {
+        "protocol": protocol,
+        "method": method,
+        "path": [str(a) for a in path],
+        "amount_in": _amount(args.get("amountIn")),
+        "amount_out_min": _amount(args.get("amountOutMin", args.get("amountOutMinimum"))),
+        "recipient": str(recipient) if recipient else None,
+        "deadline": int(args["deadline"]) if args.get("deadline") is not None else None,
+    }
+    if args.get("fee") is not None:
+        out["fee"] = int(args["fee"])
+    return out
+
+
+def decode_swap(v2_decoder, v3_decoder, calldata: bytes | str) -> dict | None:
+    """Decodes router calldata against the V2 then the V3 ABI; None if neither matches."""
+    for protocol, decoder in (("v2", v2_decoder), ("v3", v3_decoder)):
+        try:
+            func, params = decoder.decode_function_input(calldata)
+        except Exception:
+            continue
+        try:
+            return swap_params(protocol, func.fn_name, params)
+        except Exception as e:
+            logger.debug("Unexpected {} arguments for {}: {}", protocol, func.fn_name, e)
+            return None
+    return None
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cache, lru_cache
+from pathlib import Path
+
+from web3 import Web3
+from web3.contract import Contract
+
+ABI_DIR = Path(__file__).resolve().parent.parent / "abi"
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+@cache
+def load_abi(name: str) -> list:
+    return json.loads((ABI_DIR / name).read_text())
+
+
+@lru_cache(maxsize=8192)
+def checksum(address: str) -> str:
+    return Web3.to_checksum_address(address)
+
+
+def hexstr(value) -> str:
+    """Lowercase hex without 0x prefix, for comparing topics across HexBytes/str versions."""
+    s = value.hex() if hasattr(value, "hex") else str(value)
+    return s.lower().removeprefix("0x")
+
+
+@dataclass
+class ContractRegistry:
+    """Caches contract instances per (address, ABI) with their functions pre-resolved.
+
+    Building a web3 contract parses the ABI and checksums the address; the executor
+    otherwise repeats that for every trade on the same handful of routers and tokens.
+    One entry is kept per token seen, so only the `max_size` most recently used stay.
+    """
+
+    w3: Web3
+    max_size: int = 8192
+    _contracts: OrderedDict[tuple[str, str], tuple[Contract, dict]] = field(
+        default_factory=OrderedDict
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def _entry(self, address: str, abi_name: str) -> tuple[Contract, dict]:
+        key = (address.lower(), abi_name)
+        with self._lock:
+            entry = self._contracts.get(key)
+            if entry is not None:
+                self._contracts.move_to_end(key)
+                return entry
+        contract = self.w3.eth.contract(address=checksum(address), abi=load_abi(abi_name))
+        functions = {
+            item["name"]: getattr(contract.functions, item["name"])
+            for item in contract.abi
+            if item.get("type") == "function"
+        }
+        with self._lock:
+            self._contracts[key] = (contract, functions)
+            while len(self._contracts) > self.max_size:
+                self._contracts.popitem(last=False)
+        return contract, functions
+
+    def get(self, address: str, abi_name: str) -> Contract:
+        return self._entry(address, abi_name)[0]
+
+    def fn(self, address: str, abi_name: str, name: str):
+        """Returns the pre-resolved contract function `name`, ready to be called with args."""
+        return self._entry(address, abi_name)[1][name]
+
+    def decoder(self, abi_name: str) -> Contract:
+        """Address-less contract used only for decoding calldata."""
+        return self.get(ZERO_ADDRESS, abi_name)
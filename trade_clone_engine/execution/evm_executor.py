@@ -1,32 +1,82 @@
 from __future__ import annotations
 
-import json
 import time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from functools import partial
 
 from loguru import logger
-from sqlalchemy import select
-from web3 import Web3
+from sqlalchemy import func, select
 
 from trade_clone_engine.aggregators import oneinch as agg_oneinch
 from trade_clone_engine.aggregators import zeroex as agg_zeroex
-from trade_clone_engine.analytics.pricing import get_token_price_usd
+from trade_clone_engine.aggregators.cache import quote_cache
+from trade_clone_engine.analytics.tokens import chain_key
 from trade_clone_engine.config import AppSettings
 from trade_clone_engine.db import ExecutedTrade, ObservedTrade, session_scope
+from trade_clone_engine.execution.allowances import AllowanceCache
+from trade_clone_engine.execution.calldata import decode_swap
+from trade_clone_engine.execution.contracts import ZERO_ADDRESS, checksum, hexstr
 from trade_clone_engine.execution.evm_wallet import EvmWallet
+from trade_clone_engine.execution.gas import BLOCK_TIME_SEC, FeeOracle, GasEstimateCache
+from trade_clone_engine.execution.multicall import MulticallReader
+from trade_clone_engine.execution.policy import PolicyIndex, WalletPolicy
+from trade_clone_engine.execution.quotes import Quote, QuoteEngine
+from trade_clone_engine.execution.reserves import ReserveTracker
+from trade_clone_engine.execution.simulation import shortfall_bps, simulate_evm
 from trade_clone_engine.execution.uniswap_v2 import (
     V2SwapPlan,
+    apply_slippage,
     build_swap_exact_eth_for_tokens,
     build_swap_exact_tokens_for_eth,
     build_swap_exact_tokens_for_tokens,
-    compute_min_out,
 )
 from trade_clone_engine.execution.uniswap_v3 import (
     V3SinglePlan,
     build_exact_input_single,
-    compute_min_out_single,
 )
 from trade_clone_engine.providers.alchemy import trace_native_received
+from trade_clone_engine.providers.instrumentation import rpc_component
+from trade_clone_engine.telemetry import EXECUTIONS
+
+V2_METHODS = ("swapExactETHForTokens", "swapExactTokensForETH", "swapExactTokensForTokens")
+V3_METHODS = ("exactInputSingle",)
+
+# 1inch's placeholder address for the chain's native coin
+ONEINCH_NATIVE = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+
+
+@dataclass
+class TradeIntent:
+    """A trade to mirror, independent of the venue that ends up executing it."""
+
+    method: str
+    router: str  # router the leader used
+    token_in: str
+    token_out: str
+    amount_in: int
+    native_in: bool = False
+    native_out: bool = False
+    path: list[str] = field(default_factory=list)
+    fee: int | None = None  # set when the leader swapped on Uniswap V3
+
+
+@dataclass
+class ExecutionResult:
+    status: str = "skipped"  # skipped|success|failed
+    tx_hash: str | None = None
+    error: str | None = None
+    gas_spent: int | None = None
+    amount_in: int | None = None
+    amount_out: int | None = None
+    venue: str | None = None
+    quotes: dict | None = None
+    stages: dict[str, datetime] = field(default_factory=dict)  # quoted|signed|sent|confirmed
+
+
+class UnsupportedTrade(Exception):
+    """The observed call is not a swap shape we can mirror; the trade is skipped."""
 
 
 class EvmExecutor:
@@ -39,653 +89,729 @@ class EvmExecutor:
             explicit_address=settings.executor_address,
         )
 
-        # Load ABIs for decoding inputs (same as watcher)
-        abi_dir = Path(__file__).resolve().parent.parent / "abi"
-        self.v2_abi = json.loads((abi_dir / "uniswap_v2_router.json").read_text())
-        self.v3_abi = json.loads((abi_dir / "uniswap_v3_router.json").read_text())
-        self.v3_quoter_abi = json.loads((abi_dir / "uniswap_v3_quoter.json").read_text())
-        # Dummy contracts for decoding only
-        dummy = "0x0000000000000000000000000000000000000000"
-        self.v2_decoder = self.wallet.w3.eth.contract(address=dummy, abi=self.v2_abi)
-        self.v3_decoder = self.wallet.w3.eth.contract(address=dummy, abi=self.v3_abi)
-
-    def _try_aggregator(
-        self,
-        token_in: str,
-        token_out: str,
-        amount_in: int,
-        is_native_in: bool,
-        slippage_bps: int,
-    ) -> tuple[str | None, int | None]:
+        self.wallet.fee_oracle = FeeOracle.for_chain(
+            self.wallet.w3, settings.evm_chain_id, settings.gas_fee_refresh_sec
+        )
+        self.wallet.gas_cache = GasEstimateCache(buffer=settings.gas_estimate_buffer)
+        self.wallet.urgency = settings.gas_urgency
+        trusted = {a.lower() for a in settings.dex_routers.evm.get(settings.evm_chain_id, [])} | {
+            a.strip().lower()
+            for a in (settings.approval_trusted_spenders or "").split(",")
+            if a.strip()
+        }
+        self.allowances = AllowanceCache(
+            wallet=self.wallet,
+            policy=(settings.approval_policy or "exact").lower(),
+            multiple=settings.approval_multiple,
+            trusted_spenders=trusted,
+        )
+
+        self.policies = PolicyIndex(
+            settings, check_interval_sec=settings.policy_reload_interval_sec
+        )
+        self.quotes = QuoteEngine(budget_ms=settings.quote_budget_ms)
+        self._sim_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="simulate")
+        self.multicall = MulticallReader(self.wallet.w3, self.wallet.contracts)
+        self.reserves: ReserveTracker | None = None
+        if settings.v2_local_reserves:
+            self.reserves = ReserveTracker(
+                w3=self.wallet.w3,
+                reader=self.multicall,
+                factories=settings.dex_routers.v2_factories,
+                fees_bps=settings.dex_routers.v2_fee_bps,
+                stale_after_sec=settings.v2_reserve_stale_sec,
+                idle_sec=settings.v2_reserve_idle_sec,
+                max_pairs=settings.v2_reserve_max_pairs,
+                missing_ttl_sec=settings.v2_missing_pair_ttl_sec,
+            )
+        quote_cache.configure(
+            ttl_sec=settings.quote_cache_ttl_sec, amount_digits=settings.quote_amount_digits
+        )
+
+        # Decoders for trades observed before the watcher stored decoded params
+        self.v2_decoder = self.wallet.contracts.decoder("uniswap_v2_router.json")
+        self.v3_decoder = self.wallet.contracts.decoder("uniswap_v3_router.json")
+
+    # --- Quoting ---------------------------------------------------------------------
+
+    def _aggregators(self) -> list[str]:
         # Select aggregator per-chain override if provided
         agg_name = (
             getattr(self.settings, f"aggregator_chain_{self.settings.evm_chain_id}", None)
             or self.settings.aggregator
         )
-        if not agg_name:
-            return None, None
-        agg = agg_name.lower()
+        return [a.strip().lower() for a in (agg_name or "").split(",") if a.strip()]
+
+    def _aggregator_quote(self, agg: str, intent: TradeIntent, slippage_bps: int) -> Quote:
+        chain_id = self.settings.evm_chain_id
+        if agg == "1inch":
+            q = agg_oneinch.get_swap_quote(
+                base_url=self.settings.oneinch_base_url,
+                chain_id=chain_id,
+                src_token=(ONEINCH_NATIVE if intent.native_in else intent.token_in),
+                dst_token=(ONEINCH_NATIVE if intent.native_out else intent.token_out),
+                amount_in=intent.amount_in,
+                from_address=self.wallet.address,
+                slippage_bps=slippage_bps,
+                api_key=self.settings.oneinch_api_key,
+            )
+        elif agg == "0x":
+            if chain_id == 137:
+                base_url = self.settings.zeroex_base_url_polygon
+            elif chain_id == 8453:
+                base_url = self.settings.zeroex_base_url_base_chain
+            else:
+                base_url = self.settings.zeroex_base_url
+            q = agg_zeroex.get_swap_quote(
+                base_url=base_url,
+                chain_id=chain_id,
+                sell_token=("ETH" if intent.native_in else intent.token_in),
+                buy_token=("ETH" if intent.native_out else intent.token_out),
+                sell_amount=intent.amount_in,
+                taker_address=self.wallet.address,
+                slippage_bps=slippage_bps,
+            )
+        else:
+            raise ValueError(f"Unknown aggregator: {agg}")
+        return Quote(
+            venue=agg,
+            amount_out=int(q.get("buyAmount") or 0),
+            tx={"to": q["to"], "data": q["data"], "value": int(q.get("value") or 0)},
+            spender=q.get("allowanceTarget"),
+        )
+
+    def _v2_route(
+        self, router_addr: str, intent: TradeIntent, amount_out: int = 0, venue: str = "uniswap_v2"
+    ) -> Quote:
+        router = self.wallet.router_v2(router_addr)
+        if intent.native_in:
+            method, build = "swapExactETHForTokens", build_swap_exact_eth_for_tokens
+        elif intent.native_out:
+            method, build = "swapExactTokensForETH", build_swap_exact_tokens_for_eth
+        else:
+            method, build = "swapExactTokensForTokens", build_swap_exact_tokens_for_tokens
+
+        def build_tx(min_out: int) -> dict:
+            plan = V2SwapPlan(
+                method=method,
+                router=router_addr,
+                path=intent.path,
+                amount_in=intent.amount_in,
+                min_out=min_out,
+                recipient=self._recipient(),
+                deadline=self._deadline(),
+                value=intent.amount_in if intent.native_in else 0,
+            )
+            return build(router, plan)
+
+        return Quote(
+            venue=venue,
+            amount_out=amount_out,
+            build=build_tx,
+            spender=None if intent.native_in else router_addr,
+            gas_key=(router_addr, method, len(intent.path)),
+            returns="uint256[]",
+        )
+
+    def _v3_route(
+        self,
+        router_addr: str,
+        intent: TradeIntent,
+        fee: int,
+        amount_out: int = 0,
+        venue: str = "uniswap_v3",
+    ) -> Quote:
+        router = self.wallet.router_v3(router_addr)
+
+        def build_tx(min_out: int) -> dict:
+            plan = V3SinglePlan(
+                router=router_addr,
+                token_in=intent.token_in,
+                token_out=intent.token_out,
+                fee=fee,
+                amount_in=intent.amount_in,
+                min_out=min_out,
+                recipient=self._recipient(),
+                deadline=self._deadline(),
+                value=intent.amount_in if intent.native_in else 0,
+            )
+            return build_exact_input_single(router, plan)
+
+        return Quote(
+            venue=venue,
+            amount_out=amount_out,
+            build=build_tx,
+            spender=None if intent.native_in else router_addr,
+            gas_key=(router_addr, "exactInputSingle", 2),
+            returns="uint256",
+        )
+
+    def _onchain_routes(self, intent: TradeIntent) -> list[tuple[str, str, int | None]]:
+        """(venue, router, V3 fee or None) for every Uniswap route worth quoting.
+
+        The leader's own route is listed first so it wins ties.
+        """
+        dex = self.settings.dex_routers
+        chain_id = self.settings.evm_chain_id
+        routes: list[tuple[str, str, int | None]] = []
+        if intent.fee is None:
+            routes.append(("uniswap_v2", intent.router, None))
+        else:
+            routes.append(("uniswap_v3", intent.router, intent.fee))
+        if self.settings.quote_cross_protocol and len(intent.path) == 2:
+            v2_router = dex.v2_default_router.get(chain_id)
+            v3_router = dex.v3_default_router.get(chain_id)
+            # SwapRouter pays out WETH, not ETH, so ETH-out trades stay on V2
+            if intent.fee is None and not intent.native_out and v3_router:
+                routes.extend((f"uniswap_v3_{fee}", v3_router, fee) for fee in dex.v3_fee_tiers)
+            elif intent.fee is not None and v2_router:
+                routes.append(("uniswap_v2", v2_router, None))
+        return routes
+
+    def _onchain_quotes(self, intent: TradeIntent) -> list[Quote]:
+        """Quotes all Uniswap routes, and reads unknown router allowances, in one eth_call."""
+        quoter_addr = self.settings.dex_routers.v3_quoters.get(self.settings.evm_chain_id)
+        routes = [r for r in self._onchain_routes(intent) if r[2] is None or quoter_addr]
+        local: dict[int, int] = {}
+        if self.reserves is not None:
+            for i, (_venue, router_addr, fee) in enumerate(routes):
+                if fee is None:
+                    out = self.reserves.amount_out(router_addr, intent.amount_in, intent.path)
+                    if out is not None:
+                        local[i] = out
+        calls = []
+        for i, (_venue, router_addr, fee) in enumerate(routes):
+            if i in local:
+                continue
+            if fee is None:
+                router = self.wallet.router_v2(router_addr)
+                calls.append(router.functions.getAmountsOut(intent.amount_in, intent.path))
+            else:
+                quoter = self.wallet.quoter_v3(quoter_addr)
+                calls.append(
+                    quoter.functions.quoteExactInputSingle(
+                        intent.token_in, intent.token_out, fee, intent.amount_in, 0
+                    )
+                )
+        spenders: list[str] = []
+        if not intent.native_in and self.wallet.address and not self.settings.dry_run:
+            spenders = [
+                r
+                for r in dict.fromkeys(router for _, router, _ in routes)
+                if not self.allowances.is_known(intent.token_in, r)
+            ]
+            erc20 = self.wallet.erc20(intent.token_in)
+            calls.extend(erc20.functions.allowance(self.wallet.address, r) for r in spenders)
+
+        results = self.multicall.read(calls)
+        remote = iter(results)
+        outs = [local[i] if i in local else next(remote) for i in range(len(routes))]
+        for spender, allowance in zip(spenders, remote, strict=True):
+            if allowance is not None:
+                self.allowances.seed(intent.token_in, spender, allowance)
+        quotes = []
+        for (venue, router_addr, fee), out in zip(routes, outs, strict=True):
+            if out is None:
+                continue
+            if fee is None:
+                amount_out = out if isinstance(out, int) else int(out[-1])
+                quotes.append(self._v2_route(router_addr, intent, amount_out, venue))
+            else:
+                quotes.append(self._v3_route(router_addr, intent, fee, int(out), venue))
+        return quotes
+
+    def _venues(self, intent: TradeIntent, slippage_bps: int) -> dict:
+        """Quote sources to race for this trade, keyed by venue name."""
+        venues: dict = {"onchain": partial(self._onchain_quotes, intent)}
+        for agg in self._aggregators():
+            venues[agg] = partial(self._aggregator_quote, agg, intent, slippage_bps)
+        return venues
+
+    # --- Planning --------------------------------------------------------------------
+
+    def _decode(self, rec: ObservedTrade) -> dict | None:
+        """Swap arguments stored by the watcher; only rows observed before they were
+        stored have their calldata decoded here."""
+        if rec.params:
+            return rec.params
+        if not rec.raw_input:
+            return None
+        return decode_swap(self.v2_decoder, self.v3_decoder, rec.raw_input)
+
+    def _intent_v2(self, rec: ObservedTrade, params: dict, policy: WalletPolicy) -> TradeIntent:
+        method = params["method"]
+        path = [checksum(a) for a in params["path"]]
+        if not policy.tokens_ok(path):
+            raise Exception("Tokens not allowed by policy")
+        native_in = method == "swapExactETHForTokens"
+        if native_in:
+            # amount_in is not in params; use tx value from ObservedTrade.amount_in_wei
+            observed_amount_in = int(rec.amount_in_wei or 0)
+        else:
+            observed_amount_in = int(params["amount_in"] or 0)
+        use_amount_in = int(observed_amount_in * max(0.0, policy.copy_ratio))
+        if policy.max_native_in_wei and native_in:
+            use_amount_in = min(use_amount_in, int(policy.max_native_in_wei))
+        return TradeIntent(
+            method=method,
+            router=checksum(rec.dex),
+            token_in=path[0],
+            token_out=path[-1],
+            # Every venue quotes the bucketed amount so cached aggregator quotes stay valid
+            amount_in=quote_cache.bucket(use_amount_in),
+            native_in=native_in,
+            native_out=method == "swapExactTokensForETH",
+            path=path,
+        )
+
+    def _intent_v3(self, rec: ObservedTrade, params: dict, policy: WalletPolicy) -> TradeIntent:
+        if not self.settings.dex_routers.v3_quoters.get(self.settings.evm_chain_id):
+            raise Exception("No V3 quoter configured for chain")
+        token_in, token_out = (checksum(a) for a in params["path"])
+        if not policy.tokens_ok([token_in, token_out]):
+            raise Exception("Tokens not allowed by policy")
+        use_amount_in = int(int(params["amount_in"]) * max(0.0, policy.copy_ratio))
+        # If tokenIn is wrapped native, we can pay in ETH
+        wrapped_native = self.settings.dex_routers.native_wrapped.get(self.settings.evm_chain_id)
+        native_in = bool(wrapped_native and token_in.lower() == wrapped_native.lower())
+        if native_in and policy.max_native_in_wei:
+            use_amount_in = min(use_amount_in, int(policy.max_native_in_wei))
+        return TradeIntent(
+            method=params["method"],
+            router=checksum(rec.dex),
+            token_in=token_in,
+            token_out=token_out,
+            # Every venue quotes the bucketed amount so cached aggregator quotes stay valid
+            amount_in=quote_cache.bucket(use_amount_in),
+            native_in=native_in,
+            path=[token_in, token_out],
+            fee=int(params["fee"]),
+        )
+
+    def _recipient(self) -> str:
+        return self.wallet.address or ZERO_ADDRESS
+
+    def _deadline(self) -> int:
+        return int(time.time()) + int(self.settings.tx_deadline_seconds)
+
+    # --- Execution -------------------------------------------------------------------
+
+    def _plan(self, rec: ObservedTrade) -> tuple[TradeIntent, WalletPolicy]:
+        params = self._decode(rec)
+        is_v2 = bool(params) and params["protocol"] == "v2"
+        method = params["method"] if params else rec.method
+        if not params or method not in (V2_METHODS if is_v2 else V3_METHODS):
+            raise UnsupportedTrade(f"Unsupported method: {method}")
+        policy = self.policies.for_wallet(rec.wallet)
+        if is_v2:
+            return self._intent_v2(rec, params, policy), policy
+        return self._intent_v3(rec, params, policy), policy
+
+    def _process(self, rec: ObservedTrade) -> ExecutionResult:
+        return self._process_group([rec])[0]
+
+    def _process_group(self, recs: list[ObservedTrade]) -> list[ExecutionResult]:
+        """Executes one swap for all compatible trades in `recs` and splits the result.
+
+        Trades are compatible when they would build the same swap: same router, path,
+        V3 fee tier and native in/out shape. The rest are executed one by one.
+        """
+        results = [ExecutionResult() for _ in recs]
+        planned: list[tuple[ExecutionResult, TradeIntent, WalletPolicy]] = []
+        for rec, res in zip(recs, results, strict=True):
+            try:
+                intent, policy = self._plan(rec)
+            except UnsupportedTrade as e:
+                res.error = str(e)
+                continue
+            except Exception as e:
+                res.status = "failed"
+                res.error = str(e)
+                logger.warning("Planning trade {} failed: {}", rec.id, e)
+                continue
+            res.amount_in = intent.amount_in
+            planned.append((res, intent, policy))
+        if not planned:
+            return results
+
+        shape = _coalescing_key(planned[0][1])
+        group = [p for p in planned if _coalescing_key(p[1]) == shape]
+        for res, intent, policy in planned:
+            if _coalescing_key(intent) != shape:
+                self._execute_safe(intent, policy, res)
+        if len(group) == 1:
+            self._execute_safe(group[0][1], group[0][2], group[0][0])
+            return results
+
+        weights = [intent.amount_in for _, intent, _ in group]
+        merged = replace(group[0][1], amount_in=quote_cache.bucket(sum(weights)))
+        # The tightest slippage among the grouped wallets bounds the shared swap
+        policy = replace(group[0][2], slippage_bps=min(p.slippage_bps for _, _, p in group))
+        logger.info(
+            "Coalescing {} trades {} -> {} into one swap of {}",
+            len(group),
+            merged.token_in,
+            merged.token_out,
+            merged.amount_in,
+        )
+        total = ExecutionResult(amount_in=merged.amount_in)
+        self._execute_safe(merged, policy, total)
+        amounts_in = allocate(total.amount_in, weights)
+        amounts_out = allocate(total.amount_out, weights)
+        gas = allocate(total.gas_spent, weights)
+        for i, (res, _intent, _policy) in enumerate(group):
+            res.status = total.status
+            res.tx_hash = total.tx_hash
+            res.error = total.error
+            res.venue = total.venue
+            res.quotes = total.quotes
+            res.stages = total.stages
+            res.amount_in = amounts_in[i]
+            res.amount_out = amounts_out[i]
+            res.gas_spent = gas[i]
+        return results
+
+    def _execute_safe(self, intent: TradeIntent, policy: WalletPolicy, res: ExecutionResult):
+        try:
+            self._execute(intent, policy, res)
+        except Exception as e:
+            res.status = "failed"
+            res.error = str(e)
+            logger.exception("Execution failed: {}", e)
+
+    def _execute(self, intent: TradeIntent, policy: WalletPolicy, res: ExecutionResult) -> None:
+        race = self.quotes.race(self._venues(intent, policy.slippage_bps))
+        res.quotes = race.summary()
+        res.stages["quoted"] = datetime.utcnow()
+        quote = race.best
+        if quote is None:
+            # Without a quote there is no output bound: sending with min_out 0 would accept
+            # any price, so the trade is skipped
+            res.error = f"No quote within {self.quotes.budget_ms} ms"
+            logger.warning("{}; skipping", res.error)
+            return
+        logger.info(
+            "Best quote {} out={} in {:.0f} ms (latencies: {})",
+            quote.venue,
+            quote.amount_out,
+            quote.latency_ms,
+            race.latencies_ms,
+        )
+        res.venue = quote.venue
+        min_out = apply_slippage(quote.amount_out, policy.slippage_bps)
+
+        if self.settings.dry_run:
+            res.amount_out = quote.amount_out
+            return
+
+        spender = None if intent.native_in else quote.spender
+        approve = bool(spender) and self.allowances.needs_approval(
+            intent.token_in, spender, intent.amount_in
+        )
+        tx = dict(quote.tx) if quote.tx is not None else quote.build(min_out)
+        tx.setdefault("from", self.wallet.address)
+        # Respect gas overrides if provided
+        if self.settings.max_fee_gwei is not None:
+            tx["maxFeePerGas"] = self.wallet.w3.to_wei(self.settings.max_fee_gwei, "gwei")
+        if self.settings.max_priority_fee_gwei is not None:
+            tx["maxPriorityFeePerGas"] = self.wallet.w3.to_wei(
+                self.settings.max_priority_fee_gwei, "gwei"
+            )
+        if approve:
+            # Simulate against an overridden allowance first, so a swap that would revert or
+            # fall short does not pay for its approval; tokens whose allowance slot is unknown
+            # are approved first and simulated as usual
+            override = None
+            if self.settings.simulate_swaps:
+                override = self.allowances.state_override(
+                    intent.token_in, spender, intent.amount_in
+                )
+            if override is not None and self._simulate(tx, quote, res, state_override=override):
+                return
+            self.allowances.ensure(intent.token_in, spender, intent.amount_in)
+            if override is None and self._simulate(tx, quote, res):
+                return
+        elif self._simulate(tx, quote, res):
+            return
         try:
-            if agg == "1inch":
-                base_url = self.settings.oneinch_base_url
-                q = agg_oneinch.get_swap_quote(
-                    base_url=base_url,
-                    chain_id=self.settings.evm_chain_id,
-                    src_token=(
-                        "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE" if is_native_in else token_in
-                    ),
-                    dst_token=token_out,
-                    amount_in=amount_in,
-                    from_address=self.wallet.address,
-                    slippage_bps=slippage_bps,
-                    api_key=self.settings.oneinch_api_key,
+            res.tx_hash = self.wallet.send_tx(tx, gas_key=quote.gas_key, stages=res.stages)
+        except Exception:
+            if spender:
+                self.allowances.invalidate(intent.token_in, spender)
+            raise
+        if spender:
+            self.allowances.consume(intent.token_in, spender, intent.amount_in)
+        res.status = "success"
+        with rpc_component("receipts"):
+            self._apply_receipt(intent, res, spender, quote.gas_key)
+        if res.amount_out is None and res.status == "success":
+            res.amount_out = min_out
+
+    def _simulate(
+        self, tx: dict, quote: Quote, res: ExecutionResult, state_override: dict | None = None
+    ) -> bool:
+        """Simulates the swap while its gas and fees are filled in; True if it is skipped.
+
+        With a `state_override` (an allowance not yet approved), gas is left for `send_tx`
+        to estimate once the approval has landed.
+        """
+        if not self.settings.simulate_swaps:
+            return False
+        sim = self._sim_pool.submit(
+            simulate_evm,
+            self.wallet.w3,
+            dict(tx),
+            self.wallet.address,
+            quote.returns,
+            state_override,
+        )
+        prepare_error = None
+        if state_override is None:
+            try:
+                self.wallet.prepare_tx(tx, gas_key=quote.gas_key)
+            except Exception as e:  # estimate_gas raises on reverts too; prefer the simulation's
+                prepare_error = e
+        outcome = sim.result()
+        if outcome.reverted:
+            res.error = f"Simulation reverted: {outcome.error}"
+        elif outcome.amount_out is not None and quote.amount_out:
+            short = shortfall_bps(outcome.amount_out, quote.amount_out)
+            if short > self.settings.simulate_max_shortfall_bps:
+                res.error = (
+                    f"Simulated output {outcome.amount_out} is {short} bps below "
+                    f"{quote.venue} quote {quote.amount_out}"
                 )
-                allowance_target = q.get("allowanceTarget")
-                if allowance_target and (not is_native_in) and (not self.settings.dry_run):
-                    erc20 = self.wallet.erc20(token_in)
-                    allowance = int(
-                        erc20.functions.allowance(self.wallet.address, allowance_target).call()
-                    )
-                    if allowance < amount_in:
-                        tx = erc20.functions.approve(allowance_target, amount_in).build_transaction(
-                            {"from": self.wallet.address}
-                        )
-                        _txh = self.wallet.send_tx(tx)
-                tx = {
-                    "to": q["to"],
-                    "data": q["data"],
-                    "value": int(q.get("value") or 0),
-                    "from": self.wallet.address,
-                }
-                if self.settings.dry_run:
-                    return None, int(q.get("buyAmount") or 0)
-                txh = self.wallet.send_tx(tx)
-                return txh, int(q.get("buyAmount") or 0)
-            elif agg == "0x":
-                if self.settings.evm_chain_id == 1:
-                    base_url = self.settings.zeroex_base_url
-                elif self.settings.evm_chain_id == 137:
-                    base_url = self.settings.zeroex_base_url_polygon
-                elif self.settings.evm_chain_id == 8453:
-                    base_url = self.settings.zeroex_base_url_base_chain
-                else:
-                    base_url = self.settings.zeroex_base_url
-                q = agg_zeroex.get_swap_quote(
-                    base_url=base_url,
-                    chain_id=self.settings.evm_chain_id,
-                    sell_token=("ETH" if is_native_in else token_in),
-                    buy_token=token_out,
-                    sell_amount=amount_in,
-                    taker_address=self.wallet.address,
-                    slippage_bps=slippage_bps,
+        if res.error:
+            logger.warning("Skipping swap: {}", res.error)
+            return True
+        if prepare_error is not None:
+            raise prepare_error
+        return False
+
+    def _apply_receipt(
+        self,
+        intent: TradeIntent,
+        res: ExecutionResult,
+        spender: str | None,
+        gas_key: tuple | None = None,
+    ):
+        """Fills realized gas and output amount from the swap receipt."""
+        w3 = self.wallet.w3
+        me = (self.wallet.address or "").lower()
+        try:
+            rcpt = w3.eth.wait_for_transaction_receipt(res.tx_hash, timeout=120)
+            if not rcpt:
+                return
+            res.stages["confirmed"] = datetime.utcnow()
+            gas_used = rcpt.get("gasUsed")
+            eff = rcpt.get("effectiveGasPrice")
+            if gas_used is not None and eff is not None:
+                res.gas_spent = int(gas_used) * int(eff)
+            if rcpt.get("status") != 1:
+                res.status = "failed"
+                res.error = "Transaction reverted"
+                if spender:
+                    # The allowance we consumed locally was not spent
+                    self.allowances.invalidate(intent.token_in, spender)
+                if gas_key is not None and self.wallet.gas_cache is not None:
+                    # The cached limit may be too low for this token (e.g. fee-on-transfer);
+                    # re-estimate next time instead of running out of gas again
+                    self.wallet.gas_cache.invalidate(gas_key)
+                return
+            if not me:
+                return
+            if not intent.native_out:
+                # ERC20 out: Transfer of token_out to our address
+                transfer_sig = hexstr(w3.keccak(text="Transfer(address,address,uint256)"))
+                for lg in rcpt.get("logs", []):
+                    topics = lg.get("topics", [])
+                    if (
+                        lg.get("address", "").lower() == intent.token_out.lower()
+                        and len(topics) >= 3
+                        and hexstr(topics[0]) == transfer_sig
+                        and "0x" + hexstr(topics[2])[-40:] == me
+                    ):
+                        res.amount_out = _log_value(lg)
+                        return
+                return
+            # Native out (ETH) via WETH Withdrawal event to our address
+            wrapped = self.settings.dex_routers.native_wrapped.get(self.settings.evm_chain_id)
+            if wrapped:
+                withdraw_sig = hexstr(w3.keccak(text="Withdrawal(address,uint256)"))
+                for lg in rcpt.get("logs", []):
+                    topics = lg.get("topics", [])
+                    if (
+                        lg.get("address", "").lower() == wrapped.lower()
+                        and len(topics) >= 2
+                        and hexstr(topics[0]) == withdraw_sig
+                        and "0x" + hexstr(topics[1])[-40:] == me
+                    ):
+                        res.amount_out = _log_value(lg)
+                        return
+            # Fallback via balance delta
+            try:
+                bn = rcpt.get("blockNumber")
+                bal_before = w3.eth.get_balance(self.wallet.address, bn - 1)
+                bal_after = w3.eth.get_balance(self.wallet.address, bn)
+                gas = res.gas_spent or 0
+                recv = int(bal_after) - int(bal_before) + gas
+                if recv > 0:
+                    res.amount_out = recv
+                    return
+            except Exception as e:
+                logger.debug("Balance delta fallback failed: {}", e)
+            # Fallback via Alchemy traces
+            if self.settings.alchemy_base_url and self.settings.alchemy_api_key:
+                rpc_url = (
+                    f"{self.settings.alchemy_base_url.rstrip('/')}/{self.settings.alchemy_api_key}"
                 )
-                allowance_target = q.get("allowanceTarget")
-                if allowance_target and (not is_native_in) and (not self.settings.dry_run):
-                    erc20 = self.wallet.erc20(token_in)
-                    allowance = int(
-                        erc20.functions.allowance(self.wallet.address, allowance_target).call()
-                    )
-                    if allowance < amount_in:
-                        tx = erc20.functions.approve(allowance_target, amount_in).build_transaction(
-                            {"from": self.wallet.address}
-                        )
-                        _txh = self.wallet.send_tx(tx)
-                tx = {
-                    "to": q["to"],
-                    "data": q["data"],
-                    "value": int(q.get("value") or 0),
-                    "from": self.wallet.address,
-                }
-                if self.settings.dry_run:
-                    return None, int(q.get("buyAmount") or 0)
-                txh = self.wallet.send_tx(tx)
-                return txh, int(q.get("buyAmount") or 0)
-        except Exception as _e:
-            logger.warning("Aggregator failed, falling back to router: {}", _e)
-        return None, None
+                traced = trace_native_received(rpc_url, res.tx_hash, self.wallet.address)
+                if traced:
+                    res.amount_out = traced
+        except Exception as e:
+            logger.debug("Receipt parsing failed: {}", e)
+
+    def _coalesce_delay(self, s) -> float:
+        """Seconds until the oldest unprocessed trade's coalescing window has passed."""
+        window = float(self.settings.coalesce_window_sec or 0)
+        if window <= 0:
+            return 0.0
+        oldest = s.execute(
+            select(ObservedTrade.timestamp)
+            .where(ObservedTrade.processed.is_(False), ObservedTrade.chain == "evm")
+            .order_by(ObservedTrade.id.asc())
+            .limit(1)
+        ).scalar()
+        if oldest is None:
+            return 0.0
+        return max(0.0, window - (datetime.utcnow() - oldest).total_seconds())
+
+    def _claim(self, s) -> list[ObservedTrade]:
+        """Oldest unprocessed trade, plus same-router, same-pair trades within the window.
+
+        Rows are locked until the session commits; rows another executor holds are skipped.
+        """
+        rec: ObservedTrade | None = (
+            s.execute(
+                select(ObservedTrade)
+                .where(ObservedTrade.processed.is_(False), ObservedTrade.chain == "evm")
+                .order_by(ObservedTrade.id.asc())
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .first()
+        )
+        window = float(self.settings.coalesce_window_sec or 0)
+        if not rec or window <= 0 or not (rec.token_in and rec.token_out):
+            return [rec] if rec else []
+        return list(
+            s.execute(
+                select(ObservedTrade)
+                .where(
+                    ObservedTrade.processed.is_(False),
+                    ObservedTrade.chain == rec.chain,
+                    func.coalesce(func.lower(ObservedTrade.dex), "") == (rec.dex or "").lower(),
+                    func.lower(ObservedTrade.token_in) == rec.token_in.lower(),
+                    func.lower(ObservedTrade.token_out) == rec.token_out.lower(),
+                    ObservedTrade.timestamp <= rec.timestamp + timedelta(seconds=window),
+                )
+                .order_by(ObservedTrade.id.asc())
+                .limit(max(1, self.settings.coalesce_max_trades))
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+
+    def _record(
+        self, rec: ObservedTrade, res: ExecutionResult, claimed_at: datetime | None = None
+    ) -> ExecutedTrade:
+        exec_rec = ExecutedTrade(
+            observed_trade_id=rec.id,
+            status=res.status,
+            tx_hash=res.tx_hash,
+            gas_spent_wei=res.gas_spent,
+            error=res.error,
+            token_in=rec.token_in,
+            token_out=rec.token_out,
+            amount_in_wei=res.amount_in if res.amount_in is not None else rec.amount_in_wei,
+            amount_out_wei=res.amount_out,
+            venue=res.venue,
+            quotes=res.quotes,
+            chain=chain_key(self.settings.evm_chain_id),  # USD values are filled by the enricher
+            claimed_at=claimed_at,
+            quoted_at=res.stages.get("quoted"),
+            signed_at=res.stages.get("signed"),
+            sent_at=res.stages.get("sent"),
+            confirmed_at=res.stages.get("confirmed"),
+        )
+        return exec_rec
 
     def run(self, SessionFactory):
         logger.info("Starting EVM executor (dry_run={})", self.settings.dry_run)
+        if self.reserves is not None:
+            self.reserves.follow(BLOCK_TIME_SEC.get(self.settings.evm_chain_id, 12.0))
         while True:
             try:
+                # Give other followers of the same call time to show up, outside any
+                # transaction so no connection or row locks are held while waiting
                 with session_scope(SessionFactory) as s:
-                    rec: ObservedTrade | None = (
-                        s.execute(
-                            select(ObservedTrade)
-                            .where(ObservedTrade.processed.is_(False))
-                            .order_by(ObservedTrade.id.asc())
-                            .limit(1)
-                        )
-                        .scalars()
-                        .first()
-                    )
-                    if not rec:
+                    delay = self._coalesce_delay(s)
+                if delay > 0:
+                    time.sleep(delay)
+                with session_scope(SessionFactory) as s:
+                    recs = self._claim(s)
+                    if not recs:
                         time.sleep(1.5)
                         continue
-
-                    status = "skipped"
-                    tx_hash = None
-                    err = None
-                    gas_spent = None
-
-                    logger.info(
-                        "Processing observed trade {}: method={} dex={}",
-                        rec.id,
-                        rec.method,
-                        rec.dex,
-                    )
-
-                    # Decode to retrieve method + params (esp. path & amounts)
-                    method = rec.method
-                    params = None
-                    try:
-                        func, params = self.v2_decoder.decode_function_input(rec.raw_input)
-                        method = func.fn_name
-                        decoded_is_v2 = True
-                    except Exception:
-                        try:
-                            func, params = self.v3_decoder.decode_function_input(rec.raw_input)
-                            method = func.fn_name
-                            decoded_is_v2 = False
-                        except Exception:
-                            decoded_is_v2 = False
-                            params = None
-
-                    overrides = self.settings.wallet_overrides().get((rec.wallet or "").lower(), {})
-                    eff_copy_ratio = float(overrides.get("copy_ratio", self.settings.copy_ratio))
-                    eff_slippage_bps = int(
-                        overrides.get("slippage_bps", self.settings.slippage_bps)
-                    )
-                    eff_max_native = int(
-                        overrides.get("max_native_in_wei", self.settings.max_native_in_wei or 0)
-                    )
-                    allowed = set([a.lower() for a in overrides.get("allowed_tokens", [])])
-                    denied = set([a.lower() for a in overrides.get("denied_tokens", [])])
-
-                    def tokens_ok(tokens: list[str], allowed=allowed, denied=denied) -> bool:
-                        toks = [t.lower() for t in tokens if t]
-                        return not any(t in denied for t in toks) and (
-                            not allowed or all(t in allowed for t in toks)
+                    claimed_at = datetime.utcnow()
+
+                    for rec in recs:
+                        logger.info(
+                            "Processing observed trade {}: method={} dex={}",
+                            rec.id,
+                            rec.method,
+                            rec.dex,
                         )
-
-                    # Support V2 and V3
-                    if decoded_is_v2 and method in (
-                        "swapExactETHForTokens",
-                        "swapExactTokensForETH",
-                        "swapExactTokensForTokens",
-                    ):
-                        try:
-                            router_addr = Web3.to_checksum_address(rec.dex)
-                            router = self.wallet.router_v2(router_addr)
-
-                            # Build path and input amount
-                            path = [Web3.to_checksum_address(a) for a in params.get("path", [])]
-                            if not tokens_ok(path):
-                                status = "skipped"
-                                err = "Tokens not allowed by policy"
-                                raise Exception(err)
-                            observed_amount_in = int(params.get("amountIn") or 0)
-                            native_value = 0
-                            if method == "swapExactETHForTokens":
-                                # amountIn is not in params; use tx value from ObservedTrade.amount_in_wei
-                                observed_amount_in = int(rec.amount_in_wei or 0)
-                                native_value = int(observed_amount_in * max(0.0, eff_copy_ratio))
-                            else:
-                                observed_amount_in = int(observed_amount_in)
-
-                            use_amount_in = int(observed_amount_in * max(0.0, eff_copy_ratio))
-                            if eff_max_native and method == "swapExactETHForTokens":
-                                use_amount_in = min(use_amount_in, int(eff_max_native))
-                                native_value = use_amount_in
-
-                            recipient = (
-                                self.wallet.address or "0x0000000000000000000000000000000000000000"
-                            )
-                            deadline = int(time.time()) + int(self.settings.tx_deadline_seconds)
-
-                            # Compute minOut via getAmountsOut with slippage applied
-                            min_out = compute_min_out(router, use_amount_in, path, eff_slippage_bps)
-
-                            plan = V2SwapPlan(
-                                method=method,
-                                router=router_addr,
-                                path=path,
-                                amount_in=use_amount_in,
-                                min_out=min_out,
-                                recipient=recipient,
-                                deadline=deadline,
-                                value=native_value,
-                            )
-
-                            # For token-in routes, ensure allowance
-                            if (
-                                method in ("swapExactTokensForETH", "swapExactTokensForTokens")
-                                and not self.settings.dry_run
-                            ):
-                                token_in = path[0]
-                                erc20 = self.wallet.erc20(token_in)
-                                allowance = int(
-                                    erc20.functions.allowance(
-                                        self.wallet.address, router_addr
-                                    ).call()
-                                )
-                                if allowance < use_amount_in:
-                                    logger.info(
-                                        "Approving router {} for {} wei of {}",
-                                        router_addr,
-                                        use_amount_in,
-                                        token_in,
-                                    )
-                                    tx = erc20.functions.approve(
-                                        router_addr, use_amount_in
-                                    ).build_transaction({"from": self.wallet.address})
-                                    tx_hash = self.wallet.send_tx(tx)
-                                    logger.info("Approve tx: {}", tx_hash)
-
-                            # Try aggregator first if configured
-                            amount_out_est = None
-                            is_native_in = method == "swapExactETHForTokens"
-                            agg_txh, agg_buy = self._try_aggregator(
-                                path[0], path[-1], use_amount_in, is_native_in, eff_slippage_bps
-                            )
-                            skip_router = False
-                            if agg_txh is not None:
-                                tx_hash = agg_txh
-                                status = "success"
-                                amount_out_est = agg_buy
-                                skip_router = True
-                            elif agg_buy is not None:
-                                # dry-run estimate via aggregator
-                                status = "skipped"
-                                amount_out_est = agg_buy
-                                skip_router = True
-
-                            # Build the swap via router if not using aggregator
-                            if not skip_router:
-                                if method == "swapExactETHForTokens":
-                                    tx = build_swap_exact_eth_for_tokens(router, plan)
-                                elif method == "swapExactTokensForETH":
-                                    tx = build_swap_exact_tokens_for_eth(router, plan)
-                                else:
-                                    tx = build_swap_exact_tokens_for_tokens(router, plan)
-
-                                if self.settings.dry_run:
-                                    status = "skipped"
-                                else:
-                                    tx.setdefault("from", self.wallet.address)
-                                    if plan.value:
-                                        tx["value"] = plan.value
-                                    # Respect gas overrides if provided
-                                    if self.settings.max_fee_gwei is not None:
-                                        tx["maxFeePerGas"] = self.wallet.w3.to_wei(
-                                            self.settings.max_fee_gwei, "gwei"
-                                        )
-                                    if self.settings.max_priority_fee_gwei is not None:
-                                        tx["maxPriorityFeePerGas"] = self.wallet.w3.to_wei(
-                                            self.settings.max_priority_fee_gwei, "gwei"
-                                        )
-
-                                tx_hash = self.wallet.send_tx(tx)
-                                status = "success"
-                                # Parse receipt for realized gas and output amount (ERC20 only)
-                                try:
-                                    rcpt = self.wallet.w3.eth.wait_for_transaction_receipt(
-                                        tx_hash, timeout=120
-                                    )
-                                    if rcpt and rcpt.get("status") == 1:
-                                        gas_used = rcpt.get("gasUsed")
-                                        eff = rcpt.get("effectiveGasPrice")
-                                        if gas_used is not None and eff is not None:
-                                            gas_spent = str(int(gas_used) * int(eff))
-                                        # If token_out is ERC20, parse Transfer to our address
-                                        if rec.token_out:
-                                            transfer_sig = self.wallet.w3.keccak(
-                                                text="Transfer(address,address,uint256)"
-                                            ).hex()
-                                            to_addr = (self.wallet.address or "").lower()
-                                            for lg in rcpt.get("logs", []):
-                                                if (
-                                                    lg.get("address", "").lower()
-                                                    == rec.token_out.lower()
-                                                    and lg.get("topics", [])[0].hex()
-                                                    == transfer_sig
-                                                    and len(lg.get("topics", [])) >= 3
-                                                    and to_addr
-                                                ):
-                                                    topic_to = lg["topics"][2].hex()
-                                                    addr = "0x" + topic_to[-40:]
-                                                    if addr.lower() == to_addr:
-                                                        val = int(lg.get("data", "0x0"), 16)
-                                                        amount_out_est = val
-                                                        break
-                                        else:
-                                            # Native out (ETH) via WETH Withdrawal event to our address
-                                            wrapped = self.settings.dex_routers.native_wrapped.get(
-                                                self.settings.evm_chain_id
-                                            )
-                                            if wrapped:
-                                                withdraw_sig = self.wallet.w3.keccak(
-                                                    text="Withdrawal(address,uint256)"
-                                                ).hex()
-                                                to_addr = (self.wallet.address or "").lower()
-                                            for lg in rcpt.get("logs", []):
-                                                if (
-                                                    lg.get("address", "").lower() == wrapped.lower()
-                                                    and lg.get("topics", [])[0].hex()
-                                                    == withdraw_sig
-                                                    and len(lg.get("topics", [])) >= 2
-                                                    and to_addr
-                                                ):
-                                                    topic_src = lg["topics"][1].hex()
-                                                    src = "0x" + topic_src[-40:]
-                                                    if src.lower() == to_addr:
-                                                        val = int(lg.get("data", "0x0"), 16)
-                                                        amount_out_est = val
-                                                        break
-                                            # Fallback via balance delta
-                                            if amount_out_est is None and (self.wallet.address):
-                                                try:
-                                                    bn = rcpt.get("blockNumber")
-                                                    addr = self.wallet.address
-                                                    bal_before = self.wallet.w3.eth.get_balance(
-                                                        addr, bn - 1
-                                                    )
-                                                    bal_after = self.wallet.w3.eth.get_balance(
-                                                        addr, bn
-                                                    )
-                                                    gas = int(gas_spent) if gas_spent else 0
-                                                    delta = int(bal_after) - int(bal_before)
-                                                    recv = delta + gas
-                                                    if recv > 0:
-                                                        amount_out_est = recv
-                                                except Exception as __e:
-                                                    logger.debug(
-                                                        "Balance delta fallback failed: {}", __e
-                                                    )
-                                            # Fallback via Alchemy traces
-                                            if (
-                                                amount_out_est is None
-                                                and self.settings.alchemy_base_url
-                                                and self.settings.alchemy_api_key
-                                                and self.wallet.address
-                                            ):
-                                                rpc_url = f"{self.settings.alchemy_base_url.rstrip('/')}/{self.settings.alchemy_api_key}"
-                                                traced = trace_native_received(
-                                                    rpc_url, tx_hash, self.wallet.address
-                                                )
-                                                if traced:
-                                                    amount_out_est = traced
-                                except Exception as _e:
-                                    logger.debug("Receipt parsing failed: {}", _e)
-                                if amount_out_est is None:
-                                    amount_out_est = min_out
-
-                        except Exception as e:
-                            status = "failed"
-                            err = str(e)
-                            logger.exception("Execution failed: {}", e)
-
-                    elif (not decoded_is_v2) and method in ("exactInputSingle",):
-                        try:
-                            router_addr = Web3.to_checksum_address(rec.dex)
-                            router = self.wallet.w3.eth.contract(
-                                address=router_addr, abi=self.v3_abi
-                            )
-                            quoter_addr = self.settings.dex_routers.v3_quoters.get(
-                                self.settings.evm_chain_id
-                            )
-                            if not quoter_addr:
-                                status = "skipped"
-                                err = "No V3 quoter configured for chain"
-                                raise Exception(err)
-                            quoter = self.wallet.w3.eth.contract(
-                                address=Web3.to_checksum_address(quoter_addr),
-                                abi=self.v3_quoter_abi,
-                            )
-
-                            p = params.get("params") if isinstance(params, dict) else None
-                            token_in = Web3.to_checksum_address(p.get("tokenIn"))
-                            token_out = Web3.to_checksum_address(p.get("tokenOut"))
-                            fee = int(p.get("fee"))
-                            if not tokens_ok([token_in, token_out]):
-                                status = "skipped"
-                                err = "Tokens not allowed by policy"
-                                raise Exception(err)
-
-                            observed_amount_in = int(p.get("amountIn"))
-                            use_amount_in = int(observed_amount_in * max(0.0, eff_copy_ratio))
-
-                            recipient = (
-                                self.wallet.address or "0x0000000000000000000000000000000000000000"
-                            )
-                            deadline = int(time.time()) + int(self.settings.tx_deadline_seconds)
-
-                            min_out = compute_min_out_single(
-                                quoter, token_in, token_out, fee, use_amount_in, eff_slippage_bps
-                            )
-
-                            native_value = 0
-                            # If tokenIn is wrapped native, we can pay in ETH
-                            wrapped_native = self.settings.dex_routers.native_wrapped.get(
-                                self.settings.evm_chain_id
-                            )
-                            if wrapped_native and token_in.lower() == wrapped_native.lower():
-                                native_value = use_amount_in
-                                if eff_max_native:
-                                    native_value = min(native_value, int(eff_max_native))
-                                    use_amount_in = native_value
-
-                            # Approve tokenIn if not paying native
-                            if native_value == 0 and not self.settings.dry_run:
-                                erc20 = self.wallet.erc20(token_in)
-                                allowance = int(
-                                    erc20.functions.allowance(
-                                        self.wallet.address, router_addr
-                                    ).call()
-                                )
-                                if allowance < use_amount_in:
-                                    logger.info(
-                                        "Approving router {} for {} wei of {} (V3)",
-                                        router_addr,
-                                        use_amount_in,
-                                        token_in,
-                                    )
-                                    tx = erc20.functions.approve(
-                                        router_addr, use_amount_in
-                                    ).build_transaction({"from": self.wallet.address})
-                                    tx_hash = self.wallet.send_tx(tx)
-                                    logger.info("Approve tx: {}", tx_hash)
-
-                            plan = V3SinglePlan(
-                                router=router_addr,
-                                token_in=token_in,
-                                token_out=token_out,
-                                fee=fee,
-                                amount_in=use_amount_in,
-                                min_out=min_out,
-                                recipient=recipient,
-                                deadline=deadline,
-                                value=native_value,
-                            )
-
-                            # Try aggregator first if configured
-                            amount_out_est = None
-                            is_native_in = native_value > 0
-                            agg_txh, agg_buy = self._try_aggregator(
-                                token_in, token_out, use_amount_in, is_native_in, eff_slippage_bps
-                            )
-                            skip_router = False
-                            if agg_txh is not None:
-                                tx_hash = agg_txh
-                                status = "success"
-                                amount_out_est = agg_buy
-                                skip_router = True
-                            elif agg_buy is not None:
-                                status = "skipped"
-                                amount_out_est = agg_buy
-                                skip_router = True
-
-                            if not skip_router:
-                                tx = build_exact_input_single(router, plan)
-                                if self.settings.dry_run:
-                                    status = "skipped"
-                                else:
-                                    tx.setdefault("from", self.wallet.address)
-                                    if plan.value:
-                                        tx["value"] = plan.value
-                                    if self.settings.max_fee_gwei is not None:
-                                        tx["maxFeePerGas"] = self.wallet.w3.to_wei(
-                                            self.settings.max_fee_gwei, "gwei"
-                                        )
-                                    if self.settings.max_priority_fee_gwei is not None:
-                                        tx["maxPriorityFeePerGas"] = self.wallet.w3.to_wei(
-                                            self.settings.max_priority_fee_gwei, "gwei"
-                                        )
-                                tx_hash = self.wallet.send_tx(tx)
-                                status = "success"
-                                try:
-                                    rcpt = self.wallet.w3.eth.wait_for_transaction_receipt(
-                                        tx_hash, timeout=120
-                                    )
-                                    if rcpt and rcpt.get("status") == 1:
-                                        gas_used = rcpt.get("gasUsed")
-                                        eff = rcpt.get("effectiveGasPrice")
-                                        if gas_used is not None and eff is not None:
-                                            gas_spent = str(int(gas_used) * int(eff))
-                                        if rec.token_out:
-                                            transfer_sig = self.wallet.w3.keccak(
-                                                text="Transfer(address,address,uint256)"
-                                            ).hex()
-                                            to_addr = (self.wallet.address or "").lower()
-                                            for lg in rcpt.get("logs", []):
-                                                if (
-                                                    lg.get("address", "").lower()
-                                                    == rec.token_out.lower()
-                                                    and lg.get("topics", [])[0].hex()
-                                                    == transfer_sig
-                                                    and len(lg.get("topics", [])) >= 3
-                                                    and to_addr
-                                                ):
-                                                    topic_to = lg["topics"][2].hex()
-                                                    addr = "0x" + topic_to[-40:]
-                                                    if addr.lower() == to_addr:
-                                                        val = int(lg.get("data", "0x0"), 16)
-                                                        amount_out_est = val
-                                                        break
-                                        else:
-                                            wrapped = self.settings.dex_routers.native_wrapped.get(
-                                                self.settings.evm_chain_id
-                                            )
-                                            if wrapped:
-                                                withdraw_sig = self.wallet.w3.keccak(
-                                                    text="Withdrawal(address,uint256)"
-                                                ).hex()
-                                                to_addr = (self.wallet.address or "").lower()
-                                            for lg in rcpt.get("logs", []):
-                                                if (
-                                                    lg.get("address", "").lower() == wrapped.lower()
-                                                    and lg.get("topics", [])[0].hex()
-                                                    == withdraw_sig
-                                                    and len(lg.get("topics", [])) >= 2
-                                                    and to_addr
-                                                ):
-                                                    topic_src = lg["topics"][1].hex()
-                                                    src = "0x" + topic_src[-40:]
-                                                    if src.lower() == to_addr:
-                                                        val = int(lg.get("data", "0x0"), 16)
-                                                        amount_out_est = val
-                                                        break
-                                            # Fallback via balance delta
-                                            if amount_out_est is None and (self.wallet.address):
-                                                try:
-                                                    bn = rcpt.get("blockNumber")
-                                                    addr = self.wallet.address
-                                                    bal_before = self.wallet.w3.eth.get_balance(
-                                                        addr, bn - 1
-                                                    )
-                                                    bal_after = self.wallet.w3.eth.get_balance(
-                                                        addr, bn
-                                                    )
-                                                    gas = int(gas_spent) if gas_spent else 0
-                                                    delta = int(bal_after) - int(bal_before)
-                                                    recv = delta + gas
-                                                    if recv > 0:
-                                                        amount_out_est = recv
-                                                except Exception as __e:
-                                                    logger.debug(
-                                                        "Balance delta fallback failed: {}", __e
-                                                    )
-                                            if (
-                                                amount_out_est is None
-                                                and self.settings.alchemy_base_url
-                                                and self.settings.alchemy_api_key
-                                                and self.wallet.address
-                                            ):
-                                                rpc_url = f"{self.settings.alchemy_base_url.rstrip('/')}/{self.settings.alchemy_api_key}"
-                                                traced = trace_native_received(
-                                                    rpc_url, tx_hash, self.wallet.address
-                                                )
-                                                if traced:
-                                                    amount_out_est = traced
-                                except Exception as _e:
-                                    logger.debug("Receipt parsing failed: {}", _e)
-                                if amount_out_est is None:
-                                    amount_out_est = min_out
-
-                        except Exception as e:
-                            status = "failed"
-                            err = str(e)
-                            logger.exception("Execution failed (V3): {}", e)
-
-                    else:
-                        status = "skipped"
-                        err = f"Unsupported method: {method}"
-
-                    # aggregator helper now available as instance method
-
-                    exec_rec = ExecutedTrade(
-                        observed_trade_id=rec.id,
-                        status=status,
-                        tx_hash=tx_hash,
-                        gas_spent_wei=gas_spent,
-                        error=err,
-                        token_in=rec.token_in,
-                        token_out=rec.token_out,
-                        amount_in_wei=rec.amount_in_wei,
-                        amount_out_wei=str(amount_out_est)
-                        if "amount_out_est" in locals() and amount_out_est is not None
-                        else None,
-                    )
-                    rec.processed = True
-                    # If we executed successfully and have token addresses, try to capture USD values
-                    if exec_rec.status in ("success", "skipped"):
-                        try:
-                            # Basic pricing snapshot; may be None
-                            price_in = get_token_price_usd(
-                                self.settings.evm_chain_id, exec_rec.token_in
-                            )
-                            price_out = get_token_price_usd(
-                                self.settings.evm_chain_id, exec_rec.token_out
-                            )
-                            if exec_rec.amount_in_wei and price_in is not None:
-                                exec_rec.amount_in_usd = (
-                                    int(exec_rec.amount_in_wei) / 1e18
-                                ) * price_in
-                            if exec_rec.amount_out_wei and price_out is not None:
-                                exec_rec.amount_out_usd = (
-                                    int(exec_rec.amount_out_wei) / 1e18
-                                ) * price_out
-                            if (
-                                exec_rec.amount_in_usd is not None
-                                and exec_rec.amount_out_usd is not None
-                            ):
-                                exec_rec.pnl_usd = exec_rec.amount_out_usd - exec_rec.amount_in_usd
-                        except Exception as _e:
-                            logger.debug("Pricing failed: {}", _e)
-                    s.add(exec_rec)
+                    results = self._process_group(recs)
+                    for rec, res in zip(recs, results, strict=True):
+                        rec.processed = True
+                        s.add(self._record(rec, res, claimed_at))
+                        EXECUTIONS.labels(
+                            chain=chain_key(self.settings.evm_chain_id), status=res.status
+                        ).inc()
             except KeyboardInterrupt:
                 logger.info("Executor interrupted; shutting down.")
                 break
             except Exception as e:
                 logger.exception("Executor error: {}", e)
                 time.sleep(2.0)
+
+
+def allocate(total: int | None, weights: list[int]) -> list[int | None]:
+    """Splits `total` pro rata to `weights`; rounding dust goes to the last share."""
+    if total is None:
+        return [None] * len(weights)
+    if sum(weights) <= 0:
+        weights = [1] * len(weights)
+    denom = sum(weights)
+    shares = [total * w // denom for w in weights]
+    shares[-1] += total - sum(shares)
+    return shares
+
+
+def _coalescing_key(intent: TradeIntent) -> tuple:
+    """Trades with equal keys build the same swap, so they can share one."""
+    return (
+        intent.router.lower(),
+        tuple(a.lower() for a in intent.path),
+        intent.fee,
+        intent.native_in,
+        intent.native_out,
+    )
+
+
+def _log_value(lg) -> int:
+    data = lg.get("data", "0x0")
+    return int(hexstr(data) or "0", 16)
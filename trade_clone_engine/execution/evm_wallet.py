@@ -1,21 +1,28 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime
 
 from eth_account import Account
 from loguru import logger
 from web3 import Web3
 
+from trade_clone_engine.analytics.tokens import chain_key
+from trade_clone_engine.execution.contracts import ContractRegistry, load_abi
+from trade_clone_engine.execution.gas import FeeOracle, GasEstimateCache
+from trade_clone_engine.providers.instrumentation import instrument_web3
 
-def _load_abi(rel_path: str):
-    path = Path(__file__).resolve().parent.parent / "abi" / rel_path
-    return json.loads(path.read_text())
+ERC20_ABI = load_abi("erc20.json")
+UNI_V2_ABI = load_abi("uniswap_v2_router.json")
 
 
-ERC20_ABI = _load_abi("erc20.json")
-UNI_V2_ABI = _load_abi("uniswap_v2_router.json")
+def unsigned_tx(fn, value: int = 0) -> dict:
+    """Encodes a contract call without web3's build_transaction defaults.
+
+    build_transaction() fills gas and fee fields with extra RPC calls; send_tx() fills
+    them from the fee oracle and gas cache instead.
+    """
+    return {"to": fn.address, "data": fn._encode_transaction_data(), "value": int(value)}
 
 
 @dataclass
@@ -24,10 +31,22 @@ class EvmWallet:
     chain_id: int
     private_key: str | None
     address: str | None
+    fee_oracle: FeeOracle | None = None
+    gas_cache: GasEstimateCache | None = None
+    urgency: str = "normal"
+    contracts: ContractRegistry = field(init=False)
+
+    def __post_init__(self):
+        self.contracts = ContractRegistry(self.w3)
 
     @classmethod
     def create(
-        cls, rpc_url: str, chain_id: int, private_key: str | None, explicit_address: str | None
+        cls,
+        rpc_url: str,
+        chain_id: int,
+        private_key: str | None,
+        explicit_address: str | None,
+        component: str = "executor",
     ):
         if rpc_url.startswith("ws"):
             wsprov = getattr(Web3, "WebsocketProvider", None)
@@ -43,6 +62,7 @@ class EvmWallet:
 
                 hpprov = _HTTPProvider
             w3 = Web3(hpprov(rpc_url))
+        instrument_web3(w3, chain_key(chain_id), component)
         addr = explicit_address
         if private_key and not addr:
             addr = Account.from_key(private_key).address
@@ -52,26 +72,59 @@ class EvmWallet:
         return cls(w3=w3, chain_id=chain_id, private_key=private_key, address=addr)
 
     def erc20(self, token_addr: str):
-        return self.w3.eth.contract(address=Web3.to_checksum_address(token_addr), abi=ERC20_ABI)
+        return self.contracts.get(token_addr, "erc20.json")
 
     def router_v2(self, router_addr: str):
-        return self.w3.eth.contract(address=Web3.to_checksum_address(router_addr), abi=UNI_V2_ABI)
+        return self.contracts.get(router_addr, "uniswap_v2_router.json")
 
-    def send_tx(self, tx: dict) -> str:
-        assert self.private_key, "Private key required for sending transactions"
+    def router_v3(self, router_addr: str):
+        return self.contracts.get(router_addr, "uniswap_v3_router.json")
+
+    def quoter_v3(self, quoter_addr: str):
+        return self.contracts.get(quoter_addr, "uniswap_v3_quoter.json")
+
+    def prepare_tx(
+        self, tx: dict, gas_key: tuple | None = None, urgency: str | None = None
+    ) -> dict:
+        """Fills chain id, nonce, gas limit and EIP-1559 fees that `tx` does not set."""
         assert self.address, "Executor address required"
         # Populate common fields
         tx.setdefault("chainId", self.chain_id)
         if "nonce" not in tx:
             tx["nonce"] = self.w3.eth.get_transaction_count(self.address)
-        # Fill gas if not provided
+        # Fill gas if not provided; call shapes with a gas_key reuse a cached limit
         if "gas" not in tx:
-            tx["gas"] = self.w3.eth.estimate_gas({**tx, "from": self.address})
+            if gas_key is not None and self.gas_cache is not None:
+                tx["gas"] = self.gas_cache.get(
+                    gas_key, lambda: self.w3.eth.estimate_gas({**tx, "from": self.address})
+                )
+            else:
+                tx["gas"] = self.w3.eth.estimate_gas({**tx, "from": self.address})
         if "maxFeePerGas" not in tx and "gasPrice" not in tx:
-            # EIP-1559 defaults
-            latest = self.w3.eth.gas_price
-            tx["maxFeePerGas"] = latest * 2
-            tx["maxPriorityFeePerGas"] = self.w3.to_wei(2, "gwei")
+            if self.fee_oracle is not None:
+                max_fee, tip = self.fee_oracle.fees(urgency or self.urgency)
+                tx.setdefault("maxPriorityFeePerGas", tip)
+                tx["maxFeePerGas"] = max(max_fee, int(tx["maxPriorityFeePerGas"]))
+            else:
+                # EIP-1559 defaults
+                latest = self.w3.eth.gas_price
+                tx["maxFeePerGas"] = latest * 2
+                tx["maxPriorityFeePerGas"] = self.w3.to_wei(2, "gwei")
+        return tx
+
+    def send_tx(
+        self,
+        tx: dict,
+        gas_key: tuple | None = None,
+        urgency: str | None = None,
+        stages: dict | None = None,
+    ) -> str:
+        assert self.private_key, "Private key required for sending transactions"
+        self.prepare_tx(tx, gas_key=gas_key, urgency=urgency)
         signed = self.w3.eth.account.sign_transaction(tx, self.private_key)
+        if stages is not None:
+            stages["signed"] = datetime.utcnow()
         tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+        if stages is not None:
+            stages["sent"] = datetime.utcnow()
         return tx_hash.hex()
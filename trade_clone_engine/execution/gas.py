@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from loguru import logger
+from web3 import Web3
+
+# Reward percentiles requested from eth_feeHistory per urgency level
+URGENCY_PERCENTILES: dict[str, int] = {"low": 25, "normal": 50, "high": 90}
+
+# Approximate block times, used as the fee refresh interval (one refresh per block)
+BLOCK_TIME_SEC: dict[int, float] = {1: 12.0, 137: 2.0, 8453: 2.0}
+
+
+@dataclass
+class FeeEstimate:
+    block: int
+    base_fee: int  # projected base fee of the next block
+    priority_fees: dict[str, int]
+
+
+@dataclass
+class FeeOracle:
+    """EIP-1559 fee estimates from eth_feeHistory, refreshed at most once per block."""
+
+    w3: Web3
+    refresh_sec: float = 12.0
+    block_count: int = 10
+    min_priority_fee_wei: int = 10**8  # 0.1 gwei floor so we never bid nothing
+    _estimate: FeeEstimate | None = None
+    _fetched_at: float = 0.0
+
+    @classmethod
+    def for_chain(cls, w3, chain_id: int, refresh_sec: float | None = None) -> FeeOracle:
+        return cls(w3=w3, refresh_sec=refresh_sec or BLOCK_TIME_SEC.get(chain_id, 12.0))
+
+    def refresh(self, force: bool = False) -> FeeEstimate:
+        fresh = time.monotonic() - self._fetched_at < self.refresh_sec
+        if self._estimate is not None and fresh and not force:
+            return self._estimate
+        levels = sorted(URGENCY_PERCENTILES.items(), key=lambda kv: kv[1])
+        hist = self.w3.eth.fee_history(self.block_count, "latest", [p for _, p in levels])
+        base_fees = hist["baseFeePerGas"]
+        rewards = hist.get("reward") or []
+        priority: dict[str, int] = {}
+        for i, (name, _pct) in enumerate(levels):
+            samples = [int(r[i]) for r in rewards if len(r) > i and int(r[i]) > 0]
+            tip = int(statistics.median(samples)) if samples else 0
+            priority[name] = max(tip, self.min_priority_fee_wei)
+        self._estimate = FeeEstimate(
+            block=int(hist["oldestBlock"]) + max(0, len(rewards) - 1),
+            # The last baseFeePerGas entry is the projection for the pending block
+            base_fee=int(base_fees[-1]),
+            priority_fees=priority,
+        )
+        self._fetched_at = time.monotonic()
+        logger.debug("Fee oracle refreshed: {}", self._estimate)
+        return self._estimate
+
+    def fees(self, urgency: str = "normal") -> tuple[int, int]:
+        """Returns (maxFeePerGas, maxPriorityFeePerGas) for the given urgency."""
+        est = self.refresh()
+        tip = est.priority_fees.get(urgency) or est.priority_fees["normal"]
+        # Headroom for two consecutive full blocks of base fee increases
+        return 2 * est.base_fee + tip, tip
+
+
+@dataclass
+class GasEstimateCache:
+    """Caches gas limits per (contract, method, path length) call shape."""
+
+    buffer: float = 1.2
+    _limits: dict[tuple, int] = field(default_factory=dict)
+
+    def get(self, key: tuple, estimate: Callable[[], int]) -> int:
+        key = tuple(str(k).lower() for k in key)
+        if key not in self._limits:
+            self._limits[key] = int(int(estimate()) * self.buffer)
+        return self._limits[key]
+
+    def invalidate(self, key: tuple) -> None:
+        self._limits.pop(tuple(str(k).lower() for k in key), None)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from loguru import logger
+from web3 import Web3
+
+from trade_clone_engine.execution.contracts import ContractRegistry
+
+# Multicall3 is deployed at the same address on every chain we support
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+def _abi_type(item: dict) -> str:
+    typ = item["type"]
+    if typ.startswith("tuple"):
+        inner = ",".join(_abi_type(c) for c in item.get("components", []))
+        return f"({inner}){typ[len('tuple') :]}"
+    return typ
+
+
+@dataclass
+class MulticallReader:
+    """Runs several contract reads in a single eth_call through Multicall3.
+
+    Calls are bound contract functions (e.g. `erc20.functions.allowance(owner, spender)`).
+    Results come back in order, decoded; a call that reverts yields None instead of
+    failing the batch. A call that could not be made at all (the batch and the one-by-one
+    retry both failed in transport) yields `failed`, None unless the caller needs to tell
+    the two apart.
+    """
+
+    w3: Web3
+    contracts: ContractRegistry
+    address: str = MULTICALL3_ADDRESS
+
+    def read(self, calls: Sequence, block_identifier="latest", failed=None) -> list:
+        if not calls:
+            return []
+        if len(calls) == 1:
+            return [self._read_one(calls[0], block_identifier, failed)]
+        aggregate3 = self.contracts.fn(self.address, "multicall3.json", "aggregate3")
+        payload = [(fn.address, True, fn._encode_transaction_data()) for fn in calls]
+        try:
+            results = aggregate3(payload).call(block_identifier=block_identifier)
+        except Exception as e:
+            logger.warning(
+                "Multicall3 batch failed ({}); reading {} calls one by one", e, len(calls)
+            )
+            return [self._read_one(fn, block_identifier, failed) for fn in calls]
+        out = []
+        for fn, (ok, data) in zip(calls, results, strict=True):
+            if not ok or not data:
+                out.append(None)
+                continue
+            try:
+                decoded = self.w3.codec.decode([_abi_type(o) for o in fn.abi["outputs"]], data)
+            except Exception as e:
+                logger.debug("Multicall3 decode failed for {}: {}", fn.fn_name, e)
+                out.append(None)
+                continue
+            out.append(decoded[0] if len(decoded) == 1 else tuple(decoded))
+        return out
+
+    @staticmethod
+    def _read_one(fn, block_identifier, failed=None):
+        from web3.exceptions import BadFunctionCallOutput, ContractLogicError
+
+        try:
+            return fn.call(block_identifier=block_identifier)
+        except (ContractLogicError, BadFunctionCallOutput) as e:
+            # Reverted, or no contract at the address: the same answer next time
+            logger.debug("{} call reverted: {}", fn.fn_name, e)
+            return None
+        except Exception as e:
+            logger.debug("{} call failed: {}", fn.fn_name, e)
+            return failed
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from loguru import logger
+
+from trade_clone_engine.config import AppSettings
+
+
+def _norm_wallet(addr: str) -> str:
+    # EVM addresses are case-insensitive; Solana pubkeys are case-sensitive base58
+    return addr.lower() if addr.startswith("0x") else addr
+
+
+@dataclass(frozen=True)
+class WalletPolicy:
+    copy_ratio: float
+    slippage_bps: int
+    max_native_in_wei: int
+    allowed_tokens: frozenset[str] = frozenset()
+    denied_tokens: frozenset[str] = frozenset()
+
+    def tokens_ok(self, tokens: Iterable[str | None]) -> bool:
+        toks = [t.lower() for t in tokens if t]
+        return not any(t in self.denied_tokens for t in toks) and (
+            not self.allowed_tokens or all(t in self.allowed_tokens for t in toks)
+        )
+
+
+@dataclass
+class PolicyIndex:
+    """Per-wallet execution policies compiled from wallets.yaml.
+
+    The file is parsed once and re-parsed only when its mtime changes (checked at most
+    every `check_interval_sec`), so executors can look up a policy on every trade.
+    """
+
+    settings: AppSettings
+    check_interval_sec: float = 2.0
+    _policies: dict[str, WalletPolicy] = field(default_factory=dict)
+    _default: WalletPolicy | None = None
+    _mtime: float | None = None
+    _checked_at: float = 0.0
+
+    def for_wallet(self, wallet: str | None) -> WalletPolicy:
+        self._maybe_reload()
+        return self._policies.get(_norm_wallet(wallet or ""), self._default)
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if self._default is not None and now - self._checked_at < self.check_interval_sec:
+            return
+        self._checked_at = now
+        path = Path(self.settings.wallets_config)
+        mtime = path.stat().st_mtime if path.exists() else None
+        if self._default is None or mtime != self._mtime:
+            self._mtime = mtime
+            self.reload()
+
+    def reload(self) -> None:
+        s = self.settings
+        default = WalletPolicy(
+            copy_ratio=float(s.copy_ratio),
+            slippage_bps=int(s.slippage_bps),
+            max_native_in_wei=int(s.max_native_in_wei or 0),
+        )
+        policies: dict[str, WalletPolicy] = {}
+        for addr, cfg in s.wallet_overrides().items():
+            try:
+                policies[addr] = WalletPolicy(
+                    copy_ratio=float(cfg.get("copy_ratio", default.copy_ratio)),
+                    slippage_bps=int(cfg.get("slippage_bps", default.slippage_bps)),
+                    max_native_in_wei=int(
+                        cfg.get("max_native_in_wei", default.max_native_in_wei) or 0
+                    ),
+                    allowed_tokens=frozenset(
+                        a.lower() for a in (cfg.get("allowed_tokens") or []) if a
+                    ),
+                    denied_tokens=frozenset(
+                        a.lower() for a in (cfg.get("denied_tokens") or []) if a
+                    ),
+                )
+            except (TypeError, ValueError) as e:
+                logger.warning("Invalid policy for wallet {}: {}", addr, e)
+        self._default = default
+        self._policies = policies
+        logger.info("Loaded {} wallet policies from {}", len(policies), s.wallets_config)
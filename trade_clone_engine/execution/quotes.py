@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from trade_clone_engine.telemetry import QUOTE_LATENCY
+
+
+@dataclass
+class Quote:
+    venue: str
+    amount_out: int
+    # Aggregator quotes come with a ready transaction; on-chain venues build one from min_out
+    tx: dict | None = None
+    build: Callable[[int], dict] | None = None
+    spender: str | None = None  # address that needs an ERC20 allowance for token_in
+    gas_key: tuple | None = None
+    returns: str | None = None  # ABI return type of the swap call, to read simulated output
+    latency_ms: float = 0.0
+
+
+@dataclass
+class QuoteResult:
+    best: Quote | None
+    quotes: list[Quote] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+    latencies_ms: dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, dict]:
+        out: dict[str, dict] = {}
+        for q in self.quotes:
+            out[q.venue] = {"amount_out": str(q.amount_out), "latency_ms": round(q.latency_ms, 1)}
+        for venue, err in self.errors.items():
+            out[venue] = {"error": err[:200], "latency_ms": self.latencies_ms.get(venue)}
+        return out
+
+
+@dataclass
+class QuoteEngine:
+    """Queries quote venues concurrently and keeps the best output within a latency budget."""
+
+    budget_ms: int = 1500
+    max_workers: int = 8
+    _pool: ThreadPoolExecutor | None = None
+
+    def __post_init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="quote")
+
+    def race(self, venues: dict[str, Callable[[], Quote | list[Quote] | None]]) -> QuoteResult:
+        """Runs every venue concurrently; a venue may return several quotes from one batch."""
+        result = QuoteResult(best=None)
+        if not venues:
+            return result
+        started = time.monotonic()
+        futures = {self._pool.submit(self._timed, name, fn): name for name, fn in venues.items()}
+        done, pending = wait(futures, timeout=self.budget_ms / 1000.0)
+        rank: dict[str, tuple[int, int]] = {}
+        order = list(venues)
+        for fut in done:
+            name = futures[fut]
+            try:
+                quotes, latency_ms = fut.result()
+            except Exception as e:
+                result.errors[name] = str(e) or type(e).__name__
+                result.latencies_ms[name] = round((time.monotonic() - started) * 1000, 1)
+                continue
+            result.latencies_ms[name] = round(latency_ms, 1)
+            valid = [q for q in quotes if q is not None and q.amount_out > 0]
+            if not valid:
+                result.errors[name] = "no quote"
+                continue
+            for i, quote in enumerate(valid):
+                quote.latency_ms = latency_ms
+                rank[quote.venue] = (order.index(name), i)
+                result.quotes.append(quote)
+        for fut in pending:
+            fut.cancel()
+            name = futures[fut]
+            result.errors[name] = "timeout"
+            result.latencies_ms[name] = float(self.budget_ms)
+        # Ties go to the venue listed first (on-chain venues are listed before aggregators)
+        result.quotes.sort(key=lambda q: rank[q.venue])
+        if result.quotes:
+            result.best = max(result.quotes, key=lambda q: q.amount_out)
+        logger.debug("Quote race: {}", result.summary())
+        return result
+
+    @staticmethod
+    def _timed(name: str, fn: Callable) -> tuple[list[Quote | None], float]:
+        t0 = time.monotonic()
+        try:
+            quotes = fn()
+        finally:
+            QUOTE_LATENCY.labels(venue=name).observe(time.monotonic() - t0)
+        if not isinstance(quotes, list):
+            # Single-quote venues are reported under the name they were raced as
+            if quotes is not None:
+                quotes.venue = name
+            quotes = [quotes]
+        return quotes, (time.monotonic() - t0) * 1000
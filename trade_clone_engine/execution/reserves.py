@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+from eth_utils import keccak
+from loguru import logger
+from web3 import Web3
+
+from trade_clone_engine.execution.contracts import checksum, hexstr
+from trade_clone_engine.execution.multicall import MulticallReader
+from trade_clone_engine.providers.instrumentation import rpc_component
+
+# keccak("Sync(uint112,uint112)")
+SYNC_TOPIC = "1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1"
+
+# Beyond this many blocks of backlog we reseed instead of replaying Sync logs
+MAX_LOG_RANGE = 1000
+
+# Log index of a seeded state: getReserves at block N already reflects all of N's logs
+AFTER_BLOCK = 2**63
+
+# Providers cap the address list of a log filter and the size of an eth_call
+LOG_ADDRESSES_PER_QUERY = 500
+SEED_PAIRS_PER_BATCH = 250
+
+
+def pair_address(factory: str, init_code_hash: str, token_a: str, token_b: str) -> str:
+    """Uniswap V2 pair address for two tokens, derived locally via CREATE2."""
+    t0, t1 = sorted(bytes.fromhex(hexstr(t)) for t in (token_a, token_b))
+    salt = keccak(t0 + t1)
+    raw = keccak(
+        b"\xff" + bytes.fromhex(hexstr(factory)) + salt + bytes.fromhex(hexstr(init_code_hash))
+    )
+    return checksum("0x" + raw[12:].hex())
+
+
+def get_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int = 30) -> int:
+    """UniswapV2Library.getAmountOut with the pool fee in basis points."""
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+    amount_in_with_fee = amount_in * (10_000 - fee_bps)
+    return amount_in_with_fee * reserve_out // (reserve_in * 10_000 + amount_in_with_fee)
+
+
+@dataclass(frozen=True)
+class PairReserves:
+    token0: str  # lowercase
+    reserve0: int
+    reserve1: int
+    block: int
+    log_index: int = AFTER_BLOCK  # position of the Sync these reserves come from
+
+
+@dataclass
+class ReserveTracker:
+    """Uniswap V2 pair reserves kept in-process, so V2 quotes need no RPC round-trip.
+
+    Pairs are seeded with getReserves (one Multicall3 batch) the first time a route uses
+    them; afterwards `poll()` applies Sync logs for every tracked pair, from the block
+    each pair is synced to. Quotes return None when a pair is unknown, polling has
+    fallen behind, or the router's swap fee is not configured in `fees_bps`, and callers
+    fall back to the router's getAmountsOut.
+
+    Pairs no route has used for `idle_sec` stop being tracked, as do the least recently
+    used ones beyond `max_pairs`. Hops with no deployed pair are remembered for
+    `missing_ttl_sec`, so they are not looked up again on every quote.
+    """
+
+    w3: Web3
+    reader: MulticallReader
+    factories: dict[str, tuple[str, str]]  # router -> (factory, init code hash)
+    stale_after_sec: float = 30.0
+    fees_bps: dict[str, int] = field(default_factory=dict)  # router -> swap fee (bps)
+    idle_sec: float = 3600.0
+    max_pairs: int = 5000
+    missing_ttl_sec: float = 300.0
+    _pairs: dict[str, PairReserves] = field(default_factory=dict)
+    _synced: dict[str, int] = field(default_factory=dict)  # pair -> last block with logs applied
+    _used: dict[str, float] = field(default_factory=dict)  # pair -> last quoted (monotonic)
+    _missing: dict[str, float] = field(default_factory=dict)  # pair -> retry after (monotonic)
+    _last_block: int | None = None
+    _polled_at: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.factories = {k.lower(): v for k, v in self.factories.items()}
+        self.fees_bps = {k.lower(): int(v) for k, v in self.fees_bps.items()}
+
+    def supports(self, router: str) -> bool:
+        # Forks charge different fees; quoting with a guessed one would misprice routes
+        return router.lower() in self.factories and router.lower() in self.fees_bps
+
+    def pair_for(self, router: str, token_a: str, token_b: str) -> str:
+        factory, init_code_hash = self.factories[router.lower()]
+        return pair_address(factory, init_code_hash, token_a, token_b)
+
+    def amount_out(self, router: str, amount_in: int, path: list[str]) -> int | None:
+        """Multi-hop constant-product output, or None if it cannot be computed locally."""
+        if not self.supports(router) or len(path) < 2:
+            return None
+        polled_ago = time.monotonic() - self._polled_at
+        if self._last_block is not None and polled_ago > self.stale_after_sec:
+            return None
+        hops = [(path[i], path[i + 1]) for i in range(len(path) - 1)]
+        pairs = [self.pair_for(router, a, b) for a, b in hops]
+        now = time.monotonic()
+        missing = [p for p in pairs if p.lower() not in self._pairs]
+        if any(self._missing.get(p.lower(), 0.0) > now for p in missing):
+            return None  # a hop has no pair; known from a recent lookup
+        if missing:
+            self.seed(missing)
+        for pair in pairs:
+            self._used[pair.lower()] = now
+        fee_bps = self.fees_bps[router.lower()]
+        amount = int(amount_in)
+        for (token_in, _token_out), pair in zip(hops, pairs, strict=True):
+            res = self._pairs.get(pair.lower())
+            if res is None:
+                return None
+            if token_in.lower() == res.token0:
+                amount = get_amount_out(amount, res.reserve0, res.reserve1, fee_bps)
+            else:
+                amount = get_amount_out(amount, res.reserve1, res.reserve0, fee_bps)
+        return amount
+
+    def seed(self, pairs: list[str]) -> None:
+        """Reads reserves and token0 for `pairs` at one block and starts tracking them."""
+        block = self.w3.eth.block_number
+        results = []
+        for i in range(0, len(pairs), SEED_PAIRS_PER_BATCH):
+            calls = []
+            for pair in pairs[i : i + SEED_PAIRS_PER_BATCH]:
+                contract = self.reader.contracts.get(pair, "uniswap_v2_pair.json")
+                calls.append(contract.functions.getReserves())
+                calls.append(contract.functions.token0())
+            results.extend(self.reader.read(calls, block_identifier=block))
+        now = time.monotonic()
+        with self._lock:
+            for i, pair in enumerate(pairs):
+                reserves, token0 = results[2 * i], results[2 * i + 1]
+                if reserves is None or token0 is None:
+                    # No pair deployed for this hop
+                    self._missing[pair.lower()] = now + self.missing_ttl_sec
+                    continue
+                self._missing.pop(pair.lower(), None)
+                self._used.setdefault(pair.lower(), now)
+                self._pairs[pair.lower()] = PairReserves(
+                    token0=str(token0).lower(),
+                    reserve0=int(reserves[0]),
+                    reserve1=int(reserves[1]),
+                    block=block,
+                )
+                self._synced[pair.lower()] = block
+            if self._last_block is None:
+                self._last_block = block
+                self._polled_at = time.monotonic()
+        logger.debug("Seeded reserves for {} V2 pairs at block {}", len(pairs), block)
+
+    def apply_log(self, log) -> None:
+        topics = log.get("topics") or []
+        if not topics or hexstr(topics[0]) != SYNC_TOPIC:
+            return
+        pair = str(log.get("address", "")).lower()
+        with self._lock:
+            current = self._pairs.get(pair)
+            position = (int(log.get("blockNumber") or 0), int(log.get("logIndex") or 0))
+            # Only Syncs after the applied one count: a pair can sync several times per
+            # block, and seeding already reflects every Sync up to the end of its block
+            if current is None or position <= (current.block, current.log_index):
+                return
+            data = hexstr(log.get("data", ""))
+            self._pairs[pair] = PairReserves(
+                token0=current.token0,
+                reserve0=int(data[:64], 16),
+                reserve1=int(data[64:128], 16),
+                block=position[0],
+                log_index=position[1],
+            )
+
+    def evict(self, now: float | None = None) -> int:
+        """Stops tracking idle pairs and forgets expired missing pairs; returns pairs dropped."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._missing = {p: t for p, t in self._missing.items() if t > now}
+            by_use = sorted(self._pairs, key=lambda p: self._used.get(p, 0.0), reverse=True)
+            drop = [
+                p
+                for i, p in enumerate(by_use)
+                if i >= self.max_pairs or now - self._used.get(p, 0.0) > self.idle_sec
+            ]
+            for pair in drop:
+                self._pairs.pop(pair, None)
+                self._synced.pop(pair, None)
+                self._used.pop(pair, None)
+        if drop:
+            logger.debug("Stopped tracking {} idle V2 pairs", len(drop))
+        return len(drop)
+
+    def poll(self) -> None:
+        """Applies Sync logs emitted since the last poll for every tracked pair.
+
+        Pairs seeded while a poll is in flight keep their own seed block, so the next
+        poll fetches their logs from there; logs already applied are skipped by position.
+        Pairs are queried in chunks of LOG_ADDRESSES_PER_QUERY addresses.
+        """
+        self.evict()
+        with self._lock:
+            synced = dict(self._synced)
+        if not synced:
+            self._polled_at = time.monotonic()
+            return
+        start = min(synced.values()) + 1
+        latest = self.w3.eth.block_number
+        if latest < start:
+            self._polled_at = time.monotonic()
+            return
+        if latest - start >= MAX_LOG_RANGE:
+            logger.warning("Reserve tracking fell {} blocks behind; reseeding", latest - start)
+            with self._lock:
+                self._pairs.clear()
+                self._synced.clear()
+                self._last_block = None
+            self.seed([checksum(p) for p in synced])
+            return
+        addresses = sorted(synced, key=synced.get)  # chunks of similarly synced pairs
+        for i in range(0, len(addresses), LOG_ADDRESSES_PER_QUERY):
+            chunk = addresses[i : i + LOG_ADDRESSES_PER_QUERY]
+            logs = self.w3.eth.get_logs(
+                {
+                    "fromBlock": synced[chunk[0]] + 1,
+                    "toBlock": latest,
+                    "address": [checksum(p) for p in chunk],
+                    "topics": ["0x" + SYNC_TOPIC],
+                }
+            )
+            for log in logs:
+                self.apply_log(log)
+        with self._lock:
+            for pair in synced:
+                if pair in self._synced:
+                    self._synced[pair] = max(self._synced[pair], latest)
+            self._last_block = latest
+        self._polled_at = time.monotonic()
+
+    def follow(self, interval_sec: float) -> threading.Thread:
+        """Polls Sync logs in a daemon thread, once per `interval_sec` (about one block)."""
+
+        def loop():
+            while True:
+                try:
+                    with rpc_component("reserves"):
+                        self.poll()
+                except Exception as e:
+                    logger.warning("Reserve polling failed: {}", e)
+                time.sleep(interval_sec)
+
+        thread = threading.Thread(target=loop, name="v2-reserves", daemon=True)
+        thread.start()
+        return thread
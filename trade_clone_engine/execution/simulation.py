@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from loguru import logger
+
+from trade_clone_engine.execution.solana_confirmations import as_json
+
+
+@dataclass
+class Simulation:
+    """Outcome of a dry run of a built swap against the latest chain state.
+
+    `reverted` is only set when the node ran the transaction and it failed; an RPC error
+    leaves it False (inconclusive), so simulation outages never block execution.
+    """
+
+    reverted: bool = False
+    amount_out: int | None = None
+    error: str | None = None
+
+
+def _is_revert(e: Exception) -> bool:
+    from web3.exceptions import ContractLogicError
+
+    return isinstance(e, ContractLogicError) or "revert" in str(e).lower()
+
+
+def simulate_evm(
+    w3, tx: dict, sender: str, returns: str | None = None, state_override: dict | None = None
+) -> Simulation:
+    """eth_call of a swap tx; `returns` is its ABI return type, to read the output amount.
+
+    Routers return the amounts of each hop (`uint256[]`) or the output (`uint256`); the
+    last value is the amount received.
+    """
+    call = {k: tx[k] for k in ("to", "data", "value") if k in tx}
+    call["from"] = sender
+    try:
+        raw = w3.eth.call(call, "latest", state_override=state_override)
+    except Exception as e:
+        if _is_revert(e):
+            return Simulation(reverted=True, error=str(e))
+        logger.debug("Swap simulation inconclusive: {}", e)
+        return Simulation(error=str(e))
+    if not returns:
+        return Simulation()
+    try:
+        from eth_abi import decode
+
+        (value,) = decode([returns], bytes(raw))
+        return Simulation(amount_out=int(value[-1] if isinstance(value, list | tuple) else value))
+    except Exception as e:
+        logger.debug("Undecodable simulation output: {}", e)
+        return Simulation()
+
+
+def simulate_solana(client, raw_signed: bytes) -> Simulation:
+    """simulateTransaction of a signed swap.
+
+    Jupiter enforces the quote's minimum output on-chain, so a swap that would land far
+    below its quote fails here with a slippage error instead of as a paid transaction.
+    """
+    from solders.transaction import VersionedTransaction
+
+    try:
+        resp = as_json(client.simulate_transaction(VersionedTransaction.from_bytes(raw_signed)))
+    except Exception as e:
+        logger.debug("Swap simulation inconclusive: {}", e)
+        return Simulation(error=str(e))
+    value = (resp.get("result") or {}).get("value") or {}
+    if value.get("err") is None:
+        return Simulation()
+    logs = [line for line in value.get("logs") or [] if "rror" in line][-1:]
+    return Simulation(reverted=True, error=f"{value['err']}" + (f" ({logs[0]})" if logs else ""))
+
+
+def shortfall_bps(amount_out: int, quoted: int) -> int:
+    """How far a simulated output falls below the quote, in basis points (0 if above)."""
+    if quoted <= 0 or amount_out >= quoted:
+        return 0
+    return (quoted - amount_out) * 10_000 // quoted
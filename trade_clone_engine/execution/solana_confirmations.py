@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import select
+
+from trade_clone_engine.db import ExecutedTrade, session_scope
+from trade_clone_engine.providers.instrumentation import rpc_component
+from trade_clone_engine.telemetry import EXECUTIONS
+
+# getSignatureStatuses accepts at most 256 signatures per request
+STATUS_BATCH = 256
+
+CONFIRMED = ("confirmed", "finalized")
+
+
+def as_json(resp) -> dict:
+    """JSON-RPC shaped dict for both legacy dict responses and solders response objects."""
+    if resp is None or isinstance(resp, dict):
+        return resp or {}
+    return json.loads(resp.to_json())
+
+
+def amount_received(tx: dict, owner: str) -> int | None:
+    """Token amount `owner` gained in a transaction, from pre/post token balances."""
+    meta = (tx.get("result") or {}).get("meta") or {}
+    pre = meta.get("preTokenBalances") or []
+    post = meta.get("postTokenBalances") or []
+    amount_out = None
+    for p, q in zip(pre, post, strict=False):
+        if q.get("owner") == owner:
+            pa = int((p.get("uiTokenAmount") or {}).get("amount") or 0)
+            qa = int((q.get("uiTokenAmount") or {}).get("amount") or 0)
+            if qa > pa:
+                amount_out = qa - pa
+    return amount_out
+
+
+@dataclass
+class _Pending:
+    executed_id: int
+    sent_at: float  # monotonic
+
+
+@dataclass
+class SignatureTracker:
+    """Confirms sent Solana swaps in the background so the executor never waits on them.
+
+    Sent transactions are recorded as 'pending'; a daemon thread polls
+    getSignatureStatuses for every in-flight signature in one request, and once a
+    signature is confirmed (or failed, or not seen within `timeout_sec`) updates the
+    executed trade with its outcome, confirmation time and realized output.
+    """
+
+    client: object
+    SessionFactory: object
+    owner: str | None
+    timeout_sec: float = 90.0
+    poll_sec: float = 0.5
+    _pending: dict[str, _Pending] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def track(self, signature: str, executed_id: int) -> None:
+        with self._lock:
+            self._pending[signature] = _Pending(executed_id, time.monotonic())
+
+    def resume(self) -> int:
+        """Tracks trades left pending by a previous run; returns how many."""
+        with session_scope(self.SessionFactory) as s:
+            rows = s.execute(
+                select(ExecutedTrade.id, ExecutedTrade.tx_hash).where(
+                    ExecutedTrade.chain == "solana", ExecutedTrade.status == "pending"
+                )
+            ).all()
+        for executed_id, signature in rows:
+            if signature:
+                self.track(signature, executed_id)
+        return len(rows)
+
+    def poll_once(self) -> None:
+        from solders.signature import Signature
+
+        with self._lock:
+            pending = list(self._pending.items())
+        for i in range(0, len(pending), STATUS_BATCH):
+            chunk = pending[i : i + STATUS_BATCH]
+            resp = as_json(
+                self.client.get_signature_statuses([Signature.from_string(s) for s, _ in chunk])
+            )
+            statuses = (resp.get("result") or {}).get("value") or []
+            for (signature, p), st in zip(chunk, statuses, strict=False):
+                if st and st.get("err") is not None:
+                    error = f"Transaction failed: {st['err']}"
+                    self._resolve(signature, p, "failed", error, landed=True)
+                elif st and st.get("confirmationStatus") in CONFIRMED:
+                    self._resolve(signature, p, "success", None, landed=True)
+                elif time.monotonic() - p.sent_at > self.timeout_sec:
+                    error = f"Not confirmed within {self.timeout_sec:.0f}s"
+                    self._resolve(signature, p, "failed", error, landed=False)
+
+    def _resolve(
+        self, signature: str, p: _Pending, status: str, error: str | None, landed: bool
+    ) -> None:
+        from solders.signature import Signature
+
+        confirmed_at = datetime.utcnow() if landed else None
+        amount_out = None
+        if status == "success" and self.owner:
+            try:
+                tx = as_json(
+                    self.client.get_transaction(
+                        Signature.from_string(signature), max_supported_transaction_version=0
+                    )
+                )
+                amount_out = amount_received(tx, self.owner)
+            except Exception as e:
+                logger.debug("Fetching confirmed transaction {} failed: {}", signature, e)
+        with session_scope(self.SessionFactory) as s:
+            row = s.get(ExecutedTrade, p.executed_id)
+            if row is not None:
+                row.status = status
+                row.error = error
+                row.confirmed_at = confirmed_at
+                if amount_out is not None:
+                    row.amount_out_wei = amount_out
+        with self._lock:
+            self._pending.pop(signature, None)
+        EXECUTIONS.labels(chain="solana", status=status).inc()
+        logger.info("Solana swap {} {}{}", signature, status, f": {error}" if error else "")
+
+    def start(self) -> threading.Thread:
+        def loop():
+            with rpc_component("receipts"):
+                while True:
+                    try:
+                        if self._pending:
+                            self.poll_once()
+                    except Exception as e:
+                        logger.warning("Signature status polling failed: {}", e)
+                    time.sleep(self.poll_sec)
+
+        thread = threading.Thread(target=loop, name="sol-confirmations", daemon=True)
+        thread.start()
+        return thread
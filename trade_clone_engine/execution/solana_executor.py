@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import base64
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
 
 from loguru import logger
 from solana.rpc.api import Client
@@ -12,8 +14,31 @@ from solders.pubkey import Pubkey
 from sqlalchemy import select
 
 from trade_clone_engine.aggregators import jupiter
+from trade_clone_engine.aggregators.cache import quote_cache
 from trade_clone_engine.config import AppSettings
 from trade_clone_engine.db import ExecutedTrade, ObservedTrade, session_scope
+from trade_clone_engine.execution.policy import PolicyIndex
+from trade_clone_engine.execution.simulation import simulate_solana
+from trade_clone_engine.execution.solana_confirmations import SignatureTracker
+from trade_clone_engine.execution.solana_fees import PriorityFeeEstimator, route_accounts
+from trade_clone_engine.execution.solana_signing import SwapBuilder, sign_transaction
+from trade_clone_engine.providers.instrumentation import InstrumentedClient
+from trade_clone_engine.telemetry import EXECUTIONS, QUOTE_LATENCY
+
+# Wrapped SOL mint; max_native_in_wei caps lamports spent when selling SOL
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+
+# Latency stages recorded on executed trades as <stage>_at
+STAGES = ("claimed", "quoted", "signed", "sent", "confirmed")
+
+
+@dataclass
+class SolanaResult:
+    status: str = "skipped"  # skipped|pending|failed; pending swaps are confirmed later
+    tx_sig: str | None = None
+    error: str | None = None
+    amount_in: int | None = None
+    stages: dict[str, datetime] = field(default_factory=dict)
 
 
 @dataclass
@@ -22,10 +47,27 @@ class SolanaExecutor:
     client: Client
     keypair: Keypair | None
     pubkey: Pubkey | None
+    policies: PolicyIndex | None = None
+    tracker: SignatureTracker | None = None  # set in run()
+    fees: PriorityFeeEstimator | None = None
+    builder: SwapBuilder | None = None  # set in run() when building swaps locally
+    _pool: ThreadPoolExecutor | None = None
+
+    def __post_init__(self):
+        if self.policies is None:
+            self.policies = PolicyIndex(
+                self.settings, check_interval_sec=self.settings.policy_reload_interval_sec
+            )
+        if self.fees is None and self.settings.sol_priority_fee:
+            self.fees = PriorityFeeEstimator.from_settings(self.settings)
+        quote_cache.configure(
+            ttl_sec=self.settings.quote_cache_ttl_sec,
+            amount_digits=self.settings.quote_amount_digits,
+        )
 
     @classmethod
     def create(cls, settings: AppSettings) -> SolanaExecutor:
-        client = Client(settings.sol_rpc_url)
+        client = InstrumentedClient(Client(settings.sol_rpc_url), "executor")
         kp = None
         pk = None
         if settings.sol_executor_private_key:
@@ -38,139 +80,174 @@ class SolanaExecutor:
             pk = Pubkey.from_string(settings.sol_executor_pubkey)
         return cls(settings=settings, client=client, keypair=kp, pubkey=pk)
 
+    def _claim(self, s) -> list[ObservedTrade]:
+        """Oldest unprocessed Solana trades, as many as there are free in-flight slots.
+
+        Rows are locked until the session commits; rows another executor holds are skipped.
+        """
+        in_flight = self.tracker.in_flight() if self.tracker is not None else 0
+        slots = max(0, self.settings.sol_max_in_flight - in_flight)
+        if slots == 0:
+            return []
+        return list(
+            s.execute(
+                select(ObservedTrade)
+                .where(ObservedTrade.processed.is_(False), ObservedTrade.chain == "solana")
+                .order_by(ObservedTrade.id.asc())
+                .limit(slots)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+
+    def _execute(self, rec: ObservedTrade, claimed_at: datetime) -> SolanaResult:
+        """Quotes, signs and sends one copy without waiting for confirmation."""
+        res = SolanaResult(stages={"claimed": claimed_at})
+        try:
+            if not (rec.token_in and rec.token_out and rec.amount_in_wei):
+                raise Exception("Insufficient data for quote")
+
+            policy = self.policies.for_wallet(rec.wallet)
+            if not policy.tokens_ok([rec.token_in, rec.token_out]):
+                raise Exception("Tokens not allowed by policy")
+            amount_in = int(rec.amount_in_wei * max(0.0, policy.copy_ratio))
+            if policy.max_native_in_wei and rec.token_in == WSOL_MINT:
+                amount_in = min(amount_in, policy.max_native_in_wei)
+            # Quoted (and so swapped) at the bucketed amount cached quotes are keyed by
+            amount_in = quote_cache.bucket(amount_in)
+            if amount_in <= 0:
+                raise Exception("Copy amount is zero")
+            res.amount_in = amount_in
+            quote_started = time.monotonic()
+            route = jupiter.get_quote(
+                self.settings.jupiter_quote_url,
+                input_mint=rec.token_in,
+                output_mint=rec.token_out,
+                amount=amount_in,
+                slippage_bps=policy.slippage_bps,
+            )
+            res.stages["quoted"] = datetime.utcnow()
+            QUOTE_LATENCY.labels(venue="jupiter").observe(time.monotonic() - quote_started)
+            if not route:
+                res.status = "failed"
+                raise Exception("No Jupiter route")
+
+            if self.settings.dry_run or not self.keypair or not self.pubkey:
+                return res
+
+            raw_signed = self._build_signed(route)
+            res.stages["signed"] = datetime.utcnow()
+            if self.settings.simulate_swaps:
+                sim = simulate_solana(self.client, raw_signed)
+                if sim.reverted:
+                    res.error = f"Simulation failed: {sim.error}"
+                    logger.warning("Skipping Solana swap for trade {}: {}", rec.id, res.error)
+                    return res
+            # Confirmation is tracked by the SignatureTracker, not awaited here
+            resp = self.client.send_raw_transaction(raw_signed, opts=TxOpts(skip_confirmation=True))
+            res.stages["sent"] = datetime.utcnow()
+            res.tx_sig = str(resp.value)
+            res.status = "pending"
+        except Exception as e:
+            res.error = str(e)
+            res.status = "failed" if res.status == "skipped" else res.status
+        return res
+
+    def _build_signed(self, route: dict) -> bytes:
+        """Signed swap transaction for a route, from Jupiter's instructions or full tx."""
+        cu_price = self.fees.estimate(route_accounts(route)) if self.fees else None
+        swap_kwargs = {
+            "compute_unit_price_micro_lamports": cu_price,
+            "dynamic_compute_unit_limit": self.settings.sol_dynamic_compute_limit,
+        }
+        if self.builder is not None:
+            instructions = jupiter.get_swap_instructions(
+                self.settings.jupiter_swap_instructions_url,
+                route,
+                str(self.pubkey),
+                **swap_kwargs,
+            )
+            if not instructions:
+                raise Exception("No swap instructions from Jupiter")
+            return self.builder.build(instructions, self.keypair)
+        swap_tx_b64 = jupiter.get_swap_transaction(
+            self.settings.jupiter_swap_url, route, str(self.pubkey), **swap_kwargs
+        )
+        if not swap_tx_b64:
+            raise Exception("No swap transaction from Jupiter")
+        try:
+            return sign_transaction(base64.b64decode(swap_tx_b64), self.keypair)
+        except Exception as e:
+            raise Exception(f"Unable to deserialize/sign Jupiter swap tx: {e}") from e
+
+    def _record(self, rec: ObservedTrade, res: SolanaResult) -> ExecutedTrade:
+        return ExecutedTrade(
+            observed_trade_id=rec.id,
+            status=res.status,
+            tx_hash=res.tx_sig,
+            gas_spent_wei=None,
+            error=res.error,
+            token_in=rec.token_in,
+            token_out=rec.token_out,
+            amount_in_wei=res.amount_in if res.amount_in is not None else rec.amount_in_wei,
+            amount_out_wei=None,
+            chain="solana",
+            **_stage_columns(res.stages),
+        )
+
     def run(self, SessionFactory):
         logger.info("Starting Solana executor (dry_run={})", self.settings.dry_run)
+        self.tracker = SignatureTracker(
+            client=self.client,
+            SessionFactory=SessionFactory,
+            owner=str(self.pubkey) if self.pubkey else None,
+            timeout_sec=self.settings.sol_confirm_timeout_sec,
+            poll_sec=self.settings.sol_confirm_poll_sec,
+        )
+        resumed = self.tracker.resume()
+        if resumed:
+            logger.info("Resumed confirmation tracking for {} pending swaps", resumed)
+        self.tracker.start()
+        if self.settings.sol_local_swap_build and self.keypair and not self.settings.dry_run:
+            self.builder = SwapBuilder(
+                self.client,
+                refresh_sec=self.settings.sol_blockhash_refresh_sec,
+                table_ttl_sec=self.settings.sol_lookup_table_ttl_sec,
+            )
+            self.builder.start()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, self.settings.sol_max_in_flight), thread_name_prefix="sol-send"
+        )
         while True:
             try:
+                sent: list[tuple[str, ExecutedTrade]] = []
                 with session_scope(SessionFactory) as s:
-                    rec: ObservedTrade | None = (
-                        s.execute(
-                            select(ObservedTrade)
-                            .where(
-                                ObservedTrade.processed.is_(False), ObservedTrade.chain == "solana"
-                            )
-                            .order_by(ObservedTrade.id.asc())
-                            .limit(1)
-                        )
-                        .scalars()
-                        .first()
-                    )
-                    if not rec:
-                        time.sleep(1.5)
+                    recs = self._claim(s)
+                    if not recs:
+                        time.sleep(0.2 if self.tracker.in_flight() else 1.5)
                         continue
-
-                    status = "skipped"
-                    tx_sig = None
-                    err = None
-
-                    try:
-                        if not (rec.token_in and rec.token_out and rec.amount_in_wei):
-                            status = "skipped"
-                            raise Exception("Insufficient data for quote")
-
-                        amount_in = int(rec.amount_in_wei)
-                        route = jupiter.get_quote(
-                            self.settings.jupiter_quote_url,
-                            input_mint=rec.token_in,
-                            output_mint=rec.token_out,
-                            amount=amount_in,
-                            slippage_bps=self.settings.slippage_bps,
-                        )
-                        if not route:
-                            status = "failed"
-                            raise Exception("No Jupiter route")
-
-                        if self.settings.dry_run or not self.keypair or not self.pubkey:
-                            status = "skipped"
+                    claimed_at = datetime.utcnow()
+                    # Swaps of one batch are quoted and sent concurrently
+                    results = list(self._pool.map(self._execute, recs, [claimed_at] * len(recs)))
+                    for rec, res in zip(recs, results, strict=True):
+                        rec.processed = True
+                        exec_rec = self._record(rec, res)
+                        s.add(exec_rec)
+                        if res.status == "pending":
+                            sent.append((res.tx_sig, exec_rec))
                         else:
-                            swap_tx_b64 = jupiter.get_swap_transaction(
-                                self.settings.jupiter_swap_url, route, str(self.pubkey)
-                            )
-                            if not swap_tx_b64:
-                                status = "failed"
-                                raise Exception("No swap transaction from Jupiter")
-                            raw = base64.b64decode(swap_tx_b64)
-                            raw_signed = None
-                            # Prefer legacy solana-py Transaction if available; otherwise try solders VersionedTransaction
-                            try:
-                                from solana.transaction import (
-                                    Transaction as LegacyTransaction,  # type: ignore
-                                )
-
-                                tx = LegacyTransaction.deserialize(raw)
-                                tx.sign(self.keypair)
-                                raw_signed = tx.serialize()
-                            except Exception:
-                                try:
-                                    from solders.transaction import (
-                                        VersionedTransaction,  # type: ignore
-                                    )
-
-                                    vtx = VersionedTransaction.from_bytes(raw)
-                                    # Reconstruct signed transaction using message + signer
-                                    vtx = VersionedTransaction(vtx.message, [self.keypair])
-                                    raw_signed = bytes(vtx)
-                                except Exception as e2:
-                                    raise Exception(
-                                        f"Unable to deserialize/sign Jupiter swap tx: {e2}"
-                                    ) from e2
-
-                            resp = self.client.send_raw_transaction(
-                                raw_signed, opts=TxOpts(skip_confirmation=False)
-                            )
-                            tx_sig = resp.value
-                            status = "success"
-
-                            # Fetch confirmed transaction to get realized amounts
-                            tr = self.client.get_transaction(
-                                tx_sig, max_supported_transaction_version=0
-                            )
-                            meta = (tr.get("result") or {}).get("meta") or {}
-                            post = meta.get("postTokenBalances") or []
-                            pre = meta.get("preTokenBalances") or []
-                            amount_out = None
-                            for i in range(min(len(pre), len(post))):
-                                p = pre[i]
-                                q = post[i]
-                                if q.get("owner") == str(self.pubkey):
-                                    pa = int((p.get("uiTokenAmount") or {}).get("amount") or 0)
-                                    qa = int((q.get("uiTokenAmount") or {}).get("amount") or 0)
-                                    if qa > pa:
-                                        amount_out = qa - pa
-                            exec_rec = ExecutedTrade(
-                                observed_trade_id=rec.id,
-                                status=status,
-                                tx_hash=tx_sig,
-                                gas_spent_wei=None,
-                                error=None,
-                                token_in=rec.token_in,
-                                token_out=rec.token_out,
-                                amount_in_wei=rec.amount_in_wei,
-                                amount_out_wei=str(amount_out) if amount_out is not None else None,
-                            )
-                            rec.processed = True
-                            s.add(exec_rec)
-                            continue
-                    except Exception as e:
-                        err = str(e)
-                        status = "failed" if status == "skipped" else status
-
-                    exec_rec = ExecutedTrade(
-                        observed_trade_id=rec.id,
-                        status=status,
-                        tx_hash=tx_sig,
-                        gas_spent_wei=None,
-                        error=err,
-                        token_in=rec.token_in,
-                        token_out=rec.token_out,
-                        amount_in_wei=rec.amount_in_wei,
-                        amount_out_wei=None,
-                    )
-                    rec.processed = True
-                    s.add(exec_rec)
+                            EXECUTIONS.labels(chain="solana", status=res.status).inc()
+                # Rows are committed (and have ids) before their confirmations can resolve
+                for signature, exec_rec in sent:
+                    self.tracker.track(signature, exec_rec.id)
             except KeyboardInterrupt:
                 logger.info("Solana executor interrupted; shutting down.")
                 break
             except Exception as e:
                 logger.exception("Solana executor error: {}", e)
                 time.sleep(2)
+
+
+def _stage_columns(stages: dict) -> dict:
+    return {f"{stage}_at": stages.get(stage) for stage in STAGES}
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from trade_clone_engine.http_client import http_client
+from trade_clone_engine.providers.instrumentation import record_call
+
+# Target slot time on mainnet-beta
+SLOT_SEC = 0.4
+
+# getRecentPrioritizationFees accepts at most 128 accounts
+MAX_ACCOUNTS = 128
+
+
+def route_accounts(route: dict) -> list[str]:
+    """Accounts a Jupiter route write-locks: its AMM pools, plus both mints."""
+    accounts = []
+    for hop in route.get("routePlan") or []:  # v6 quote
+        key = (hop.get("swapInfo") or {}).get("ammKey")
+        if key:
+            accounts.append(key)
+    for market in route.get("marketInfos") or []:  # v4 route
+        if market.get("id"):
+            accounts.append(market["id"])
+    for key in ("inputMint", "outputMint"):
+        if route.get(key):
+            accounts.append(route[key])
+    return list(dict.fromkeys(accounts))[:MAX_ACCOUNTS]
+
+
+def percentile(values: list[int], pct: float) -> int:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+@dataclass
+class PriorityFeeEstimator:
+    """Compute unit price (micro-lamports) from getRecentPrioritizationFees.
+
+    Fees paid in the last `lookback_slots` slots that locked the route's accounts are
+    reduced to one percentile and clamped to [min, max]. Estimates are cached per set
+    of accounts for `window_slots` slots, so a burst of copies shares one RPC call.
+    """
+
+    rpc_url: str
+    percentile: float = 75.0
+    window_slots: int = 4
+    lookback_slots: int = 20
+    min_micro_lamports: int = 0
+    max_micro_lamports: int = 1_000_000
+    timeout_sec: float = 2.0
+    _cache: dict[tuple[str, ...], tuple[float, int]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def from_settings(cls, settings) -> PriorityFeeEstimator:
+        return cls(
+            rpc_url=settings.sol_rpc_url,
+            percentile=settings.sol_priority_fee_percentile,
+            window_slots=settings.sol_priority_fee_window_slots,
+            lookback_slots=settings.sol_priority_fee_lookback_slots,
+            min_micro_lamports=settings.sol_priority_fee_min_micro_lamports,
+            max_micro_lamports=settings.sol_priority_fee_max_micro_lamports,
+        )
+
+    def estimate(self, accounts: list[str]) -> int:
+        key = tuple(sorted(accounts))
+        hit = self._cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < self.window_slots * SLOT_SEC:
+            return hit[1]
+        try:
+            fees = self._fetch(list(key))
+        except Exception as e:
+            logger.debug("getRecentPrioritizationFees failed: {}", e)
+            # Keep bidding what we last saw for these accounts rather than nothing
+            return hit[1] if hit is not None else self.min_micro_lamports
+        recent = sorted(fees, key=lambda f: f[0])[-self.lookback_slots :]
+        price = percentile([fee for _, fee in recent], self.percentile) if recent else 0
+        price = min(self.max_micro_lamports, max(self.min_micro_lamports, price))
+        with self._lock:
+            self._cache[key] = (time.monotonic(), price)
+        return price
+
+    def _fetch(self, accounts: list[str]) -> list[tuple[int, int]]:
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getRecentPrioritizationFees",
+            "params": [accounts],
+        }
+        started = time.monotonic()
+        body = None
+        received = 0
+        try:
+            r = http_client.post(self.rpc_url, json=payload, timeout=self.timeout_sec, retries=0)
+            received = len(r.content or b"")
+            r.raise_for_status()
+            body = r.json()
+        finally:
+            failed = not isinstance(body, dict) or "error" in body
+            record_call(
+                "solana",
+                "executor",
+                "getRecentPrioritizationFees",
+                started,
+                payload,
+                received,
+                failed,
+            )
+        if "error" in body:
+            raise RuntimeError(body["error"])
+        return [(int(f["slot"]), int(f["prioritizationFee"])) for f in body.get("result") or []]
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import base64
+import threading
+import time
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from trade_clone_engine.execution.solana_confirmations import as_json
+
+# First message byte of a versioned transaction has the high bit set; legacy messages
+# start with num_required_signatures, which is always < 128
+VERSION_PREFIX = 0x80
+
+
+def _shortvec(raw: bytes, offset: int = 0) -> tuple[int, int]:
+    """Decodes a compact-u16 length; returns (value, bytes consumed)."""
+    value = 0
+    for i in range(3):
+        byte = raw[offset + i]
+        value |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return value, i + 1
+    raise ValueError("Malformed compact-u16")
+
+
+def message_version(raw: bytes) -> int | None:
+    """Message version of a serialized transaction: None for legacy, else 0, 1, ..."""
+    count, size = _shortvec(raw)
+    prefix = raw[size + 64 * count]
+    return prefix & 0x7F if prefix & VERSION_PREFIX else None
+
+
+def sign_transaction(raw: bytes, keypair) -> bytes:
+    """Signs a serialized transaction whose only required signer is `keypair`.
+
+    The version is read from the wire format first, so each transaction is parsed once
+    by the matching solders type instead of trying legacy and falling back.
+    """
+    from solders.transaction import Transaction, VersionedTransaction
+
+    if message_version(raw) is None:
+        message = Transaction.from_bytes(raw).message
+    else:
+        message = VersionedTransaction.from_bytes(raw).message
+    # Legacy messages serialize back in the legacy format
+    return bytes(VersionedTransaction(message, [keypair]))
+
+
+def _instruction(ix: dict):
+    from solders.instruction import AccountMeta, Instruction
+    from solders.pubkey import Pubkey
+
+    accounts = [
+        AccountMeta(Pubkey.from_string(a["pubkey"]), bool(a["isSigner"]), bool(a["isWritable"]))
+        for a in ix.get("accounts") or []
+    ]
+    return Instruction(Pubkey.from_string(ix["programId"]), base64.b64decode(ix["data"]), accounts)
+
+
+def swap_instructions(resp: dict) -> list:
+    """solders instructions from a Jupiter /swap-instructions response, in execution order."""
+    ixs = list(resp.get("computeBudgetInstructions") or [])
+    ixs += resp.get("setupInstructions") or []
+    ixs.append(resp["swapInstruction"])
+    if resp.get("cleanupInstruction"):
+        ixs.append(resp["cleanupInstruction"])
+    ixs += resp.get("otherInstructions") or []
+    return [_instruction(ix) for ix in ixs]
+
+
+@dataclass
+class SwapBuilder:
+    """Assembles Jupiter swaps locally from /swap-instructions output.
+
+    The recent blockhash is refreshed in the background, so sends never wait on it: a
+    blockhash stays valid for ~150 slots (~60s) and refreshing every few seconds keeps a
+    wide margin. `blockhash()` only calls the RPC itself before the first refresh or if
+    the cached value is older than `max_age_sec`. Address lookup tables are cached for
+    `table_ttl_sec`, since their owners keep extending them; a build that fails to
+    compile refetches its tables once before giving up.
+    """
+
+    client: object
+    refresh_sec: float = 5.0
+    max_age_sec: float = 30.0
+    table_ttl_sec: float = 300.0
+    _value: tuple[float, object] | None = None  # (monotonic fetched at, Hash)
+    # address -> (monotonic fetched at, AddressLookupTableAccount)
+    _lookup_tables: dict[str, tuple[float, object]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def refresh(self):
+        from solders.hash import Hash
+
+        resp = as_json(self.client.get_latest_blockhash())
+        blockhash = Hash.from_string(resp["result"]["value"]["blockhash"])
+        self._value = (time.monotonic(), blockhash)
+        return blockhash
+
+    def blockhash(self):
+        value = self._value
+        if value is None or time.monotonic() - value[0] > self.max_age_sec:
+            return self.refresh()
+        return value[1]
+
+    def lookup_tables(self, addresses: list[str], refresh: bool = False) -> list:
+        """Address lookup table accounts, refetched once older than `table_ttl_sec`."""
+        from solders.address_lookup_table_account import (
+            AddressLookupTable,
+            AddressLookupTableAccount,
+        )
+        from solders.pubkey import Pubkey
+
+        now = time.monotonic()
+        missing = [
+            a
+            for a in addresses
+            if refresh
+            or a not in self._lookup_tables
+            or now - self._lookup_tables[a][0] > self.table_ttl_sec
+        ]
+        if missing:
+            resp = as_json(
+                self.client.get_multiple_accounts([Pubkey.from_string(a) for a in missing])
+            )
+            for address, account in zip(
+                missing, (resp.get("result") or {}).get("value") or [], strict=False
+            ):
+                if not account:
+                    raise Exception(f"Address lookup table {address} not found")
+                table = AddressLookupTable.deserialize(base64.b64decode(account["data"][0]))
+                with self._lock:
+                    self._lookup_tables[address] = (
+                        now,
+                        AddressLookupTableAccount(
+                            Pubkey.from_string(address), list(table.addresses)
+                        ),
+                    )
+        return [self._lookup_tables[a][1] for a in addresses]
+
+    def build(self, resp: dict, keypair) -> bytes:
+        """Compiles and signs a v0 swap transaction from /swap-instructions output."""
+        from solders.message import MessageV0
+        from solders.transaction import VersionedTransaction
+
+        addresses = resp.get("addressLookupTableAddresses") or []
+        instructions = swap_instructions(resp)
+        try:
+            tables = self.lookup_tables(addresses)
+            message = MessageV0.try_compile(
+                keypair.pubkey(), instructions, tables, self.blockhash()
+            )
+            return bytes(VersionedTransaction(message, [keypair]))
+        except Exception as e:
+            if not addresses:
+                raise
+            # A cached table may predate accounts the swap now needs
+            logger.debug("Compiling swap failed ({}); refetching lookup tables", e)
+        tables = self.lookup_tables(addresses, refresh=True)
+        message = MessageV0.try_compile(keypair.pubkey(), instructions, tables, self.blockhash())
+        return bytes(VersionedTransaction(message, [keypair]))
+
+    def start(self) -> threading.Thread:
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning("Blockhash refresh failed: {}", e)
+                time.sleep(self.refresh_sec)
+
+        thread = threading.Thread(target=loop, name="sol-blockhash", daemon=True)
+        thread.start()
+        return thread
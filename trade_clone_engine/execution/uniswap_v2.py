@@ -4,6 +4,8 @@ from dataclasses import dataclass
 
 from loguru import logger
 
+from trade_clone_engine.execution.evm_wallet import unsigned_tx
+
 
 @dataclass
 class V2SwapPlan:
@@ -17,30 +19,44 @@ class V2SwapPlan:
     value: int  # native value to send
 
 
+def quote_amount_out(router_contract, amount_in: int, path: list[str]) -> int:
+    amounts = router_contract.functions.getAmountsOut(amount_in, path).call()
+    return int(amounts[-1])
+
+
+def apply_slippage(quoted_out: int, slippage_bps: int) -> int:
+    slip = quoted_out * slippage_bps // 10_000
+    return max(0, quoted_out - slip)
+
+
 def compute_min_out(router_contract, amount_in: int, path: list[str], slippage_bps: int) -> int:
     try:
-        amounts = router_contract.functions.getAmountsOut(amount_in, path).call()
-        quoted_out = int(amounts[-1])
-        slip = quoted_out * slippage_bps // 10_000
-        return max(0, quoted_out - slip)
+        return apply_slippage(quote_amount_out(router_contract, amount_in, path), slippage_bps)
     except Exception as e:
         logger.warning("getAmountsOut failed: {} — falling back to zero min_out", e)
         return 0
 
 
 def build_swap_exact_eth_for_tokens(router_contract, plan: V2SwapPlan):
-    return router_contract.functions.swapExactETHForTokens(
-        plan.min_out, plan.path, plan.recipient, plan.deadline
-    ).build_transaction({"value": plan.value})
+    return unsigned_tx(
+        router_contract.functions.swapExactETHForTokens(
+            plan.min_out, plan.path, plan.recipient, plan.deadline
+        ),
+        value=plan.value,
+    )
 
 
 def build_swap_exact_tokens_for_eth(router_contract, plan: V2SwapPlan):
-    return router_contract.functions.swapExactTokensForETH(
-        plan.amount_in, plan.min_out, plan.path, plan.recipient, plan.deadline
-    ).build_transaction({})
+    return unsigned_tx(
+        router_contract.functions.swapExactTokensForETH(
+            plan.amount_in, plan.min_out, plan.path, plan.recipient, plan.deadline
+        )
+    )
 
 
 def build_swap_exact_tokens_for_tokens(router_contract, plan: V2SwapPlan):
-    return router_contract.functions.swapExactTokensForTokens(
-        plan.amount_in, plan.min_out, plan.path, plan.recipient, plan.deadline
-    ).build_transaction({})
+    return unsigned_tx(
+        router_contract.functions.swapExactTokensForTokens(
+            plan.amount_in, plan.min_out, plan.path, plan.recipient, plan.deadline
+        )
+    )
@@ -4,6 +4,9 @@ from dataclasses import dataclass
 
 from loguru import logger
 
+from trade_clone_engine.execution.evm_wallet import unsigned_tx
+from trade_clone_engine.execution.uniswap_v2 import apply_slippage
+
 
 @dataclass
 class V3SinglePlan:
@@ -18,17 +21,22 @@ class V3SinglePlan:
     value: int
 
 
+def quote_exact_input_single(
+    quoter_contract, token_in: str, token_out: str, fee: int, amount_in: int
+) -> int:
+    return int(
+        quoter_contract.functions.quoteExactInputSingle(
+            token_in, token_out, int(fee), int(amount_in), 0
+        ).call()
+    )
+
+
 def compute_min_out_single(
     quoter_contract, token_in: str, token_out: str, fee: int, amount_in: int, slippage_bps: int
 ) -> int:
     try:
-        quoted_out = int(
-            quoter_contract.functions.quoteExactInputSingle(
-                token_in, token_out, int(fee), int(amount_in), 0
-            ).call()
-        )
-        slip = quoted_out * slippage_bps // 10_000
-        return max(0, quoted_out - slip)
+        quoted_out = quote_exact_input_single(quoter_contract, token_in, token_out, fee, amount_in)
+        return apply_slippage(quoted_out, slippage_bps)
     except Exception as e:
         logger.warning("V3 quoteExactInputSingle failed: {} — falling back to zero min_out", e)
         return 0
@@ -45,6 +53,4 @@ def build_exact_input_single(router_contract, p: V3SinglePlan):
         int(p.min_out),
         0,  # sqrtPriceLimitX96
     )
-    return router_contract.functions.exactInputSingle(params).build_transaction(
-        {"value": int(p.value)}
-    )
+    return unsigned_tx(router_contract.functions.exactInputSingle(params), value=p.value)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import inspect
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    Retrying,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+# Responses worth retrying: rate limited or a transient upstream failure
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Newer tenacity releases call the first backoff step `multiplier` and deprecate `initial`
+_BACKOFF_KEYWORD = (
+    "multiplier"
+    if "multiplier" in inspect.signature(wait_exponential_jitter).parameters
+    else "initial"
+)
+
+
+def _retry_after(response) -> float:
+    try:
+        return float(response.headers.get("Retry-After") or 0)
+    except (AttributeError, TypeError, ValueError):  # HTTP-date form is not honoured
+        return 0.0
+
+
+@dataclass
+class HttpClient:
+    """Keep-alive HTTP client shared by the API integrations of a process.
+
+    One `requests.Session` per host keeps TCP+TLS connections open between calls.
+    Requests are spaced to at most `rate_limits[host]` per second, and connection
+    errors, timeouts and 429/5xx responses are retried `retries` times with
+    exponential backoff (at least the server's Retry-After). Once retries are spent
+    the last response is returned, so callers keep using `raise_for_status()`.
+    """
+
+    connect_timeout_sec: float = 3.05
+    read_timeout_sec: float = 15.0
+    retries: int = 2
+    backoff_sec: float = 0.25
+    backoff_max_sec: float = 5.0
+    pool_size: int = 16
+    rate_limits: dict[str, float] = field(default_factory=dict)  # host -> requests/sec
+    _sessions: dict[str, requests.Session] = field(default_factory=dict)
+    _next_slot: dict[str, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def configure(
+        self,
+        connect_timeout_sec: float | None = None,
+        read_timeout_sec: float | None = None,
+        retries: int | None = None,
+        backoff_sec: float | None = None,
+        pool_size: int | None = None,
+        rate_limits: dict[str, float] | None = None,
+    ) -> None:
+        if connect_timeout_sec is not None:
+            self.connect_timeout_sec = float(connect_timeout_sec)
+        if read_timeout_sec is not None:
+            self.read_timeout_sec = float(read_timeout_sec)
+        if retries is not None:
+            self.retries = max(0, int(retries))
+        if backoff_sec is not None:
+            self.backoff_sec = float(backoff_sec)
+        if rate_limits is not None:
+            self.rate_limits = {h.lower(): float(r) for h, r in rate_limits.items()}
+        if pool_size is not None and int(pool_size) != self.pool_size:
+            self.pool_size = int(pool_size)
+            self.close()  # sessions are recreated with the new pool size
+
+    def session(self, host: str) -> requests.Session:
+        with self._lock:
+            s = self._sessions.get(host)
+            if s is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                self._sessions[host] = s
+            return s
+
+    def _throttle(self, host: str) -> None:
+        rate = self.rate_limits.get(host)
+        if not rate or rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + 1.0 / rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _wait(self):
+        backoff = wait_exponential_jitter(
+            max=self.backoff_max_sec, **{_BACKOFF_KEYWORD: self.backoff_sec}
+        )
+
+        def wait(state) -> float:
+            delay = backoff(state)
+            if not state.outcome.failed:
+                delay = max(delay, min(_retry_after(state.outcome.result()), 60.0))
+            return delay
+
+        return wait
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: float | tuple[float, float] | None = None,
+        retries: int | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        host = (urlsplit(url).hostname or "").lower()
+        session = self.session(host)
+        if timeout is None:
+            timeout = (self.connect_timeout_sec, self.read_timeout_sec)
+        elif not isinstance(timeout, tuple):
+            timeout = (min(self.connect_timeout_sec, float(timeout)), float(timeout))
+
+        def send() -> requests.Response:
+            self._throttle(host)
+            return session.request(method, url, timeout=timeout, **kwargs)
+
+        attempts = 1 + (self.retries if retries is None else max(0, retries))
+        retrying = Retrying(
+            stop=stop_after_attempt(attempts),
+            wait=self._wait(),
+            retry=(
+                retry_if_exception_type((requests.ConnectionError, requests.Timeout))
+                | retry_if_result(lambda r: r.status_code in RETRY_STATUSES)
+            ),
+            before_sleep=lambda state: logger.debug(
+                "Retrying {} {} (attempt {})", method, host, state.attempt_number
+            ),
+            retry_error_callback=lambda state: state.outcome.result(),
+            reraise=True,
+        )
+        return retrying(send)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for s in sessions:
+            s.close()
+
+
+# Shared by all HTTP integrations in the process
+http_client = HttpClient()
+
+
+def configure_http(settings) -> None:
+    """Applies the TCE_HTTP_* settings to the shared client."""
+    http_client.configure(
+        connect_timeout_sec=settings.http_connect_timeout_sec,
+        read_timeout_sec=settings.http_read_timeout_sec,
+        retries=settings.http_retries,
+        backoff_sec=settings.http_backoff_sec,
+        pool_size=settings.http_pool_size,
+        rate_limits=settings.http_rate_limits,
+    )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import requests
+from trade_clone_engine.http_client import http_client
 
 
 def trace_native_received(alchemy_rpc_url: str, tx_hash: str, to_address: str) -> int | None:
@@ -10,7 +10,7 @@ def trace_native_received(alchemy_rpc_url: str, tx_hash: str, to_address: str) -
     """
     try:
         payload = {"jsonrpc": "2.0", "id": 1, "method": "trace_transaction", "params": [tx_hash]}
-        r = requests.post(alchemy_rpc_url, json=payload, timeout=15)
+        r = http_client.post(alchemy_rpc_url, json=payload)
         r.raise_for_status()
         traces = r.json().get("result", []) or []
         want = to_address.lower()
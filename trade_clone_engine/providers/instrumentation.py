@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from loguru import logger
+
+from trade_clone_engine.telemetry import RPC_BYTES, RPC_CALLS, RPC_ERRORS, RPC_LATENCY
+
+# Overrides the component of the client for calls made in the current context,
+# e.g. receipt polling on the executor's connection
+_component: ContextVar[str | None] = ContextVar("rpc_component", default=None)
+
+# Fraction of calls whose payload sizes are measured; sizing means JSON-encoding every
+# request and response, so it is off unless TCE_RPC_BYTES_SAMPLE_RATE asks for it
+_bytes_sample_rate = 0.0
+
+
+def configure_rpc_metrics(settings) -> None:
+    """Applies the TCE_RPC_* metric settings to this process."""
+    global _bytes_sample_rate
+    _bytes_sample_rate = min(1.0, max(0.0, float(settings.rpc_bytes_sample_rate or 0)))
+
+
+@contextmanager
+def rpc_component(name: str) -> Iterator[None]:
+    """Attributes RPC calls made inside the block (same thread) to `name`."""
+    token = _component.set(name)
+    try:
+        yield
+    finally:
+        _component.reset(token)
+
+
+def _size(payload) -> int:
+    """Approximate wire size: the JSON encoding of the payload, or a byte count as-is."""
+    if payload is None:
+        return 0
+    if isinstance(payload, int | bytes | str):
+        return payload if isinstance(payload, int) else len(payload)
+    to_json = getattr(payload, "to_json", None)  # solders responses
+    try:
+        if callable(to_json):
+            return len(to_json())
+        return len(json.dumps(payload, default=str))
+    except Exception:
+        return 0
+
+
+def record_call(
+    chain: str, component: str, method: str, started: float, sent, received, error: bool
+) -> None:
+    """Accounts one RPC request; for calls made outside the instrumented clients.
+
+    `sent` and `received` are payloads or, where the transport knows them, byte counts.
+    Byte totals are sampled at the configured rate and scaled up to estimate the whole.
+    """
+    labels = {"chain": chain, "method": method, "component": _component.get() or component}
+    RPC_CALLS.labels(**labels).inc()
+    RPC_LATENCY.labels(**labels).observe(time.monotonic() - started)
+    rate = _bytes_sample_rate
+    if rate > 0 and (rate >= 1 or random.random() < rate):
+        RPC_BYTES.labels(direction="sent", **labels).inc(_size(sent) / rate)
+        RPC_BYTES.labels(direction="received", **labels).inc(_size(received) / rate)
+    if error:
+        RPC_ERRORS.labels(**labels).inc()
+
+
+def instrument_web3(w3, chain: str, component: str):
+    """Adds a middleware accounting JSON-RPC calls, bytes, errors and latency per method."""
+
+    def wrap(make_request):
+        def middleware(method, params):
+            started = time.monotonic()
+            response = None
+            try:
+                response = make_request(method, params)
+                return response
+            finally:
+                failed = not isinstance(response, dict) or "error" in response
+                sent = {"method": method, "params": params}
+                record_call(chain, component, str(method), started, sent, response, failed)
+
+        return middleware
+
+    try:
+        from web3.middleware.base import Web3Middleware
+    except ImportError:  # web3 v6: function middlewares
+        w3.middleware_onion.add(lambda make_request, _w3: wrap(make_request), name="rpc_metrics")
+        return w3
+
+    class RpcMetricsMiddleware(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            return wrap(make_request)
+
+    w3.middleware_onion.add(RpcMetricsMiddleware, name="rpc_metrics")
+    return w3
+
+
+class InstrumentedClient:
+    """Wraps a solana-py `Client` and accounts every public method call as an RPC request."""
+
+    def __init__(self, client, component: str, chain: str = "solana"):
+        self._client = client
+        self._component = component
+        self._chain = chain
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            started = time.monotonic()
+            response = None
+            try:
+                response = attr(*args, **kwargs)
+                return response
+            finally:
+                failed = response is None or (isinstance(response, dict) and "error" in response)
+                sent = {"args": args, "kwargs": kwargs}
+                record_call(self._chain, self._component, name, started, sent, response, failed)
+
+        return call
+
+
+def _samples(metric, name: str) -> dict[frozenset, float]:
+    """Current values of one sample series of `metric`, keyed by label set."""
+    return {
+        frozenset(s.labels.items()): s.value
+        for family in metric.collect()
+        for s in family.samples
+        if s.name == name
+    }
+
+
+def rpc_summary(top: int = 10) -> list[dict]:
+    """Per (chain, component, method) totals, most-called first."""
+    errors = _samples(RPC_ERRORS, "tce_rpc_errors_total")
+    sizes = _samples(RPC_BYTES, "tce_rpc_bytes_total")
+    counts = _samples(RPC_LATENCY, "tce_rpc_latency_seconds_count")
+    sums = _samples(RPC_LATENCY, "tce_rpc_latency_seconds_sum")
+    rows = []
+    for key, calls in _samples(RPC_CALLS, "tce_rpc_calls_total").items():
+        count, total_sec = counts.get(key, 0), sums.get(key, 0.0)
+        rows.append(
+            {
+                **dict(key),
+                "calls": int(calls),
+                "errors": int(errors.get(key, 0)),
+                "bytes_sent": int(sizes.get(key | {("direction", "sent")}, 0)),
+                "bytes_received": int(sizes.get(key | {("direction", "received")}, 0)),
+                "avg_ms": round(total_sec / count * 1000, 1) if count else None,
+            }
+        )
+    rows.sort(key=lambda r: r["calls"], reverse=True)
+    return rows[:top] if top else rows
+
+
+def start_rpc_summary(interval_sec: float, top: int = 10) -> threading.Thread | None:
+    """Logs the busiest RPC methods every `interval_sec` from a daemon thread; 0 disables."""
+    if not interval_sec or interval_sec <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval_sec)
+            for row in rpc_summary(top):
+                logger.info(
+                    "RPC {chain} {component} {method}: calls={calls} errors={errors} "
+                    "sent={bytes_sent}B received={bytes_received}B avg={avg_ms}ms",
+                    **row,
+                )
+
+    thread = threading.Thread(target=loop, name="rpc-summary", daemon=True)
+    thread.start()
+    return thread
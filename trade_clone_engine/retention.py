@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import JSON, Boolean, DateTime, Float, Integer, column, select, table, text
+
+from trade_clone_engine.config import AppSettings
+from trade_clone_engine.db import Base, TokenAmount
+
+# Monthly range partitions (Postgres) and their partition key; see migration 0008
+PARTITION_KEYS = {"observed_trades": "leader_block_time", "executed_trades": "created_at"}
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+PARTITIONS_SQL = text(
+    """
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:parent AS regclass)
+    """
+)
+
+
+def month_start(dt: datetime, offset: int = 0) -> datetime:
+    """First instant of the month of `dt`, shifted by `offset` months."""
+    index = dt.year * 12 + dt.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    upper: datetime | None  # exclusive upper bound; None for DEFAULT / MAXVALUE
+
+
+def parse_upper_bound(bound: str) -> datetime | None:
+    """Upper bound of a `pg_get_expr(relpartbound)` range, e.g. "FOR VALUES FROM (...) TO
+    ('2026-02-01 00:00:00')"; None for the default partition or an open range."""
+    match = _UPPER_BOUND.search(bound or "")
+    return datetime.fromisoformat(match.group(1)) if match else None
+
+
+def list_partitions(conn, parent: str) -> list[Partition]:
+    rows = conn.execute(PARTITIONS_SQL, {"parent": parent}).all()
+    return sorted(
+        (Partition(name, parse_upper_bound(bound)) for name, bound in rows),
+        key=lambda p: (p.upper is None, p.upper or datetime.max),
+    )
+
+
+def expired(partitions: list[Partition], cutoff: datetime) -> list[Partition]:
+    """Partitions whose every row is older than `cutoff`, oldest first."""
+    return [p for p in partitions if p.upper is not None and p.upper <= cutoff]
+
+
+def missing_months(
+    partitions: list[Partition], now: datetime, months_ahead: int = 2
+) -> list[datetime]:
+    """Starts of the months from the current one to `months_ahead` out that have no partition.
+
+    Months already covered by an existing range (such as the legacy partition) are skipped.
+    """
+    covered = max((p.upper for p in partitions if p.upper), default=None)
+    months = (month_start(now, offset) for offset in range(months_ahead + 1))
+    return [start for start in months if covered is None or start >= covered]
+
+
+def create_partition(conn, parent: str, start: datetime, default: str | None = None) -> int:
+    """Creates the monthly partition of `parent` starting at `start`; returns the rows moved.
+
+    Postgres refuses to create a partition while the DEFAULT partition holds rows in its
+    range (they land there if this job falls behind). Those rows are moved over: the
+    default is detached, the partition created and filled from it, and the default
+    reattached, all in one transaction.
+    """
+    key = PARTITION_KEYS[parent]
+    end = month_start(start, 1)
+    name = f"{parent}_{start:%Y_%m}"
+    create = (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} "
+        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+    )
+    in_range = f"{key} >= '{start:%Y-%m-%d}' AND {key} < '{end:%Y-%m-%d}'"
+    stranded = (
+        default
+        and conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")).scalar()
+    )
+    if not stranded:
+        conn.execute(text(create))
+        return 0
+
+    conn.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {default}"))
+    conn.execute(text(create))
+    moved = conn.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}")
+    ).rowcount
+    conn.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+    conn.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT"))
+    return moved
+
+
+def _arrow_type(pa, type_):
+    if isinstance(type_, TokenAmount | JSON):
+        return pa.string()  # uint256 amounts exceed decimal128; JSON is kept as text
+    if isinstance(type_, Boolean):
+        return pa.bool_()
+    if isinstance(type_, Integer):
+        return pa.int64()
+    if isinstance(type_, Float):
+        return pa.float64()
+    if isinstance(type_, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _arrow_value(type_, value):
+    if value is None:
+        return None
+    if isinstance(type_, TokenAmount):
+        return str(value)
+    if isinstance(type_, JSON):
+        return json.dumps(value)
+    return value
+
+
+def write_parquet(conn, parent: str, partition: str, path: Path, batch_rows: int = 50_000) -> int:
+    """Streams one partition into a zstd-compressed Parquet file; returns the row count.
+
+    Rows are read with a server-side cursor and written one row group per batch, so memory
+    stays flat however large the partition is. The schema comes from the ORM table.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:  # optional: pip install 'trade-clone-engine[archive]'
+        raise RuntimeError("Archiving partitions requires pyarrow (the 'archive' extra)") from e
+
+    columns = list(Base.metadata.tables[parent].columns)
+    schema = pa.schema([(c.name, _arrow_type(pa, c.type)) for c in columns])
+    source = table(partition, *(column(c.name, c.type) for c in columns))
+    result = conn.execution_options(stream_results=True, yield_per=batch_rows).execute(
+        select(source).order_by(source.c.id)
+    )
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in result.partitions():
+            data = {
+                c.name: [_arrow_value(c.type, row[i]) for row in batch]
+                for i, c in enumerate(columns)
+            }
+            writer.write_table(pa.table(data, schema=schema))
+            rows += len(batch)
+    return rows
+
+
+@dataclass
+class RetentionJob:
+    """Keeps the partitioned trade tables small (Postgres only).
+
+    Each run creates the monthly partitions for the next `months_ahead` months, then
+    archives every partition that lies entirely before `retention_days` ago to
+    `<archive_dir>/<table>/<partition>.parquet` and detaches and drops it. A partition is
+    only dropped after its file is completely written, so an interrupted run just
+    rewrites the file next time. `retention_days=0` keeps everything.
+    """
+
+    engine: object
+    archive_dir: str = "archive"
+    retention_days: int = 90
+    months_ahead: int = 2
+    batch_rows: int = 50_000
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings, engine) -> RetentionJob:
+        return cls(
+            engine=engine,
+            archive_dir=settings.retention_archive_dir,
+            retention_days=settings.retention_days,
+            months_ahead=settings.partition_months_ahead,
+        )
+
+    def ensure_partitions(self, parent: str, now: datetime) -> None:
+        """Creates the partitions for the coming months, one transaction per month.
+
+        A month that fails is logged and retried on the next run; it does not hold up
+        the other months or archiving.
+        """
+        with self.engine.connect() as conn:
+            partitions = list_partitions(conn, parent)
+        default = next((p.name for p in partitions if p.upper is None), None)
+        for start in missing_months(partitions, now, self.months_ahead):
+            try:
+                with self.engine.begin() as conn:
+                    moved = create_partition(conn, parent, start, default)
+            except Exception as e:
+                logger.exception(
+                    "Could not create the {:%Y-%m} partition of {}: {}", start, parent, e
+                )
+                continue
+            logger.info(
+                "Created partition {}_{:%Y_%m} ({} rows moved from default)", parent, start, moved
+            )
+
+    def archive(self, parent: str, partition: Partition) -> Path:
+        path = Path(self.archive_dir) / parent / f"{partition.name}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with self.engine.connect() as conn:
+            rows = write_parquet(conn, parent, partition.name, tmp, self.batch_rows)
+        os.replace(tmp, path)
+        logger.info("Archived {} rows of {} to {}", rows, partition.name, path)
+        return path
+
+    def drop(self, parent: str, partition: Partition) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {partition.name}"))
+            conn.execute(text(f"DROP TABLE {partition.name}"))
+        logger.info("Dropped partition {}", partition.name)
+
+    def run_once(self, now: datetime | None = None) -> int:
+        """One maintenance pass; returns the number of partitions archived and dropped."""
+        if self.engine.dialect.name != "postgresql":
+            logger.debug("Retention skipped: {} has no partitions", self.engine.dialect.name)
+            return 0
+        now = now or datetime.utcnow()
+        for parent in PARTITION_KEYS:
+            self.ensure_partitions(parent, now)
+        if self.retention_days <= 0:
+            return 0
+
+        cutoff = now - timedelta(days=self.retention_days)
+        done = 0
+        for parent in PARTITION_KEYS:
+            with self.engine.connect() as conn:
+                partitions = expired(list_partitions(conn, parent), cutoff)
+            for partition in partitions:
+                self.archive(parent, partition)
+                self.drop(parent, partition)
+                done += 1
+        return done
+
+    def run(self, interval_sec: float = 3600.0) -> None:
+        logger.info(
+            "Starting retention: archive partitions older than {} days to {}",
+            self.retention_days,
+            self.archive_dir,
+        )
+        while True:
+            try:
+                self.run_once()
+                time.sleep(interval_sec)
+            except KeyboardInterrupt:
+                logger.info("Retention interrupted; shutting down.")
+                break
+            except Exception as e:
+                logger.exception("Retention error: {}", e)
+                time.sleep(interval_sec)
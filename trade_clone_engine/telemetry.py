@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from loguru import logger
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+# Seconds; covers fast cached RPC reads up to slow confirmations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# --- Metrics shared by the services ---
+WATCHER_HEAD_LAG_BLOCKS = Gauge(
+    "tce_watcher_head_lag_blocks",
+    "Blocks/slots between chain head and the last one processed",
+    ["chain"],
+)
+WATCHER_HEAD_LAG_SECONDS = Gauge(
+    "tce_watcher_head_lag_seconds", "Age of the newest block/transaction processed", ["chain"]
+)
+WATCHER_BLOCKS = Counter("tce_watcher_blocks_total", "Blocks scanned by the EVM watcher", ["chain"])
+WATCHER_SIGNATURES = Counter(
+    "tce_watcher_signatures_total",
+    "Transaction signatures processed by the Solana watcher",
+    ["chain"],
+)
+WATCHER_TRADES = Counter(
+    "tce_watcher_trades_total", "Observed trades stored by the watchers", ["chain"]
+)
+QUEUE_DEPTH = Gauge(
+    "tce_queue_depth", "Observed trades not yet processed by an executor", ["chain"]
+)
+EXECUTIONS = Counter(
+    "tce_executions_total", "Executed trades recorded, by outcome", ["chain", "status"]
+)
+# Per method and calling component ('watcher', 'executor', 'receipts', ...)
+RPC_CALLS = Counter("tce_rpc_calls_total", "RPC requests sent", ["chain", "method", "component"])
+RPC_ERRORS = Counter(
+    "tce_rpc_errors_total",
+    "RPC requests that raised or returned an error",
+    ["chain", "method", "component"],
+)
+RPC_BYTES = Counter(
+    "tce_rpc_bytes_total",
+    "Approximate RPC payload bytes (JSON-encoded size, sampled)",
+    ["chain", "method", "component", "direction"],
+)
+RPC_LATENCY = Histogram(
+    "tce_rpc_latency_seconds",
+    "RPC request latency",
+    ["chain", "method", "component"],
+    buckets=DEFAULT_BUCKETS,
+)
+QUOTE_LATENCY = Histogram(
+    "tce_quote_latency_seconds",
+    "Quote latency per venue/aggregator",
+    ["venue"],
+    buckets=DEFAULT_BUCKETS,
+)
+
+
+def render(registry: CollectorRegistry = REGISTRY) -> bytes:
+    """`registry` in the Prometheus text exposition format (see CONTENT_TYPE)."""
+    return generate_latest(registry)
+
+
+def start_metrics_server(port: int, registry: CollectorRegistry = REGISTRY):
+    """Serves `registry` at http://0.0.0.0:<port>/metrics from a daemon thread; 0 disables."""
+    if not port:
+        return None
+    server, _thread = start_http_server(int(port), registry=registry)
+    logger.info("Serving metrics on :{}/metrics", port)
+    return server